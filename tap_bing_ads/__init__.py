@@ -5,30 +5,110 @@ import json
 import csv
 import sys
 import re
+import random
+import math
 import io
-from datetime import datetime
-from zipfile import ZipFile
-
+import struct
+import zlib
+import itertools
+import hashlib
+import threading
+import weakref
+import queue
+from contextlib import asynccontextmanager, redirect_stdout
+from collections import deque
+from copy import deepcopy
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import os
 import socket
 import ssl
 import functools
+from getpass import getuser
+from tempfile import SpooledTemporaryFile, gettempdir
 from urllib.error import URLError
+from urllib.request import urlopen
 import singer
 from singer import utils, metadata, metrics
-import bingads
-from bingads import AuthorizationData, OAuthWebAuthCodeGrant, ServiceClient
-import suds
-from suds.sudsobject import asdict
 import requests
-import arrow
+import urllib3
 import backoff
 
 from tap_bing_ads import reports
 from tap_bing_ads.exclusions import EXCLUSIONS
 
+# The Bing Ads SDK, suds and arrow are imported where they are used to keep them off the startup path:
+# importing the SDK parses a WSDL. The SOAP client class lives in `tap_bing_ads.client`, see __getattr__.
+# pylint: disable=import-outside-toplevel
+
 LOGGER = singer.get_logger()
 REQUEST_TIMEOUT = 300
 
+API_VERSION = 'v13'
+# Parsed WSDL definitions are reused from disk for this many days
+WSDL_CACHE_TTL_DAYS = 1
+
+# Default number of Singer messages queued for the writer thread, and the most it writes to stdout at once
+MESSAGE_QUEUE_SIZE = 1000
+MESSAGE_BATCH_SIZE = 500
+
+# Report downloads are read in chunks of this many bytes and spooled to a temporary file, kept in memory
+# up to the default size of REPORT_SPOOL_MAX_SIZE bytes
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+REPORT_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Reports of at least REPORT_SEGMENT_MIN_SIZE bytes can be downloaded as this many byte ranges at once,
+# one disables the segmented downloads
+REPORT_DOWNLOAD_SEGMENTS = 1
+REPORT_SEGMENT_MIN_SIZE = 64 * 1024 * 1024
+
+# Decompressed parts of a report unzipped while it downloads queued for the CSV reader at most, each of at most
+# REPORT_STREAM_PART_SIZE bytes however much its chunk of the zip inflates
+REPORT_STREAM_QUEUE_SIZE = 16
+REPORT_STREAM_PART_SIZE = 1024 * 1024
+# signature, version, flags, compression method, time, date, CRC-32, compressed size, size,
+# file name length, extra field length
+ZIP_LOCAL_FILE_HEADER = struct.Struct('<4s5H3L2H')
+
+# Number of CSV lines of a report typed at once by a process of the report parser pool
+REPORT_PARSE_CHUNK_LINES = 20000
+
+# Static rates of the token buckets shared by the service calls, per service and per customer. There is no static
+# limit by default, the `service_calls_per_second` and `customer_calls_per_second` config params set one
+SERVICE_CALLS_PER_SECOND = None
+CUSTOMER_CALLS_PER_SECOND = None
+# Rate of the bucket that a throttled call starts for a service or customer without a static rate
+THROTTLED_CALLS_PER_SECOND = 10
+# A throttled bucket halves its rate down to this fraction of its configured rate, and each successful call
+# gives back this fraction of the configured rate
+MIN_RATE_FRACTION = 0.05
+RATE_RECOVERY_FRACTION = 0.05
+# Bing's call rate error code, and the times a throttled call is made before its error is raised
+THROTTLING_ERROR_CODES = {'117', 'CallRateExceeded'}
+MAX_THROTTLED_ATTEMPTS = 5
+
+# Default number of threads running the blocking SOAP and HTTP calls of a sync
+MAX_WORKERS = 10
+
+# Default number of GetAdGroupsByCampaignId and GetAdsByAdGroupId calls in flight at once for an account
+AD_GROUPS_FAN_OUT_WIDTH = 4
+ADS_FAN_OUT_WIDTH = 8
+
+# Default number of date windows of a report generated at once, 1 syncs the windows one after another
+REPORT_WINDOWS_IN_FLIGHT = 1
+
+# Scheduler limits with their config key and default: accounts synced at once, report jobs
+# submitted and polled at once, and reports downloaded at once
+CONCURRENCY_LIMITS = {
+    'accounts': ('max_concurrent_accounts', 10),
+    'report_jobs': ('max_concurrent_report_jobs', 10),
+    'downloads': ('max_concurrent_downloads', 5),
+}
+
 REQUIRED_CONFIG_KEYS = [
     "start_date",
     "customer_id",
@@ -50,19 +130,48 @@ TOP_LEVEL_CORE_OBJECTS = [
 CONFIG = {}
 STATE = {}
 
+# Bump when the catalog built from the same WSDLs and report definitions changes
+DISCOVERY_CACHE_VERSION = 1
+DISCOVERY_SERVICES = ['CustomerManagementService', 'CampaignManagementService', 'ReportingService']
+
+# Refresh the OAuth access token when it expires within this many seconds
+ACCESS_TOKEN_EXPIRY_MARGIN = 300
+
 # ~2 hour polling timeout
 MAX_NUM_REPORT_POLLS = 1440
 REPORT_POLL_SLEEP = 5
+REPORT_POLL_BATCH_SIZE = 20
+
+# A report job is given up after the time the former fixed polling took for MAX_NUM_REPORT_POLLS polls
+REPORT_POLL_TIMEOUT = MAX_NUM_REPORT_POLLS * REPORT_POLL_SLEEP
+# The interval between polls of a job grows by REPORT_POLL_BACKOFF after each poll up to REPORT_POLL_MAX_SLEEP
+REPORT_POLL_BACKOFF = 1.5
+REPORT_POLL_MAX_SLEEP = 60
+# Weight of the last completion time in the average kept per report and window size
+REPORT_COMPLETION_TIME_WEIGHT = 0.3
+
+# Default number of connections per host kept open by the HTTP session for reuse
+HTTP_POOL_SIZE = 20
 
 SESSION = requests.Session()
 DEFAULT_USER_AGENT = 'Singer.io Bing Ads Tap'
 
 ARRAY_TYPE_REGEX = r'ArrayOf([A-Za-z0-9]+)'
 
+# Type maps and report indexes keyed by (service name, WSDL digest), built once per process. Their schemas are
+# shared by discovery and every sync without being copied, so nothing may modify them: the catalog, the only
+# writer, gets its copy in `get_stream_def`
+TYPE_MAP_CACHE = {}
+REPORT_INDEX_CACHE = {}
+REPORT_COLUMN_REGEX = r'^(?!ArrayOf)(.+Report)Column$'
+# WSDL digests keyed by the suds service definition they were computed from
+WSDL_DIGESTS = weakref.WeakKeyDictionary()
+
 def should_retry_httperror(exception):
     """ Return true if exception is required to retry otherwise return false """
+    from suds.transport import TransportError
     try:
-        if isinstance(exception, ConnectionError) or isinstance(exception, ssl.SSLError) or isinstance(exception, suds.transport.TransportError) or isinstance(exception, socket.timeout) or type(exception) == URLError: # pylint: disable=consider-merging-isinstance,no-else-return)
+        if isinstance(exception, ConnectionError) or isinstance(exception, ssl.SSLError) or isinstance(exception, TransportError) or isinstance(exception, socket.timeout) or type(exception) == URLError: # pylint: disable=consider-merging-isinstance,no-else-return)
             return True
         elif (type(exception) == Exception and exception.args[0][0] == 408) or exception.code == 408:
             # A 408 Request Timeout is an HTTP response status code that indicates the server didn't receive a complete
@@ -95,17 +204,228 @@ def get_user_agent():
 class InvalidDateRangeEnd(Exception):
     pass
 
-def log_service_call(service_method, account_id):
+class TokenBucket:
+    """
+    Hand out calls at `rate` per second with bursts of up to `capacity` calls. A throttled bucket halves its rate
+    and drops its saved up calls, and each successful call raises the rate back towards the configured rate.
+    """
+    def __init__(self, rate, capacity=None):
+        self._lock = threading.Lock()
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        # Wait for a call and return the seconds waited
+        waited = 0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def slow_down(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_FRACTION)
+
+class RateLimiter:
+    """
+    Share the rate of the service calls of all the accounts, with a token bucket per service and per customer.
+    A call waits for the buckets of its service and customer, and when Bing throttles a call both buckets slow
+    down for every caller. Without a static rate a service or customer has no bucket until it is first throttled.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.calls = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+    def get_buckets(self, service, customer_id, throttled=False):
+        with self._lock:
+            buckets = []
+            for key, rate in [(('service', service), get_positive_int_config('service_calls_per_second', SERVICE_CALLS_PER_SECOND)),
+                              (('customer', customer_id), get_positive_int_config('customer_calls_per_second', CUSTOMER_CALLS_PER_SECOND))]:
+                if key not in self._buckets and (rate or throttled):
+                    self._buckets[key] = TokenBucket(rate or THROTTLED_CALLS_PER_SECOND)
+                if key in self._buckets:
+                    buckets.append(self._buckets[key])
+            return buckets
+
+    def acquire(self, service, customer_id):
+        waited = sum(bucket.acquire() for bucket in self.get_buckets(service, customer_id))
+        with self._lock:
+            self.calls += 1
+            self.wait_time += waited
+
+    def succeeded(self, service, customer_id):
+        for bucket in self.get_buckets(service, customer_id):
+            bucket.speed_up()
+
+    def throttle(self, service, customer_id):
+        for bucket in self.get_buckets(service, customer_id, throttled=True):
+            bucket.slow_down()
+        with self._lock:
+            self.throttled += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self.calls = 0
+            self.throttled = 0
+            self.wait_time = 0.0
+
+    def log_stats(self):
+        LOGGER.info('Rate limiter: %s service calls, %s throttled, waited %.1fs for the call rate',
+                    self.calls, self.throttled, self.wait_time)
+
+RATE_LIMITER = RateLimiter()
+
+class CountingHTTPConnection(urllib3.connection.HTTPConnection):
+    # Connection of the HTTP session counting each time it connects
+    def connect(self):
+        HTTP_POOL.count_connection()
+        super().connect()
+
+class CountingHTTPSConnection(urllib3.connection.HTTPSConnection):
+    # TLS connection of the HTTP session counting each time it connects
+    def connect(self):
+        HTTP_POOL.count_connection()
+        super().connect()
+
+class CountingHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+class CountingHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+class PooledHTTPAdapter(requests.adapters.HTTPAdapter):
+    # Adapter of the HTTP session counting its requests and the connections opened for them
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': CountingHTTPConnectionPool,
+                                                   'https': CountingHTTPSConnectionPool}
+
+    def send(self, request, *args, **kwargs): # pylint: disable=arguments-differ
+        HTTP_POOL.count_request()
+        return super().send(request, *args, **kwargs)
+
+def get_http_pool_size():
+    # Get the number of connections per host kept open for reuse from the config
+    return get_positive_int_config('http_pool_size', HTTP_POOL_SIZE)
+
+def get_http_keep_alive():
+    # Get whether the connections are kept open for reuse from the config
+    return get_bool_config('http_keep_alive', True)
+
+class HttpConnectionPool:
+    """
+    Keep the connections of the HTTP session open for the report downloads and the SOAP calls, which share the
+    session through the suds transport of the service clients. Up to `http_pool_size` connections per host are
+    kept alive, so concurrent calls to a host reuse connections, and their TLS sessions, instead of opening new
+    ones. `requests` and `connections` count the requests made and the connections opened for them.
+    """
+    def __init__(self, session):
+        self._lock = threading.Lock()
+        self.session = session
+        self.requests = 0
+        self.connections = 0
+        self.mount(HTTP_POOL_SIZE)
+
+    def mount(self, pool_size):
+        for prefix in ('https://', 'http://'):
+            if prefix in self.session.adapters:
+                self.session.adapters[prefix].close()
+            self.session.mount(prefix, PooledHTTPAdapter(pool_maxsize=pool_size))
+
+    def configure(self):
+        # Size the pools from the config and start counting again
+        self.mount(get_http_pool_size())
+        if get_http_keep_alive():
+            self.session.headers.pop('Connection', None)
+        else:
+            self.session.headers['Connection'] = 'close'
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def log_stats(self):
+        reused = max(self.requests - self.connections, 0)
+        LOGGER.info('HTTP pool: %s requests, %s connections opened, %s requests on a reused connection',
+                    self.requests, self.connections, reused)
+        metrics.log(LOGGER, metrics.Point('counter', 'http_connection_reuse', reused,
+                                          {'requests': self.requests, 'connections': self.connections}))
+
+HTTP_POOL = HttpConnectionPool(SESSION)
+
+def get_fault_errors(fault):
+    # Return the operation errors of the SOAP fault, or None if it is not an API fault
+    if hasattr(fault.detail, 'ApiFaultDetail'):
+        return fault.detail.ApiFaultDetail.OperationErrors
+    if hasattr(fault.detail, 'AdApiFaultDetail'):
+        return fault.detail.AdApiFaultDetail.Errors
+    return None
+
+def is_throttling_fault(fault):
+    # Whether Bing rejected the call as the call rate was exceeded
+    errors = get_fault_errors(fault)
+    if not errors:
+        return False
+    for (_, errors_of_type) in errors:
+        for error in errors_of_type if isinstance(errors_of_type, list) else [errors_of_type]:
+            if str(getattr(error, 'Code', None)) in THROTTLING_ERROR_CODES or \
+               getattr(error, 'ErrorCode', None) in THROTTLING_ERROR_CODES:
+                return True
+    return False
+
+def log_service_call(service_method, account_id, service=None, customer_id=None):
+    import suds
+
     def wrapper(*args, **kwargs): # pylint: disable=inconsistent-return-statements
         log_args = list(map(lambda arg: str(arg).replace('\n', '\\n'), args)) + list(map(lambda kv: '{}={}'.format(*kv), kwargs.items()))
         LOGGER.info('Calling: %s(%s) for account: %s',
                     service_method.name,
                     ','.join(log_args),
                     account_id)
-        with metrics.http_request_timer(service_method.name):
+        for attempt in range(1, MAX_THROTTLED_ATTEMPTS + 1):
+            # The wait for the rate limiter is not part of the duration of the call
+            RATE_LIMITER.acquire(service, customer_id)
             try:
-                return service_method(*args, **kwargs)
+                with metrics.http_request_timer(service_method.name):
+                    response = service_method(*args, **kwargs)
+                RATE_LIMITER.succeeded(service, customer_id)
+                return response
             except suds.WebFault as e:
+                if is_throttling_fault(e.fault) and attempt < MAX_THROTTLED_ATTEMPTS:
+                    # Slow down the calls of every account of the service and customer, then call again
+                    LOGGER.warning('Call rate exceeded for %s of customer %s, slowing down', service, customer_id)
+                    RATE_LIMITER.throttle(service, customer_id)
+                    continue
                 #Raise SOAP exception
                 if hasattr(e.fault.detail, 'ApiFaultDetail'):
                     # The Web fault structure is heavily nested. This is to be sure we catch the error we want.
@@ -118,6 +438,7 @@ def log_service_call(service_method, account_id):
                     raise Exception(operation_errors) from e
                 if hasattr(e.fault.detail, 'AdApiFaultDetail'):
                     raise Exception(e.fault.detail.AdApiFaultDetail.Errors) from e
+                return
 
     return wrapper
 
@@ -130,75 +451,386 @@ def get_request_timeout():
         request_timeout = REQUEST_TIMEOUT
     return request_timeout
 
-class CustomServiceClient(ServiceClient):
-    # This class calling the methods of the specified Bing Ads service.
-    @bing_ads_error_handling
-    def __init__(self, name, **kwargs):
-        # Initializes a new instance of this ServiceClient class.
-        return super().__init__(name, 'v13', **kwargs)
-
-    def __getattr__(self, name):
-        # Log and return service call(suds client call) object
-        service_method = super(CustomServiceClient, self).__getattr__(name)
-        return log_service_call(service_method, self._authorization_data.account_id)
-
-    def set_options(self, **kwargs):
-        # Set suds options, these options will be passed to suds.
-        self._options = kwargs # pylint: disable=attribute-defined-outside-init
-
-        kwargs = ServiceClient._ensemble_header(self.authorization_data, **self._options)
-        kwargs['headers']['User-Agent'] = get_user_agent()
-        # setting the timeout parameter using the set_options which sets timeout in the _soap_client
-        kwargs['timeout'] = get_request_timeout()
-        self._soap_client.set_options(**kwargs)
-
-def get_authentication():
+def get_wsdl_cache_ttl_days():
+    wsdl_cache_ttl_days = CONFIG.get('wsdl_cache_ttl_days')
+    # if wsdl_cache_ttl_days is other than 0, "0" or "" then use it else use default ttl.
+    if wsdl_cache_ttl_days and float(wsdl_cache_ttl_days):
+        return float(wsdl_cache_ttl_days)
+    return WSDL_CACHE_TTL_DAYS
+
+def get_service_url(service):
+    # WSDL url of the service as its SDK client loads it, without building the client
+    from bingads.service_client import ServiceClient
+    # pylint: disable=protected-access
+    service_info = ServiceClient._get_service_info_dict(ServiceClient._format_version(API_VERSION))
+    return service_info[(ServiceClient._format_service(service), 'production')]
+
+def read_wsdl(url):
+    # Read the raw WSDL, from the files shipped with the SDK or over HTTP
+    if url.startswith(('https://', 'http://')):
+        response = SESSION.get(url, timeout=get_request_timeout())
+        response.raise_for_status()
+        return response.content
+    with urlopen(url) as wsdl_file:
+        return wsdl_file.read()
+
+def get_wsdl_content_digest(service):
+    # Digest of the raw WSDL the service client is built from. The SDK ships its WSDLs, so reading one takes no round-trip
+    return hashlib.sha256(read_wsdl(get_service_url(service))).hexdigest()
+
+def get_wsdl_cache(service):
     """
-    Authenticate using the new method (no scope specified) and
-    fall back to the legacy method using the bingads.manage scope if
-    that fails.
+    Return the on-disk suds cache holding the parsed WSDL definition of the service, in the directory of the
+    `wsdl_cache_dir` config param with a directory per API version, kept for `wsdl_cache_ttl_days`.
+    Its entries are keyed by the digest of the raw WSDL as well as by its url, so a WSDL changed under the
+    same url, e.g. by an SDK upgrade, is parsed again instead of read from the cache.
     """
-    # Represents an OAuth authorization object implementing the authorization code grant flow for use in a web application.
-    try:
-        authentication = OAuthWebAuthCodeGrant(
-            CONFIG['oauth_client_id'],
-            CONFIG['oauth_client_secret'],
-            '') ## redirect URL not needed for refresh token
-        # Retrieves OAuth access and refresh tokens from the Microsoft Account authorization service.
-        authentication.request_oauth_tokens_by_refresh_token(CONFIG['refresh_token'])
-        return authentication
-    except bingads.exceptions.OAuthTokenRequestException:
+    from tap_bing_ads.client import WsdlCache
+
+    cache_dir = CONFIG.get('wsdl_cache_dir') or os.path.join(gettempdir(), 'suds', getuser())
+    return WsdlCache(os.path.join(cache_dir, API_VERSION), get_wsdl_content_digest(service),
+                     days=get_wsdl_cache_ttl_days())
+
+def __getattr__(name):
+    # Load the SOAP client class, and with it the Bing Ads SDK, on first use
+    if name == 'CustomServiceClient':
+        from tap_bing_ads.client import CustomServiceClient
+        globals()[name] = CustomServiceClient
+        return CustomServiceClient
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+# arrow is imported on first use by `load_arrow`, its functions are then read from this global by the row converters
+arrow = None
+
+def load_arrow():
+    global arrow # pylint: disable=global-statement
+    if arrow is None:
+        import arrow as arrow_module
+        arrow = arrow_module
+
+def new_service_client(service):
+    # Looked up on the module so the lazily loaded class, or a patched one, is used
+    return sys.modules[__name__].CustomServiceClient(service)
+
+class OAuthTokenManager:
+    """
+    Share one OAuth authentication between all SDK clients of the run.
+    The refresh token is exchanged once and the access token is reused until it is about to expire,
+    then it is refreshed in place so every client holding the authentication sees the new token.
+    An access token without a known expiry is reused until Bing rejects it as expired.
+    The scope that worked is remembered so the legacy fallback is not retried on each refresh.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._authentication = None
+        self._oauth_scope = None
+
+    def get_authentication(self):
+        # The lock makes concurrent callers, coroutines or threads, wait for a single refresh.
+        with self._lock:
+            if self._authentication is None or self._authentication.oauth_tokens is None:
+                self._authentication = self._request_authentication()
+            elif self._is_access_token_expiring():
+                LOGGER.info('Refreshing OAuth access token')
+                self._refresh_access_token()
+            return self._authentication
+
+    def refresh_expired_access_token(self, access_token):
+        # Refresh the access token a call was rejected with, unless another caller already refreshed it
+        with self._lock:
+            if self._authentication is None or self._authentication.oauth_tokens is None:
+                self._authentication = self._request_authentication()
+            elif self._authentication.oauth_tokens.access_token == access_token:
+                LOGGER.info('Refreshing expired OAuth access token')
+                self._refresh_access_token()
+            return self._authentication
+
+    def reset(self):
+        # Drop the authentication, the scope that worked is kept for the next token request
+        with self._lock:
+            self._authentication = None
+
+    def _refresh_access_token(self):
+        self._authentication.request_oauth_tokens_by_refresh_token(
+            self._authentication.oauth_tokens.refresh_token or CONFIG['refresh_token'])
+
+    def _is_access_token_expiring(self):
+        oauth_tokens = self._authentication.oauth_tokens
+        if oauth_tokens.access_token_expires_in_seconds is None:
+            return False
+        expires_at = oauth_tokens.access_token_received_datetime + \
+            timedelta(seconds=oauth_tokens.access_token_expires_in_seconds - ACCESS_TOKEN_EXPIRY_MARGIN)
+        return datetime.utcnow() >= expires_at
+
+    def _request_authentication(self):
+        """
+        Authenticate using the new method (no scope specified) and
+        fall back to the legacy method using the bingads.manage scope if
+        that fails.
+        """
+        from bingads.exceptions import OAuthTokenRequestException
+
+        if self._oauth_scope is None:
+            try:
+                return self._create_authentication()
+            except OAuthTokenRequestException:
+                self._oauth_scope = 'bingads.manage'
+        return self._create_authentication(oauth_scope=self._oauth_scope)
+
+    @staticmethod
+    def _create_authentication(**kwargs):
+        from bingads import OAuthWebAuthCodeGrant
+
+        # Represents an OAuth authorization object implementing the authorization code grant flow for use in a web application.
         authentication = OAuthWebAuthCodeGrant(
             CONFIG['oauth_client_id'],
             CONFIG['oauth_client_secret'],
-            '',
-            oauth_scope='bingads.manage') ## redirect URL not needed for refresh token
+            '', ## redirect URL not needed for refresh token
+            **kwargs)
         # Retrieves OAuth access and refresh tokens from the Microsoft Account authorization service.
         authentication.request_oauth_tokens_by_refresh_token(CONFIG['refresh_token'])
         return authentication
 
+OAUTH_TOKEN_MANAGER = OAuthTokenManager()
+
+def get_authentication():
+    # Return the OAuth authentication shared by all SDK clients
+    return OAUTH_TOKEN_MANAGER.get_authentication()
+
+class ServiceClientRegistry:
+    """
+    Build each service client once, loading its WSDL, and hand out copies of it re-targeted
+    per account. `hits` counts the clients served without building a new service client and
+    `misses` the service clients built.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_client(self, service, account_id=None):
+        # Return the client of the service for the account, or the account-less client used to read schemas
+        # Account ids are compared as strings, as they are read from the comma separated `account_ids` config
+        client_key = (service, None if account_id is None else str(account_id))
+        with self._lock:
+            client = self._clients.get(client_key)
+            if client is not None:
+                self.hits += 1
+                return client
+
+            service_client = self._clients.get((service, None))
+            if service_client is None:
+                LOGGER.info('Initializing %s client - Loading WSDL', service)
+                service_client = new_service_client(service)
+                self._clients[(service, None)] = service_client
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            if account_id is None:
+                return service_client
+
+            from bingads import AuthorizationData
+
+            # Instance require to authenticate with Bing Ads
+            authorization_data = AuthorizationData(
+                account_id=account_id,
+                customer_id=CONFIG['customer_id'],
+                developer_token=CONFIG['developer_token'],
+                authentication=get_authentication())
+            client = service_client.retarget(authorization_data)
+            self._clients[client_key] = client
+            return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def log_stats(self):
+        LOGGER.info('SDK client registry: %s clients served without loading a WSDL, %s WSDL loads',
+                    self.hits, self.misses)
+
+CLIENT_REGISTRY = ServiceClientRegistry()
+
 @bing_ads_error_handling
 def create_sdk_client(service, account_id):
     # Creates SOAP client with OAuth refresh credentials for services
     LOGGER.info('Creating SOAP client with OAuth refresh credentials for service: %s, account_id %s',
                 service, account_id)
 
-    authentication = get_authentication()
+    return CLIENT_REGISTRY.get_client(service, account_id)
 
-    # Instance require to authenticate with Bing Ads
-    authorization_data = AuthorizationData(
-        account_id=account_id,
-        customer_id=CONFIG['customer_id'],
-        developer_token=CONFIG['developer_token'],
-        authentication=authentication)
+class SchemaRegistry:
+    """
+    Write a stream's SCHEMA message once per run, and again only when its schema or key properties change.
+    `bytes_saved` counts the size of the SCHEMA messages that were not written again.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._written = {}
+        self.messages_skipped = 0
+        self.bytes_saved = 0
+
+    def write_schema(self, stream_name, schema, key_properties):
+        with self._lock:
+            written = self._written.get(stream_name)
+            # The type map and report schemas are shared objects, so the identity check usually avoids comparing them
+            if written is not None and written['key_properties'] == key_properties and \
+               (written['schema'] is schema or written['schema'] == schema):
+                self.messages_skipped += 1
+                self.bytes_saved += written['message_size']
+                return
+
+            message = singer.SchemaMessage(stream=stream_name, schema=schema, key_properties=key_properties)
+            self._written[stream_name] = {
+                'schema': schema,
+                'key_properties': key_properties,
+                'message_size': len(singer.format_message(message))
+            }
+            singer.write_schema(stream_name, schema, key_properties)
+
+    def log_stats(self):
+        LOGGER.info('SCHEMA messages: %s written, %s skipped as unchanged, %s bytes saved',
+                    len(self._written), self.messages_skipped, self.bytes_saved)
+
+SCHEMA_REGISTRY = SchemaRegistry()
+
+def write_schema(stream_name, schema, key_properties):
+    # Write the stream's schema unless the same schema was already written
+    SCHEMA_REGISTRY.write_schema(stream_name, schema, key_properties)
+
+class BlockingCallExecutor:
+    """
+    Run the blocking suds and requests calls of the sync on a thread pool, so that the coroutines of the
+    accounts and reports make progress while a call waits on Bing. The pool is sized by `get_pool_size`,
+    the `max_workers` config by default, when first used.
+    """
+    def __init__(self, get_pool_size=None, description='blocking calls', thread_name_prefix='tap-bing-ads'):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._get_pool_size = get_pool_size
+        self._description = description
+        self._thread_name_prefix = thread_name_prefix
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                max_workers = (self._get_pool_size or get_max_workers)()
+                LOGGER.info('Running %s on %s threads', self._description, max_workers)
+                self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=self._thread_name_prefix)
+            return self._executor
+
+    async def run(self, fnc, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.get_executor(), functools.partial(fnc, *args, **kwargs))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+EXECUTOR = BlockingCallExecutor()
+
+# The core object syncs hold a thread for the whole sync of an account, so they run on their own pool, sized by
+# the accounts limit, and do not take the threads of the report submits, polls and downloads
+CORE_SYNC_EXECUTOR = BlockingCallExecutor(lambda: get_positive_int_config(*CONCURRENCY_LIMITS['accounts']),
+                                          'core object syncs', 'tap-bing-ads-core')
+
+def get_positive_int_config(key, default):
+    # Get the positive integer config value, use the default if it is not passed, empty or zero
+    value = CONFIG.get(key)
+    if value and int(value) > 0:
+        return int(value)
+    return default
+
+def get_bool_config(key, default):
+    # Get the boolean config value, false for false or 0 in any form, use the default if it is not passed
+    value = CONFIG.get(key)
+    if value is None or value == '':
+        return default
+    return str(value).lower() not in ('false', '0')
+
+def get_max_workers():
+    # Get the thread pool size from the config
+    return get_positive_int_config('max_workers', MAX_WORKERS)
+
+async def run_blocking(fnc, *args, **kwargs):
+    # Await the blocking function, run on the executor instead of the event loop
+    return await EXECUTOR.run(fnc, *args, **kwargs)
+
+class SyncScheduler:
+    """
+    Bound the number of accounts, report jobs and report downloads in progress with one semaphore per
+    limit of CONCURRENCY_LIMITS. For each limit it keeps the coroutines waiting for a slot (the queue depth),
+    the slots in use, and the largest queue depth and total wait of the run.
+    """
+    def __init__(self):
+        self._semaphores = None
+        self.limits = {}
+        self.waiting = {}
+        self.active = {}
+        self.max_waiting = {}
+        self.wait_time = {}
+
+    def configure(self):
+        # Semaphores are bound to the event loop that first waits on them, so they are created per sync
+        self.limits = {name: get_positive_int_config(key, default)
+                       for name, (key, default) in CONCURRENCY_LIMITS.items()}
+        self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+        self.waiting = dict.fromkeys(self.limits, 0)
+        self.active = dict.fromkeys(self.limits, 0)
+        self.max_waiting = dict.fromkeys(self.limits, 0)
+        self.wait_time = dict.fromkeys(self.limits, 0.0)
+        LOGGER.info('Concurrency limits: %s', self.limits)
+
+    @asynccontextmanager
+    async def slot(self, name):
+        if self._semaphores is None:
+            self.configure()
+
+        semaphore = self._semaphores[name]
+        if semaphore.locked():
+            # No slot is free, the coroutine is queued until one is released
+            self.waiting[name] += 1
+            self.max_waiting[name] = max(self.max_waiting[name], self.waiting[name])
+            wait_start = time.monotonic()
+            try:
+                await semaphore.acquire()
+            finally:
+                self.waiting[name] -= 1
+                self.wait_time[name] += time.monotonic() - wait_start
+        else:
+            await semaphore.acquire()
+
+        self.active[name] += 1
+        try:
+            yield
+        finally:
+            self.active[name] -= 1
+            semaphore.release()
+
+    def queue_depths(self):
+        return dict(self.waiting)
+
+    def log_stats(self):
+        for name, limit in self.limits.items():
+            LOGGER.info('Scheduler %s: limit %s, max queue depth %s, waited %.1fs for slots',
+                        name, limit, self.max_waiting[name], self.wait_time[name])
 
-    return CustomServiceClient(service, authorization_data=authorization_data)
+SCHEDULER = SyncScheduler()
 
 def sobject_to_dict(obj):
     # Convert response of soap to dictionary
     if not hasattr(obj, '__keylist__'):
         return obj
 
+    load_arrow()
+    from suds.sudsobject import asdict
+
     out = {}
     for key, value in asdict(obj).items():
         if hasattr(value, '__keylist__'):
@@ -277,8 +909,10 @@ def get_array_type(array_type):
     return array_obj
 
 def get_complex_type_elements(inherited_types, wsdl_type):
+    from suds.xsd.sxbasic import Extension
+
     ## inherited type
-    if isinstance(wsdl_type.rawchildren[0].rawchildren[0], suds.xsd.sxbasic.Extension): # pylint: disable=no-else-return
+    if isinstance(wsdl_type.rawchildren[0].rawchildren[0], Extension): # pylint: disable=no-else-return
         abstract_base = wsdl_type.rawchildren[0].rawchildren[0].ref[0]
         if abstract_base not in inherited_types:
             inherited_types[abstract_base] = set()
@@ -356,11 +990,21 @@ def fill_in_nested_types(type_map, schema):
             return type_map[schema]
     return schema
 
-@bing_ads_error_handling
-def get_type_map(client):
+def get_wsdl_digest(service_definition):
+    # Return a digest of the service's WSDL url and the XML schema of each of its types, so a new element or
+    # enumeration value under the same url changes it. It is computed once per service definition
+    digest = WSDL_DIGESTS.get(service_definition)
+    if digest is None:
+        type_schemas = sorted('{}:{}\n{}'.format(type_tuple[0].qname[1], type_tuple[0].name, type_tuple[0].root.str())
+                              for type_tuple in service_definition.types)
+        digest = hashlib.sha256('\n'.join([service_definition.wsdl.url] + type_schemas).encode('utf-8')).hexdigest()
+        WSDL_DIGESTS[service_definition] = digest
+    return digest
+
+def build_type_map(service_definition):
     inherited_types = {}
     type_map = {}
-    for type_tuple in client.soap_client.sd[0].types:
+    for type_tuple in service_definition.types:
         _type = type_tuple[0]
         qname = _type.qname[1]
         if 'https://bingads.microsoft.com' not in qname and \
@@ -378,13 +1022,28 @@ def get_type_map(client):
 
     return type_map
 
+@bing_ads_error_handling
+def get_type_map(client):
+    """
+    Return the type map of the client's service. It is built once per service and WSDL digest
+    and shared by every caller for the rest of the process, see `TYPE_MAP_CACHE`.
+    """
+    service_definition = client.soap_client.sd[0]
+    type_map_key = (service_definition.service.name, get_wsdl_digest(service_definition))
+    type_map = TYPE_MAP_CACHE.get(type_map_key)
+    if type_map is None:
+        type_map = build_type_map(service_definition)
+        TYPE_MAP_CACHE[type_map_key] = type_map
+    return type_map
+
 def get_stream_def(stream_name, schema, stream_metadata=None, pks=None, replication_keys=None):
     '''Generate schema with metadata for the given stream.'''
 
+    # The catalog gets its own copy of the schema, the only one modified, see `TYPE_MAP_CACHE`
     stream_def = {
         'tap_stream_id': stream_name,
         'stream': stream_name,
-        'schema': schema
+        'schema': deepcopy(schema)
     }
 
     if pks:
@@ -418,15 +1077,14 @@ def get_stream_def(stream_name, schema, stream_metadata=None, pks=None, replicat
     return stream_def
 
 def get_core_schema(client, obj):
-    # Get object's schema
+    # Get object's schema, shared with the type map
     type_map = get_type_map(client)
     return type_map[obj]
 
 def discover_core_objects():
     core_object_streams = []
 
-    LOGGER.info('Initializing CustomerManagementService client - Loading WSDL')
-    client = CustomServiceClient('CustomerManagementService')
+    client = CLIENT_REGISTRY.get_client('CustomerManagementService')
 
     # Load Account's schemas
     account_schema = get_core_schema(client, 'AdvertiserAccount')
@@ -437,8 +1095,7 @@ def discover_core_objects():
         # Hence we are keeping ID only in pks.
         get_stream_def('accounts', account_schema, pks=['Id'], replication_keys=['LastModifiedTime']))
 
-    LOGGER.info('Initializing CampaignManagementService client - Loading WSDL')
-    client = CustomServiceClient('CampaignManagementService')
+    client = CLIENT_REGISTRY.get_client('CampaignManagementService')
 
     # Load Campaign's schemas
     campaign_schema = get_core_schema(client, 'Campaign')
@@ -454,19 +1111,8 @@ def discover_core_objects():
 
     return core_object_streams
 
-@bing_ads_error_handling
-def get_report_schema(client, report_name):
-    # Load report's schemas
-    column_obj_name = '{}Column'.format(report_name)
-
-    report_columns_type = None
-    for _type in client.soap_client.sd[0].types:
-        if _type[0].name == column_obj_name:
-            report_columns_type = _type[0]
-            break
-
-    report_columns = map(lambda x: x.name, report_columns_type.rawchildren[0].rawchildren)
-
+def build_report_schema(report_columns):
+    # Prepare report's schema from its columns
     properties = {}
     for column in report_columns:
         # Prepare json `type` for schema of streams e.g. "type": ["null","integer"]
@@ -493,6 +1139,57 @@ def get_report_schema(client, report_name):
         'type': 'object'
     }
 
+def build_report_index(service_definition):
+    # Map each report name to its `<Report>Column` type and its schema
+    report_index = {}
+    for type_tuple in service_definition.types:
+        match = re.match(REPORT_COLUMN_REGEX, type_tuple[0].name)
+        if match and match.groups()[0] not in report_index:
+            report_columns_type = type_tuple[0]
+            report_columns = [column.name for column in report_columns_type.rawchildren[0].rawchildren]
+            report_index[match.groups()[0]] = {
+                'column_type': report_columns_type,
+                'schema': build_report_schema(report_columns)
+            }
+    return report_index
+
+@bing_ads_error_handling
+def get_report_index(client):
+    """
+    Return the report index of the ReportingService client. Like the type map it is built once
+    per WSDL digest and shared, see `TYPE_MAP_CACHE`.
+    """
+    service_definition = client.soap_client.sd[0]
+    report_index_key = (service_definition.service.name, get_wsdl_digest(service_definition))
+    report_index = REPORT_INDEX_CACHE.get(report_index_key)
+    if report_index is None:
+        report_index = build_report_index(service_definition)
+        REPORT_INDEX_CACHE[report_index_key] = report_index
+    return report_index
+
+@bing_ads_error_handling
+def get_report_schema(client, report_name):
+    # Load report's schema, shared with the report index
+    return get_report_index(client)[report_name]['schema']
+
+def build_exclusion_index(exclusions):
+    """
+    Compile the field exclusion groups into a lookup from each report field to the fields it
+    cannot be selected with, keeping the order of the groups.
+    e.g. {'AccountPerformanceReport': {'BidMatchType': ['AbsoluteTopImpressionRatePercent', ...], ...}}
+    """
+    exclusion_index = {}
+    for report_name, group_sets in exclusions.items():
+        report_index = exclusion_index[report_name] = {}
+        for group_set in group_sets:
+            for field in group_set['Attributes']:
+                report_index.setdefault(field, []).extend(group_set['ImpressionSharePerformanceStatistics'])
+            for field in group_set['ImpressionSharePerformanceStatistics']:
+                report_index.setdefault(field, []).extend(group_set['Attributes'])
+    return exclusion_index
+
+EXCLUSION_INDEX = build_exclusion_index(EXCLUSIONS)
+
 def metadata_fn(report_name, field, required_fields):
     if field in required_fields:
         # Set automatic inclusion for all required fields.
@@ -500,19 +1197,10 @@ def metadata_fn(report_name, field, required_fields):
     else:
         mdata = {"metadata": {"inclusion": "available"}, "breadcrumb": ["properties", field]}
 
-    if EXCLUSIONS.get(report_name):
+    excluded_fields = EXCLUSION_INDEX.get(report_name, {}).get(field)
+    if excluded_fields is not None:
         #'fieldExclusions' property that contain fields that cannot be selected with the associated group.
-        for group_set in EXCLUSIONS[report_name]:
-            if field in group_set['Attributes']:
-                mdata['metadata']['fieldExclusions'] = [
-                    *mdata['metadata'].get('fieldExclusions', []),
-                    *[['properties', p] for p in group_set['ImpressionSharePerformanceStatistics']]
-                ]
-            if field in group_set['ImpressionSharePerformanceStatistics']:
-                mdata['metadata']['fieldExclusions'] = [
-                    *mdata['metadata'].get('fieldExclusions', []),
-                    *[['properties', p] for p in group_set['Attributes']]
-                ]
+        mdata['metadata']['fieldExclusions'] = [['properties', p] for p in excluded_fields]
 
     return mdata
 
@@ -544,15 +1232,10 @@ def pascalcase(snake_string):
 def discover_reports():
     # Discover mode for report streams
     report_streams = []
-    LOGGER.info('Initializing ReportingService client - Loading WSDL')
-    client = CustomServiceClient('ReportingService')
-    type_map = get_type_map(client)
-    report_column_regex = r'^(?!ArrayOf)(.+Report)Column$'
+    client = CLIENT_REGISTRY.get_client('ReportingService')
 
-    for type_name in type_map:
-        match = re.match(report_column_regex, type_name)
-        if match and match.groups()[0] in reports.REPORT_WHITELIST:
-            report_name = match.groups()[0]
+    for report_name in get_report_index(client):
+        if report_name in reports.REPORT_WHITELIST:
             stream_name = snakecase(report_name)
             report_schema = get_report_schema(client, report_name)
             report_metadata = get_report_metadata(report_name, report_schema)
@@ -564,39 +1247,109 @@ def discover_reports():
 
     return report_streams
 
-def test_credentials(account_ids):
+def test_credentials(account_ids, load_wsdl=True):
     if not account_ids:
         raise Exception('At least one id in account_ids is required to test authentication')
 
-    create_sdk_client('CustomerManagementService', account_ids[0]) # Create bingads sdk client
+    if load_wsdl:
+        create_sdk_client('CustomerManagementService', account_ids[0]) # Create bingads sdk client
+    else:
+        # The OAuth token request tests the credentials without loading the WSDL of a client
+        get_authentication()
+
+def get_json_digest(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True).encode('utf-8')).hexdigest()
+
+def get_local_fingerprint():
+    # Fingerprint of the report definitions and field exclusions the catalog is built from
+    return get_json_digest({
+        'cache_version': DISCOVERY_CACHE_VERSION,
+        'api_version': API_VERSION,
+        'report_whitelist': reports.REPORT_WHITELIST,
+        'report_required_fields': reports.REPORT_REQUIRED_FIELDS,
+        'report_specific_required_fields': reports.REPORT_SPECIFIC_REQUIRED_FIELDS,
+        'reporting_field_types': reports.REPORTING_FIELD_TYPES,
+        'exclusions': EXCLUSIONS
+    })
+
+def get_wsdl_fingerprint():
+    # Digest of the raw WSDL of every service the catalog is built from, no WSDL is parsed to compute it
+    return {service: get_wsdl_content_digest(service) for service in DISCOVERY_SERVICES}
+
+def get_discovery_cache_path():
+    cache_dir = CONFIG.get('discovery_cache_dir') or os.path.join(gettempdir(), 'tap_bing_ads', getuser())
+    return os.path.join(cache_dir, 'catalog-{}.json'.format(API_VERSION))
+
+def read_cached_catalog(wsdl_fingerprint=None):
+    """
+    Return the cached catalog if it was built from the current report definitions and field exclusions,
+    and from the given WSDLs when a WSDL fingerprint is passed. Return None otherwise.
+    """
+    try:
+        with open(get_discovery_cache_path(), encoding='utf-8') as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
 
-def do_discover(account_ids):
+    if cached.get('local_fingerprint') != get_local_fingerprint():
+        LOGGER.info('Cached catalog is stale: report definitions or field exclusions changed')
+        return None
+    if wsdl_fingerprint is not None and cached.get('wsdl_fingerprint') != wsdl_fingerprint:
+        LOGGER.info('Cached catalog is stale: WSDL changed')
+        return None
+    return cached['catalog']
+
+def write_cached_catalog(wsdl_fingerprint, catalog):
+    cache_path = get_discovery_cache_path()
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Write to a temporary file first so a concurrent run never reads a partial cache
+    tmp_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+    with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+        json.dump({
+            'local_fingerprint': get_local_fingerprint(),
+            'wsdl_fingerprint': wsdl_fingerprint,
+            'catalog': catalog
+        }, cache_file)
+    os.replace(tmp_path, cache_path)
+
+def do_discover(account_ids, offline=False):
     # Discover schemas and dump in STDOUT
-    LOGGER.info('Testing authentication')
-    test_credentials(account_ids)# Test provided credentails
+    if offline:
+        # Serve the cached catalog without any network call
+        LOGGER.info('Discovering from the cached catalog')
+        catalog = read_cached_catalog()
+        if catalog is None:
+            raise Exception('No up to date cached catalog found at {}, run discovery without --offline first'.format(
+                get_discovery_cache_path()))
+    else:
+        wsdl_fingerprint = get_wsdl_fingerprint()
+        catalog = read_cached_catalog(wsdl_fingerprint)
+        if catalog is not None:
+            LOGGER.info('Testing authentication')
+            test_credentials(account_ids, load_wsdl=False)
+            LOGGER.info('Using the cached catalog')
+        else:
+            LOGGER.info('Testing authentication')
+            test_credentials(account_ids)# Test provided credentails
 
-    LOGGER.info('Discovering core objects')
-    core_object_streams = discover_core_objects()
+            LOGGER.info('Discovering core objects')
+            core_object_streams = discover_core_objects()
 
-    LOGGER.info('Discovering reports')
-    report_streams = discover_reports()
+            LOGGER.info('Discovering reports')
+            report_streams = discover_reports()
 
-    json.dump({'streams': core_object_streams + report_streams}, sys.stdout, indent=2)
+            catalog = {'streams': core_object_streams + report_streams}
+            write_cached_catalog(wsdl_fingerprint, catalog)
 
+    json.dump(catalog, sys.stdout, indent=2)
+    CLIENT_REGISTRY.log_stats()
 
-def check_for_invalid_selections(prop, mdata, invalid_selections):
-    # Check whether fields 'fieldExclusions' selected or not
-    field_exclusions = metadata.get(mdata, ('properties', prop), 'fieldExclusions')
-    is_prop_selected = metadata.get(mdata, ('properties', prop), 'selected')
-    if field_exclusions and is_prop_selected:
-        for exclusion in field_exclusions:
-            is_exclusion_selected = metadata.get(mdata, tuple(exclusion), 'selected')
-            if not is_exclusion_selected:
-                continue
-            if invalid_selections.get(prop):
-                invalid_selections[prop].append(exclusion[1])
-            else:
-                invalid_selections[prop] = [exclusion[1]]
+def check_for_invalid_selections(report_name, prop, selected_props, invalid_selections):
+    # Check whether the fields the selected report field cannot be selected with are selected too
+    excluded_selections = [field for field in EXCLUSION_INDEX.get(report_name, {}).get(prop, ())
+                           if field in selected_props]
+    if excluded_selections:
+        invalid_selections.setdefault(prop, []).extend(excluded_selections)
 
 
 def get_selected_fields(catalog_item, exclude=None):
@@ -607,16 +1360,25 @@ def get_selected_fields(catalog_item, exclude=None):
     if not exclude:
         exclude = []
 
-    mdata = metadata.to_map(catalog_item.metadata)
-    selected_fields = []
+    # One pass over the field breadcrumbs, the conflicts are then looked up for the selected fields only
+    selected_props = {}
+    included_props = set(catalog_item.key_properties or ())
+    for mdata in catalog_item.metadata:
+        breadcrumb = mdata['breadcrumb']
+        if len(breadcrumb) != 2 or breadcrumb[0] != 'properties':
+            continue
+        prop_mdata = mdata['metadata']
+        if prop_mdata.get('selected'):
+            selected_props[breadcrumb[1]] = True
+        if prop_mdata.get('inclusion') == 'automatic' or prop_mdata.get('selected') is True:
+            included_props.add(breadcrumb[1])
+
+    report_name = pascalcase(catalog_item.stream)
     invalid_selections = {}
-    for prop in catalog_item.schema.properties:
-        check_for_invalid_selections(prop, mdata, invalid_selections)
-        if prop not in exclude and \
-           ((catalog_item.key_properties and prop in catalog_item.key_properties) or \
-            metadata.get(mdata, ('properties', prop), 'inclusion') == 'automatic' or \
-            metadata.get(mdata, ('properties', prop), 'selected') is True):
-            selected_fields.append(prop)
+    for prop in selected_props:
+        check_for_invalid_selections(report_name, prop, selected_props, invalid_selections)
+    selected_fields = [prop for prop in catalog_item.schema.properties
+                       if prop in included_props and prop not in exclude]
 
     # Raise Exception if incompatible fields are selected
     if any(invalid_selections):
@@ -634,15 +1396,42 @@ def filter_selected_fields_many(selected_fields, objs):
         return [filter_selected_fields(selected_fields, obj) for obj in objs]
     return objs
 
+class ProjectionPlan:
+    """
+    Selected fields of a catalog stream, validated once, kept on the records with `filter_selected_fields`.
+    The fields of each record are looked up in a set of the selected fields instead of in their list.
+    """
+    def __init__(self, catalog_item, selected_fields):
+        self.catalog_item = catalog_item
+        self.selected_fields = selected_fields
+        self.keys = frozenset(selected_fields or ())
+
+    def project(self, obj):
+        return filter_selected_fields(self.keys, obj)
+
+    def project_many(self, objs):
+        return filter_selected_fields_many(self.keys, objs)
+
+# Projection plans keyed by (tap_stream_id, excluded fields), compiled once per catalog stream
+PROJECTION_PLANS = {}
+
+def get_projection_plan(catalog_item, exclude=None):
+    # Return the projection plan of the catalog stream, selections are validated when the plan is compiled
+    plan_key = (catalog_item.tap_stream_id, tuple(exclude or ()))
+    plan = PROJECTION_PLANS.get(plan_key)
+    if plan is None or plan.catalog_item is not catalog_item:
+        plan = ProjectionPlan(catalog_item, get_selected_fields(catalog_item, exclude=exclude))
+        PROJECTION_PLANS[plan_key] = plan
+    return plan
+
 @bing_ads_error_handling
 def sync_accounts_stream(account_ids, catalog_item):
     selected_fields = get_selected_fields(catalog_item)
     accounts = []
 
-    LOGGER.info('Initializing CustomerManagementService client - Loading WSDL')
-    client = CustomServiceClient('CustomerManagementService')
+    client = CLIENT_REGISTRY.get_client('CustomerManagementService')
     account_schema = get_core_schema(client, 'AdvertiserAccount')
-    singer.write_schema('accounts', account_schema, ['Id'])
+    write_schema('accounts', account_schema, ['Id'])
 
     for account_id in account_ids:
         # Loop over the multiple account_ids
@@ -659,9 +1448,11 @@ def sync_accounts_stream(account_ids, catalog_item):
 
     max_accounts_last_modified = max([x['LastModifiedTime'] for x in accounts])
 
+    # The accounts stream is synced once, its selections validated before fetching the accounts are not cached
+    projection_plan = ProjectionPlan(catalog_item, selected_fields)
     with metrics.record_counter('accounts') as counter:
         # Write only selected fields
-        singer.write_records('accounts', filter_selected_fields_many(selected_fields, accounts))
+        singer.write_records('accounts', projection_plan.project_many(accounts))
         counter.increment(len(accounts))
 
     singer.write_bookmark(STATE, 'accounts', 'last_record', max_accounts_last_modified)
@@ -676,63 +1467,106 @@ def sync_campaigns(client, account_id, selected_streams): # pylint: disable=inco
         campaigns = response_dict['Campaign']
 
         if 'campaigns' in selected_streams:
-            selected_fields = get_selected_fields(selected_streams['campaigns'])
-            singer.write_schema('campaigns', get_core_schema(client, 'Campaign'), ['Id'])
+            projection_plan = get_projection_plan(selected_streams['campaigns'])
+            write_schema('campaigns', get_core_schema(client, 'Campaign'), ['Id'])
             with metrics.record_counter('campaigns') as counter:
                 singer.write_records('campaigns',
-                                     filter_selected_fields_many(selected_fields, campaigns))
+                                     projection_plan.project_many(campaigns))
                 counter.increment(len(campaigns))
 
         return map(lambda x: x['Id'], campaigns)
 
-@bing_ads_error_handling
-def sync_ad_groups(client, account_id, campaign_ids, selected_streams):
-    ad_group_ids = []
-    for campaign_id in campaign_ids:
-        response = client.GetAdGroupsByCampaignId(CampaignId=campaign_id)
-        response_dict = sobject_to_dict(response)
+def fan_out(fnc, client, items, width):
+    # Call `fnc(client, item)` for the items on `width` threads and yield the items with their results in the
+    # order of the items. At most twice the width of calls are outstanding, and the calls not started yet are
+    # cancelled when a call failed or the results are not consumed to the end.
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=width, thread_name_prefix='tap-bing-ads-{}'.format(fnc.__name__)) as executor:
+        pending = deque((item, executor.submit(fnc, client, item)) for item in itertools.islice(items, 2 * width))
+        try:
+            while pending:
+                item, future = pending.popleft()
+                result = future.result()
+                for next_item in itertools.islice(items, 1):
+                    pending.append((next_item, executor.submit(fnc, client, next_item)))
+                yield item, result
+        finally:
+            for _, future in pending:
+                future.cancel()
 
+@bing_ads_error_handling
+def get_ad_groups_by_campaign_id(client, campaign_id):
+    response = client.GetAdGroupsByCampaignId(CampaignId=campaign_id)
+    return sobject_to_dict(response)
+
+def get_ad_groups_fan_out_width():
+    # Get the number of concurrent GetAdGroupsByCampaignId calls from the config
+    return get_positive_int_config('ad_groups_fan_out_width', AD_GROUPS_FAN_OUT_WIDTH)
+
+def iter_ad_group_ids(client, account_id, campaign_ids, selected_streams):
+    # Expand the campaigns into their ad groups concurrently, write the ad groups in the order of the
+    # campaigns and yield the ad group ids as they are found, so the ads of the first ones can be fetched
+    # while the next campaigns are expanded
+    projection_plan = None
+    for campaign_id, response_dict in fan_out(get_ad_groups_by_campaign_id, client, campaign_ids,
+                                              get_ad_groups_fan_out_width()):
         if 'AdGroup' in response_dict:
-            ad_groups = sobject_to_dict(response)['AdGroup']
+            ad_groups = response_dict['AdGroup']
 
             if 'ad_groups' in selected_streams:
                 LOGGER.info('Syncing AdGroups for Account: %s, Campaign: %s',
                     account_id, campaign_id)
-                selected_fields = get_selected_fields(selected_streams['ad_groups'])
-                singer.write_schema('ad_groups', get_core_schema(client, 'AdGroup'), ['Id'])
+                if projection_plan is None:
+                    # The schema is looked up and written once per sync, with the first ad groups
+                    projection_plan = get_projection_plan(selected_streams['ad_groups'])
+                    write_schema('ad_groups', get_core_schema(client, 'AdGroup'), ['Id'])
                 with metrics.record_counter('ad_groups') as counter:
                     singer.write_records('ad_groups',
-                                         filter_selected_fields_many(selected_fields, ad_groups))
+                                         projection_plan.project_many(ad_groups))
                     counter.increment(len(ad_groups))
 
-            ad_group_ids += list(map(lambda x: x['Id'], ad_groups))
-    return ad_group_ids
+            for ad_group in ad_groups:
+                yield ad_group['Id']
+
+def sync_ad_groups(client, account_id, campaign_ids, selected_streams):
+    # Write the ad groups of the campaigns and return all their ids
+    return list(iter_ad_group_ids(client, account_id, campaign_ids, selected_streams))
 
 @bing_ads_error_handling
-def sync_ads(client, selected_streams, ad_group_ids):
-    for ad_group_id in ad_group_ids:
-        response = client.GetAdsByAdGroupId(
-            AdGroupId=ad_group_id,
-            AdTypes={
-                'AdType': [
-                    'AppInstall',
-                    'DynamicSearch',
-                    'ExpandedText',
-                    'Product',
-                    'Text',
-                    'Image',
-                    'ResponsiveAd',
-                    'ResponsiveSearch'
-                ]
-            })
-        response_dict = sobject_to_dict(response)
+def get_ads_by_ad_group_id(client, ad_group_id):
+    response = client.GetAdsByAdGroupId(
+        AdGroupId=ad_group_id,
+        AdTypes={
+            'AdType': [
+                'AppInstall',
+                'DynamicSearch',
+                'ExpandedText',
+                'Product',
+                'Text',
+                'Image',
+                'ResponsiveAd',
+                'ResponsiveSearch'
+            ]
+        })
+    return sobject_to_dict(response)
+
+def get_ads_fan_out_width():
+    # Get the number of concurrent GetAdsByAdGroupId calls from the config
+    return get_positive_int_config('ads_fan_out_width', ADS_FAN_OUT_WIDTH)
 
+def sync_ads(client, selected_streams, ad_group_ids):
+    # Fetch the ads of the ad groups concurrently, each call retried on its own, and write them from
+    # this thread in the order of the ad groups
+    projection_plan = None
+    for _, response_dict in fan_out(get_ads_by_ad_group_id, client, ad_group_ids, get_ads_fan_out_width()):
         if 'Ad' in response_dict:
-            selected_fields = get_selected_fields(selected_streams['ads'])
-            singer.write_schema('ads', get_core_schema(client, 'Ad'), ['Id'])
+            if projection_plan is None:
+                # The schema is looked up and written once per sync, with the first ads
+                projection_plan = get_projection_plan(selected_streams['ads'])
+                write_schema('ads', get_core_schema(client, 'Ad'), ['Id'])
             with metrics.record_counter('ads') as counter:
                 ads = response_dict['Ad']
-                singer.write_records('ads', filter_selected_fields_many(selected_fields, ads))
+                singer.write_records('ads', projection_plan.project_many(ads))
                 counter.increment(len(ads))
 
 def sync_core_objects(account_id, selected_streams):
@@ -742,12 +1576,16 @@ def sync_core_objects(account_id, selected_streams):
     campaign_ids = sync_campaigns(client, account_id, selected_streams)
 
     if campaign_ids and ('ad_groups' in selected_streams or 'ads' in selected_streams):
-        ad_group_ids = sync_ad_groups(client, account_id, campaign_ids, selected_streams)
         if 'ads' in selected_streams:
             LOGGER.info('Syncing Ads for Account: %s', account_id)
-            sync_ads(client, selected_streams, ad_group_ids)
+            # The ads are fetched for the ad group ids as they are streamed from the campaigns being expanded
+            sync_ads(client, selected_streams, iter_ad_group_ids(client, account_id, campaign_ids, selected_streams))
+        else:
+            sync_ad_groups(client, account_id, campaign_ids, selected_streams)
 
 def type_report_row(row):
+    load_arrow()
+
     # Check and convert report's field to valid type
     for field_name, value in row.items():
         value = value.strip()
@@ -780,78 +1618,700 @@ def generate_poll_report(client, request_id):
     """
     return client.PollGenerateReport(request_id)
 
-async def poll_report(client, account_id, report_name, start_date, end_date, request_id):
+def get_report_stats_key(report_name, start_date, end_date):
+    # Group the completion times by report and window size in days, rounded up to a power of two
+    window_days = (end_date - start_date).days + 1
+    return '{}:{}d'.format(report_name, 1 << (window_days - 1).bit_length())
+
+def get_expected_completion_time(stats_key):
+    # Return the average completion time in seconds of the reports of the stats key, None if none completed yet
+    stats = STATE.get('report_completion_times', {}).get(stats_key)
+    return stats['mean'] if stats else None
+
+def record_completion_time(stats_key, completion_time):
+    completion_times = STATE.setdefault('report_completion_times', {})
+    stats = completion_times.get(stats_key)
+    if stats is None:
+        completion_times[stats_key] = {'mean': completion_time, 'count': 1}
+    else:
+        stats['mean'] += REPORT_COMPLETION_TIME_WEIGHT * (completion_time - stats['mean'])
+        stats['count'] += 1
+
+def get_next_poll_delay(expected_completion_time, polls):
+    # The first poll is made a little before the expected completion time, or right away when it is not known,
+    # the next ones back off from REPORT_POLL_SLEEP with jitter so the jobs do not poll in lockstep
+    if polls == 0:
+        if expected_completion_time is None:
+            return 0
+        return expected_completion_time * random.uniform(0.8, 0.95)
+    delay = min(REPORT_POLL_SLEEP * REPORT_POLL_BACKOFF ** (polls - 1), REPORT_POLL_MAX_SLEEP)
+    return delay * random.uniform(0.8, 1.2)
+
+class ReportPoller: # pylint: disable=too-many-instance-attributes
+    """
+    Poll all the outstanding report jobs from one loop. Each job is polled when its next poll is due, first around
+    the completion time expected from the previous reports of the same kind and then with a growing interval.
+    At most `report_poll_batch_size` due jobs are polled at once, with the batches of the due jobs spread over
+    REPORT_POLL_SLEEP, and the future a job waits on is resolved once Bing finished generating its report, failed it,
+    or REPORT_POLL_TIMEOUT passed. A job resumed from the request id of a previous run is polled right away, its report
+    may be ready already, and its completion time is not recorded since the report was requested before the job started.
+    """
+    def __init__(self):
+        self._jobs = []
+        self._batch = []
+        self._next_batch = 0
+        self._task = None
+        self._loop = None
+        self._wakeup = None
+        self.polls = 0
+        self.batches = 0
+
+    async def wait(self, client, request_id, stats_key, resumed=False):
+        # Return the poll response of the generated report, or None if it timed out
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # the jobs and polling task of a previous event loop are gone with it
+            self._jobs = []
+            self._batch = []
+            self._next_batch = 0
+            self._task = None
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+        expected_completion_time = get_expected_completion_time(stats_key)
+        job = {
+            'client': client,
+            'request_id': request_id,
+            'stats_key': stats_key,
+            'expected_completion_time': expected_completion_time,
+            'future': loop.create_future(),
+            'polls': 0,
+            'resumed': resumed,
+            'started': loop.time(),
+            'next_poll': loop.time() + (0 if resumed else get_next_poll_delay(expected_completion_time, 0))
+        }
+        self._jobs.append(job)
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+            self._task.add_done_callback(self.fail_jobs)
+        return await job['future']
+
+    async def _run(self):
+        while self._jobs:
+            now = self._loop.time()
+            due_jobs = sorted((job for job in self._jobs if job['next_poll'] <= now), key=lambda job: job['next_poll'])
+            if not due_jobs:
+                # Sleep until the next poll is due or a new job is added
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(job['next_poll'] for job in self._jobs) - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if now < self._next_batch:
+                await asyncio.sleep(self._next_batch - now)
+                continue
+
+            batch_size = get_positive_int_config('report_poll_batch_size', REPORT_POLL_BATCH_SIZE)
+            batch = due_jobs[:batch_size]
+            # The batches of the due jobs are spread over REPORT_POLL_SLEEP, so the batch size bounds the poll rate
+            self._next_batch = now + REPORT_POLL_SLEEP / math.ceil(len(due_jobs) / batch_size)
+            # the jobs are told apart by identity, comparing the job dicts would be quadratic in the outstanding jobs
+            batch_ids = {id(job) for job in batch}
+            self._jobs = [job for job in self._jobs if id(job) not in batch_ids]
+            self._batch = batch
+            responses = await asyncio.gather(*[run_blocking(generate_poll_report, job['client'], job['request_id'])
+                                               for job in batch],
+                                             return_exceptions=True)
+            self.batches += 1
+            self.polls += len(batch)
+
+            ready = 0
+            for job, response in zip(batch, responses):
+                job['polls'] += 1
+                if job['future'].done():
+                    continue
+                try:
+                    ready += self.handle_response(job, response)
+                except Exception as ex: # pylint: disable=broad-except
+                    # the error is raised to the job only, the other jobs are still polled
+                    job['future'].set_exception(ex)
+            self._batch = []
+
+            LOGGER.info('Polled %s report jobs, %s finished, %s pending', len(batch), ready, len(self._jobs))
+
+    def handle_response(self, job, response):
+        # Resolve the future of the job with the poll response, or poll it again later. Return whether it finished
+        elapsed = self._loop.time() - job['started']
+        if isinstance(response, Exception):
+            raise response
+        if response.Status in ('Success', 'Error'):
+            if response.Status == 'Success' and not job['resumed']:
+                record_completion_time(job['stats_key'], elapsed)
+            self.log_job_metrics(job, elapsed)
+            job['future'].set_result(response)
+            return True
+        if elapsed >= REPORT_POLL_TIMEOUT:
+            self.log_job_metrics(job, elapsed)
+            job['future'].set_result(None)
+        else:
+            job['next_poll'] = self._loop.time() + get_next_poll_delay(job['expected_completion_time'], job['polls'])
+            self._jobs.append(job)
+        return False
+
+    def fail_jobs(self, task):
+        # Raise the error of the polling task to every job still waiting on it, instead of leaving them waiting
+        if task is not self._task:
+            return
+        error = asyncio.CancelledError() if task.cancelled() else task.exception()
+        if error is None:
+            return
+        for job in self._jobs + self._batch:
+            if not job['future'].done():
+                job['future'].set_exception(error)
+        self._jobs = []
+
+    @staticmethod
+    def log_job_metrics(job, elapsed):
+        # Log the polls the job took and how far its completion was from the expected completion time
+        tags = {'report': job['stats_key']}
+        metrics.log(LOGGER, metrics.Point('counter', 'report_polls', job['polls'], tags))
+        if job['expected_completion_time'] is not None and not job['resumed']:
+            metrics.log(LOGGER, metrics.Point('timer', 'report_completion_time_error',
+                                              elapsed - job['expected_completion_time'], tags))
+
+    def log_stats(self):
+        LOGGER.info('Report poller: %s PollGenerateReport calls in %s batches', self.polls, self.batches)
+
+REPORT_POLLER = ReportPoller()
+
+async def poll_report(client, account_id, report_name, start_date, end_date, request_id, resumed=False):
     # Get download_url of generated report
     download_url = None
     with metrics.job_timer('generate_report'):
-        for i in range(1, MAX_NUM_REPORT_POLLS + 1):
-            LOGGER.info('Polling report job %s/%s - %s - from %s to %s',
-                i,
-                MAX_NUM_REPORT_POLLS,
-                report_name,
-                start_date,
-                end_date)
-            # As in the async method backoff does not work directly we created a separate method to handle it.
-            response = generate_poll_report(client, request_id)
-            if response.Status == 'Error':
-                LOGGER.warn('Error polling %s for account %s with request id %s',
-                            report_name, account_id, request_id)
-                return False, None
-            if response.Status == 'Success':
-                if response.ReportDownloadUrl:
-                    download_url = response.ReportDownloadUrl
-                else:
-                    LOGGER.info('No results for report: %s - from %s to %s',
-                                report_name,
-                                start_date,
-                                end_date)
-                break
-
-            if i == MAX_NUM_REPORT_POLLS:
-                LOGGER.info('Generating report timed out: %s - from %s to %s',
-                            report_name,
-                            start_date,
-                            end_date)
-            else:
-                await asyncio.sleep(REPORT_POLL_SLEEP)
+        LOGGER.info('Polling report job - %s - from %s to %s',
+                    report_name,
+                    start_date,
+                    end_date)
+        # The poller retries the calls with the backoff of generate_poll_report and raises its error here
+        response = await REPORT_POLLER.wait(client, request_id,
+                                            get_report_stats_key(report_name, start_date, end_date),
+                                            resumed=resumed)
+        if response is None:
+            LOGGER.info('Generating report timed out: %s - from %s to %s',
+                        report_name,
+                        start_date,
+                        end_date)
+        elif response.Status == 'Error':
+            LOGGER.warning('Error polling %s for account %s with request id %s',
+                        report_name, account_id, request_id)
+            return False, None
+        elif response.ReportDownloadUrl:
+            download_url = response.ReportDownloadUrl
+        else:
+            LOGGER.info('No results for report: %s - from %s to %s',
+                        report_name,
+                        start_date,
+                        end_date)
 
     return True, download_url
 
 def log_retry_attempt(details):
     LOGGER.info('Retrieving report timed out, triggering retry #%d', details.get('tries'))
 
-# retry the request for 5 times when Timeout error occurs
-@backoff.on_exception(backoff.constant,
-                      (requests.exceptions.Timeout ,requests.exceptions.ConnectionError),
-                      max_tries=5,
-                      on_backoff=log_retry_attempt)
 def stream_report(stream_name, report_name, url, report_time):
-    # Write stream report with backoff of ConnectionError
-    with metrics.http_request_timer('download_report'):
-        # Set request timeout with config param `request_timeout`.
-        request_timeout = get_request_timeout()
-        response = SESSION.get(url, headers={'User-Agent': get_user_agent()}, timeout=request_timeout)
-
-    if response.status_code != 200:
-        raise Exception('Non-200 ({}) response downloading report: {}'.format(
-            response.status_code, report_name))
-    with ZipFile(io.BytesIO(response.content)) as zip_file:
+    # Write stream report, unzipped while it downloads if the zip and the server allow it,
+    # otherwise from the downloaded zip
+    if get_report_streaming_unzip() and get_report_download_segments() == 1:
+        with ReportUnzipper(report_name, url) as unzipper:
+            if unzipper.streaming():
+                with io.TextIOWrapper(io.BufferedReader(StreamedReportReader(unzipper.parts), DOWNLOAD_CHUNK_SIZE),
+                                      encoding='utf-8') as csv_file:
+                    write_report_rows(stream_name, csv_file, report_time)
+            else:
+                write_report_zip_rows(stream_name, unzipper.downloaded_file(), report_time)
+        return
+
+    with SpooledTemporaryFile(max_size=get_report_spool_max_size()) as report_file:
+        download_report(report_name, url, report_file)
+        write_report_zip_rows(stream_name, report_file, report_time)
+
+def write_report_zip_rows(stream_name, report_file, report_time):
+    # Write the rows of the CSV in the downloaded zip
+    with ZipFile(report_file) as zip_file:
         with zip_file.open(zip_file.namelist()[0]) as binary_file:
             with io.TextIOWrapper(binary_file, encoding='utf-8') as csv_file:
-                # handle control character at the start of the file and extra next line
-                header_line = next(csv_file)[1:-1]
-                headers = header_line.replace('"', '').split(',')
+                write_report_rows(stream_name, csv_file, report_time)
+
+def write_report_rows(stream_name, csv_file, report_time):
+    # handle control character at the start of the file and extra next line
+    header_line = next(csv_file)[1:-1]
+    headers = header_line.replace('"', '').split(',')
+
+    with metrics.record_counter(stream_name) as counter:
+        for row in iter_typed_report_rows(csv_file, headers, report_time):
+            singer.write_record(stream_name, row)
+            counter.increment()
+
+def get_report_streaming_unzip():
+    # Get whether the reports are unzipped while they download from the config
+    return get_bool_config('report_streaming_unzip', True)
 
-                reader = csv.DictReader((line.replace('\0', '') for line in csv_file), fieldnames=headers)
+def get_report_spool_max_size():
+    # Get the size in bytes up to which a downloaded report is kept in memory from the config
+    return get_positive_int_config('report_spool_max_size', REPORT_SPOOL_MAX_SIZE)
 
-                with metrics.record_counter(stream_name) as counter:
-                    for row in reader:
-                        type_report_row(row)
-                        row['_sdc_report_datetime'] = report_time
-                        singer.write_record(stream_name, row)
-                        counter.increment()
+class IncompleteReportDownload(requests.exceptions.RequestException):
+    pass
+
+# retry the request for 5 times when Timeout error occurs
+retry_report_download = backoff.on_exception(backoff.constant,
+                                             (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                                              requests.exceptions.ChunkedEncodingError, IncompleteReportDownload),
+                                             max_tries=5,
+                                             on_backoff=log_retry_attempt)
+
+def get_report_download_segments():
+    # Get the number of byte ranges of a large report downloaded at once from the config
+    return get_positive_int_config('report_download_segments', REPORT_DOWNLOAD_SEGMENTS)
+
+def get_report_segment_min_size():
+    # Get the size in bytes from which a report is downloaded in segments from the config
+    return get_positive_int_config('report_segment_min_size', REPORT_SEGMENT_MIN_SIZE)
+
+def download_report(report_name, url, report_file):
+    # Download the report into the file, as concurrent byte ranges when the segmented downloads are enabled
+    # and the server accepts ranges of a report of at least `report_segment_min_size` bytes
+    segments = get_report_download_segments()
+    if segments > 1:
+        size = get_report_size(url)
+        if size is not None and size >= get_report_segment_min_size():
+            download_report_segments(report_name, url, report_file, size, segments)
+            return
+    ReportDownload(report_name, url, report_file).download()
+
+@retry_report_download
+def get_report_size(url):
+    # Get the size of the report if the server accepts ranges of it
+    response = SESSION.head(url, headers={'User-Agent': get_user_agent()}, timeout=get_request_timeout(),
+                            allow_redirects=True)
+    content_length = response.headers.get('Content-Length')
+    if response.status_code != 200 or response.headers.get('Accept-Ranges') != 'bytes' or not content_length:
+        return None
+    return int(content_length)
+
+def download_report_segments(report_name, url, report_file, size, segments):
+    # Download the byte ranges of the report on their own threads into their place in the file
+    LOGGER.info('Downloading report %s of %s bytes in %s segments', report_name, size, segments)
+    lock = threading.Lock()
+    segment_size = -(-size // segments)
+    report_segments = [ReportSegment(report_name, url, report_file, lock, first, min(first + segment_size, size) - 1)
+                       for first in range(0, size, segment_size)]
+    with ThreadPoolExecutor(max_workers=len(report_segments), thread_name_prefix='tap-bing-ads-download') as executor:
+        futures = [executor.submit(report_segment.download) for report_segment in report_segments]
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+    report_file.seek(0)
+
+class ReportDownload:
+    """
+    Stream a zipped report into a file, so it is never held in memory whole. When the connection drops, the
+    download is retried from the bytes already received with a Range request if the server accepts ranges,
+    and from the start otherwise.
+    """
+    def __init__(self, report_name, url, report_file):
+        self.report_name = report_name
+        self.url = url
+        self.report_file = report_file
+        self.size = None
+        self.accepts_ranges = False
+        self.resumes = 0
+
+    @retry_report_download
+    def download(self):
+        received = self.report_file.seek(0, io.SEEK_END)
+        headers = {'User-Agent': get_user_agent()}
+        if received and self.accepts_ranges:
+            headers['Range'] = 'bytes={}-'.format(received)
+
+        with metrics.http_request_timer('download_report'):
+            # Set request timeout with config param `request_timeout`.
+            request_timeout = get_request_timeout()
+            response = SESSION.get(self.url, headers=headers, timeout=request_timeout, stream=True)
+            try:
+                self.start(response, received)
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    self.report_file.write(chunk)
+            finally:
+                response.close()
+
+        received = self.report_file.tell()
+        if self.size is not None and received != self.size:
+            raise IncompleteReportDownload('Received {} of {} bytes downloading report: {}'.format(
+                received, self.size, self.report_name))
+        self.report_file.seek(0)
+
+    def start(self, response, received):
+        # Check the response to the download request, and keep or drop the bytes received before it
+        if response.status_code == 206:
+            # Content-Range: bytes <first>-<last>/<size>
+            content_range = re.match(r'bytes (\d+)-\d+/(\d+|\*)', response.headers.get('Content-Range', ''))
+            if not content_range or int(content_range.group(1)) != received:
+                raise IncompleteReportDownload('Invalid range {} resuming report download: {}'.format(
+                    response.headers.get('Content-Range'), self.report_name))
+            if content_range.group(2) != '*':
+                self.size = int(content_range.group(2))
+            self.resumes += 1
+            LOGGER.info('Resuming download of report %s from byte %s', self.report_name, received)
+        elif response.status_code == 200:
+            if received:
+                LOGGER.info('Restarting download of report %s, %s bytes received are dropped',
+                            self.report_name, received)
+                self.report_file.seek(0)
+                self.report_file.truncate()
+            content_length = response.headers.get('Content-Length')
+            self.size = int(content_length) if content_length else None
+            self.accepts_ranges = response.headers.get('Accept-Ranges') == 'bytes'
+        else:
+            raise Exception('Non-200 ({}) response downloading report: {}'.format(
+                response.status_code, self.report_name))
+
+class ReportSegment: # pylint: disable=too-few-public-methods
+    """
+    Download the bytes `first` to `last` of a report into their place in the report file shared with the other
+    segments, resumed from the bytes received when the connection drops.
+    """
+    def __init__(self, report_name, url, report_file, lock, first, last):
+        self.report_name = report_name
+        self.url = url
+        self.report_file = report_file
+        self.lock = lock
+        self.first = first
+        self.last = last
+        self.received = 0
+
+    @retry_report_download
+    def download(self):
+        start = self.first + self.received
+        headers = {'User-Agent': get_user_agent(), 'Range': 'bytes={}-{}'.format(start, self.last)}
+
+        with metrics.http_request_timer('download_report'):
+            response = SESSION.get(self.url, headers=headers, timeout=get_request_timeout(), stream=True)
+            try:
+                if response.status_code != 206:
+                    raise Exception('Non-206 ({}) response downloading bytes {}-{} of report: {}'.format(
+                        response.status_code, start, self.last, self.report_name))
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    with self.lock:
+                        self.report_file.seek(self.first + self.received)
+                        self.report_file.write(chunk)
+                    self.received += len(chunk)
+            finally:
+                response.close()
+
+        if self.first + self.received != self.last + 1:
+            raise IncompleteReportDownload('Received {} of {} bytes downloading bytes {}-{} of report: {}'.format(
+                self.received, self.last + 1 - self.first, self.first, self.last, self.report_name))
+
+class ReportUnzipper: # pylint: disable=too-many-instance-attributes
+    """
+    File a report is downloaded into by ReportDownload on a thread of its own, unzipping the CSV as its bytes
+    arrive. The CSV is unzipped if the zip starts with the local file header of a deflated member and the server
+    accepts ranges, so a dropped download resumes where the decompression stopped. The decompressed parts are
+    queued in `parts` for the CSV reader, followed by None or the error of the download. Otherwise the zip is
+    downloaded into a spooled file, to be read with ZipFile.
+    """
+    def __init__(self, report_name, url):
+        self.report_name = report_name
+        self.download = ReportDownload(report_name, url, self)
+        self.parts = queue.Queue(REPORT_STREAM_QUEUE_SIZE)
+        self.thread = threading.Thread(target=self.run, name='tap-bing-ads-report-unzip', daemon=True)
+        self.layout_known = threading.Event()
+        self.closed = False
+        self.error = None
+        self.received = 0
+        self.head = b''
+        self.spool = None
+        self.decompressor = None
+        self.expected_crc = None
+        self.crc = 0
+        self.trailer = b''
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def run(self):
+        try:
+            self.download.download()
+            self.check_header()
+            self.check_crc()
+            self.put(None)
+        except Exception as ex: # pylint: disable=broad-except
+            self.error = ex
+            if self.decompressor is not None and not self.closed:
+                self.parts.put(ex)
+        finally:
+            self.layout_known.set()
+
+    def streaming(self):
+        # Wait for the layout of the zip and return whether the CSV is unzipped while it downloads
+        self.layout_known.wait()
+        if self.decompressor is None and self.error is not None:
+            raise self.error
+        return self.decompressor is not None
+
+    def downloaded_file(self):
+        # Wait for the zip downloaded into the spooled file
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.spool
+
+    def close(self):
+        # Stop the download if the CSV was not read to the end
+        self.closed = True
+        while self.thread.is_alive():
+            try:
+                self.parts.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        if self.spool is not None:
+            self.spool.close()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self.spool is not None:
+            return self.spool.seek(offset, whence)
+        # the bytes received are already unzipped, the download can only continue after them
+        return self.received
+
+    def tell(self):
+        if self.spool is not None:
+            return self.spool.tell()
+        return self.received
+
+    def truncate(self):
+        if self.spool is not None:
+            return self.spool.truncate()
+        if self.decompressor is not None:
+            raise Exception('Cannot restart the download of report {} unzipped while downloading'.format(
+                self.report_name))
+        self.head = b''
+        self.received = 0
+        return 0
+
+    def write(self, chunk):
+        if self.closed:
+            raise Exception('Stopped downloading report: {}'.format(self.report_name))
+        if self.spool is not None:
+            return self.spool.write(chunk)
+
+        self.received += len(chunk)
+        if self.decompressor is None:
+            self.head += chunk
+            data_offset = self.read_local_file_header()
+            if data_offset is None:
+                return len(chunk)
+            head, self.head = self.head, b''
+            self.layout_known.set()
+            if self.spool is not None:
+                self.spool.write(head)
+                return len(chunk)
+            chunk = head[data_offset:]
+
+        self.decompress(chunk)
+        return len(chunk)
+
+    def read_local_file_header(self):
+        # Return the offset of the member data after the local file header, or None until it is received
+        if len(self.head) < ZIP_LOCAL_FILE_HEADER.size:
+            return None
+        (signature, _, flags, method, _, _, crc, _, _,
+         name_length, extra_length) = ZIP_LOCAL_FILE_HEADER.unpack_from(self.head)
+        data_offset = ZIP_LOCAL_FILE_HEADER.size + name_length + extra_length
+        if len(self.head) < data_offset:
+            return None
+
+        # bit 0 of the flags is set for encrypted members, bit 3 when the CRC-32 follows the data
+        if signature == b'PK\x03\x04' and method == ZIP_DEFLATED and not flags & 0x1 and self.download.accepts_ranges:
+            LOGGER.info('Unzipping report %s while it downloads', self.report_name)
+            self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            self.expected_crc = None if flags & 0x8 else crc
+        else:
+            LOGGER.info('Report %s cannot be unzipped while it downloads, downloading the zip first', self.report_name)
+            self.spool = SpooledTemporaryFile(max_size=get_report_spool_max_size()) # pylint: disable=consider-using-with
+        return data_offset
+
+    def decompress(self, data):
+        if self.decompressor.eof:
+            # the data descriptor, if any, then the central directory
+            self.trailer = (self.trailer + data)[:16]
+            return
+        # Decompress the chunk in parts of at most REPORT_STREAM_PART_SIZE bytes, until its data is consumed and
+        # the decompressor holds no more output
+        while True:
+            part = self.decompressor.decompress(data, REPORT_STREAM_PART_SIZE)
+            if part:
+                self.crc = zlib.crc32(part, self.crc)
+                self.put(part)
+            if self.decompressor.eof:
+                self.trailer = self.decompressor.unused_data[:16]
+                return
+            data = self.decompressor.unconsumed_tail
+            if not data and len(part) < REPORT_STREAM_PART_SIZE:
+                return
+
+    def put(self, part):
+        # Queue the part for the reader, unless the reader stopped reading
+        while not self.closed:
+            try:
+                self.parts.put(part, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        raise Exception('Stopped downloading report: {}'.format(self.report_name))
+
+    def check_header(self):
+        # Check that the download did not end before the local file header of the zip, a zip read from neither
+        # the CSV parts nor the spooled file
+        if self.decompressor is None and self.spool is None:
+            raise IncompleteReportDownload('Received {} bytes, ending in the zip header, downloading report: {}'.format(
+                self.received, self.report_name))
+
+    def check_crc(self):
+        # Check the CSV unzipped against the CRC-32 of the local file header or of the data descriptor after the data
+        if self.decompressor is None:
+            return
+        if not self.decompressor.eof:
+            raise Exception('Incomplete zip of report: {}'.format(self.report_name))
+        expected_crc = self.expected_crc
+        if expected_crc is None:
+            descriptor = self.trailer[4:] if self.trailer.startswith(b'PK\x07\x08') else self.trailer
+            expected_crc = struct.unpack_from('<L', descriptor)[0] if len(descriptor) >= 4 else None
+        if expected_crc != self.crc:
+            raise Exception('Bad CRC-32 of report: {}'.format(self.report_name))
+
+class StreamedReportReader(io.RawIOBase):
+    # Raw file reading the CSV parts of a report queued by its unzipper
+    def __init__(self, parts):
+        super().__init__()
+        self.parts = parts
+        self.part = memoryview(b'')
+        self.ended = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.part:
+            if self.ended:
+                return 0
+            part = self.parts.get()
+            if part is None:
+                self.ended = True
+            elif isinstance(part, Exception):
+                raise part
+            else:
+                self.part = memoryview(part)
+        size = min(len(buffer), len(self.part))
+        buffer[:size] = self.part[:size]
+        self.part = self.part[size:]
+        return size
+
+def iter_typed_report_lines(headers, lines, report_time):
+    # Parse and type the report rows of the CSV lines
+    for row in csv.DictReader((line.replace('\0', '') for line in lines), fieldnames=headers):
+        type_report_row(row)
+        row['_sdc_report_datetime'] = report_time
+        yield row
+
+def type_report_lines(headers, lines, report_time):
+    # Type the rows of a chunk of the report in a process of the report parser pool
+    return list(iter_typed_report_lines(headers, lines, report_time))
+
+def iter_report_chunks(lines, chunk_lines):
+    # Split the CSV lines in chunks of at least `chunk_lines` lines ending with a whole row, as a quoted field
+    # may hold line breaks: a chunk ends on a line where an even number of quotes were opened and closed
+    chunk = []
+    quotes = 0
+    for line in lines:
+        chunk.append(line)
+        quotes += line.count('"')
+        if len(chunk) >= chunk_lines and quotes % 2 == 0:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class ReportParserPool:
+    """
+    Type the rows of large reports on `report_parse_processes` processes. The processes are spawned, not forked,
+    as the sync runs on several threads, and are kept until the end of the sync.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                processes = get_report_parse_processes()
+                LOGGER.info('Typing large reports on %s processes', processes)
+                self._executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+REPORT_PARSER_POOL = ReportParserPool()
+
+def get_report_parse_processes():
+    # Get the number of report parser processes from the config, 0 types the rows in the syncing thread
+    return get_positive_int_config('report_parse_processes', 0)
+
+def iter_typed_report_rows(csv_file, headers, report_time):
+    # Yield the typed rows of the report CSV in order
+    processes = get_report_parse_processes()
+    if not processes:
+        yield from iter_typed_report_lines(headers, csv_file, report_time)
+        return
+
+    chunks = iter_report_chunks(csv_file, REPORT_PARSE_CHUNK_LINES)
+    first_chunks = list(itertools.islice(chunks, 2))
+    if len(first_chunks) < 2:
+        # A report of one chunk is typed here, it takes less than sending it to another process
+        for chunk in first_chunks:
+            yield from iter_typed_report_lines(headers, chunk, report_time)
+        return
+
+    executor = REPORT_PARSER_POOL.get_executor()
+    chunks = itertools.chain(first_chunks, chunks)
+    pending = deque(executor.submit(type_report_lines, headers, chunk, report_time)
+                    for chunk in itertools.islice(chunks, 2 * processes))
+    try:
+        while pending:
+            rows = pending.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(type_report_lines, headers, chunk, report_time))
+            yield from rows
+    finally:
+        for future in pending:
+            future.cancel()
 
 def get_report_interval(state_key):
+    load_arrow()
+
     # Return start_date and end_date for report interval
     report_max_days = int(CONFIG.get('report_max_days', 30)) # pylint: disable=unused-variable
     conversion_window = int(CONFIG.get('conversion_window', -30))
@@ -885,6 +2345,13 @@ async def sync_report(client, account_id, report_stream):
     LOGGER.info('Generating %s reports for account %s between %s - %s',
         report_stream.stream, account_id, start_date, end_date)
 
+    windows_in_flight = get_report_windows_in_flight()
+    if windows_in_flight > 1:
+        await sync_report_pipelined(client, account_id, report_stream,
+                                    get_report_windows(start_date, end_date, report_max_days),
+                                    windows_in_flight)
+        return
+
     current_start_date = start_date
     while current_start_date <= end_date:
         current_end_date = min(
@@ -898,58 +2365,179 @@ async def sync_report(client, account_id, report_stream):
                                                  current_start_date,
                                                  current_end_date)
         except InvalidDateRangeEnd as ex: # pylint: disable=unused-variable
-            LOGGER.warn("Bing reported that the requested report date range ended outside of "
+            LOGGER.warning("Bing reported that the requested report date range ended outside of "
                         "their data retention period. Skipping to next range...")
             success = True
 
         if success:
             current_start_date = current_end_date.shift(days=1)
 
+def get_report_windows_in_flight():
+    # Get the number of date windows of a report to generate at once from the config
+    return get_positive_int_config('max_report_windows_in_flight', REPORT_WINDOWS_IN_FLIGHT)
+
+def get_report_windows(start_date, end_date, report_max_days):
+    # Split the report interval into the date windows requested one report each
+    windows = []
+    current_start_date = start_date
+    while current_start_date <= end_date:
+        current_end_date = min(current_start_date.shift(days=report_max_days), end_date)
+        windows.append((current_start_date, current_end_date))
+        current_start_date = current_end_date.shift(days=1)
+    return windows
+
+async def sync_report_pipelined(client, account_id, report_stream, windows, windows_in_flight):
+    # Generate up to `windows_in_flight` date windows of the report at once and download each one when it is
+    # ready. The `date` bookmark only moves through the windows completed without a gap before them, so a
+    # window completed early is synced again if the run stops before the windows preceding it complete.
+    state_key = '{}_{}'.format(account_id, report_stream.stream)
+    window_slots = asyncio.Semaphore(windows_in_flight)
+    completed_windows = set()
+    next_window = 0
+
+    async def sync_window(index):
+        nonlocal next_window
+        start_date, end_date = windows[index]
+        async with window_slots:
+            success = False
+            while not success:
+                try:
+                    success = await sync_report_window(client, account_id, report_stream, start_date, end_date)
+                except InvalidDateRangeEnd:
+                    LOGGER.warning("Bing reported that the requested report date range ended outside of "
+                                "their data retention period. Skipping to next range...")
+                    success = True
+
+        completed_windows.add(index)
+        if next_window in completed_windows:
+            while next_window in completed_windows:
+                next_window += 1
+            singer.write_bookmark(STATE, state_key, 'date', windows[next_window - 1][1].isoformat())
+            singer.write_state(STATE)
+
+    await asyncio.gather(*[sync_window(index) for index in range(len(windows))])
+
+def save_window_request_id(state_key, window_key, request_id):
+    # Save the request id of the window generated in the pipelined mode, or remove it once the window is done
+    request_ids = dict(singer.get_bookmark(STATE, state_key, 'request_ids') or {})
+    if request_id is None:
+        request_ids.pop(window_key, None)
+    else:
+        request_ids[window_key] = request_id
+    singer.write_bookmark(STATE, state_key, 'request_ids', request_ids)
+    singer.write_state(STATE)
+
+async def sync_report_window(client, account_id, report_stream, start_date, end_date):
+    # Generate and download the report of one date window of the pipelined mode
+    state_key = '{}_{}'.format(account_id, report_stream.stream)
+    window_key = start_date.isoformat()
+    report_name = pascalcase(report_stream.stream)
+
+    load_arrow()
+
+    write_schema(report_stream.stream, get_report_schema(client, report_name), [])
+
+    report_time = arrow.get().isoformat()
+
+    async with SCHEDULER.slot('report_jobs'):
+        request_id = (singer.get_bookmark(STATE, state_key, 'request_ids') or {}).get(window_key)
+        resumed = request_id is not None
+        if resumed:
+            LOGGER.info('Resuming polling for account %s: %s - from %s to %s',
+                        account_id, report_name, start_date, end_date)
+        else:
+            request_id = await run_blocking(get_report_request_id, client, account_id, report_stream,
+                                            report_name, start_date, end_date,
+                                            state_key, force_refresh=True)
+            save_window_request_id(state_key, window_key, request_id)
+
+        try:
+            success, download_url = await poll_report(client, account_id, report_name,
+                                                      start_date, end_date, request_id, resumed=resumed)
+
+        except Exception as some_error: # pylint: disable=broad-except,unused-variable
+            LOGGER.info('The request_id %s for %s is invalid, generating a new one',
+                        request_id,
+                        state_key)
+            request_id = await run_blocking(get_report_request_id, client, account_id, report_stream,
+                                            report_name, start_date, end_date,
+                                            state_key, force_refresh=True)
+            save_window_request_id(state_key, window_key, request_id)
+
+            success, download_url = await poll_report(client, account_id, report_name,
+                                                      start_date, end_date, request_id)
+
+    if success and download_url:
+        LOGGER.info('Streaming report: %s for account %s - from %s to %s',
+                    report_name, account_id, start_date, end_date)
+
+        async with SCHEDULER.slot('downloads'):
+            await run_blocking(stream_report,
+                               report_stream.stream,
+                               report_name,
+                               download_url,
+                               report_time)
+    elif success:
+        LOGGER.info('No data for report: %s for account %s - from %s to %s',
+                    report_name, account_id, start_date, end_date)
+    else:
+        LOGGER.info('Unsuccessful request for report: %s for account %s - from %s to %s',
+                    report_name, account_id, start_date, end_date)
+
+    save_window_request_id(state_key, window_key, None)
+    return success
+
 async def sync_report_interval(client, account_id, report_stream,
                                start_date, end_date):
     state_key = '{}_{}'.format(account_id, report_stream.stream)
     report_name = pascalcase(report_stream.stream)
 
+    load_arrow()
+
     report_schema = get_report_schema(client, report_name)
-    singer.write_schema(report_stream.stream, report_schema, [])
+    write_schema(report_stream.stream, report_schema, [])
 
     report_time = arrow.get().isoformat()
 
-    # Get request id to retrieve report stream
-    request_id = get_report_request_id(client, account_id, report_stream,
-                                       report_name, start_date, end_date,
-                                       state_key)
-
-    singer.write_bookmark(STATE, state_key, 'request_id', request_id)
-    singer.write_state(STATE)
-
-    try:
-        # Get success status and download url
-        success, download_url = await poll_report(client, account_id, report_name,
-                                                  start_date, end_date, request_id)
-
-    except Exception as some_error: # pylint: disable=broad-except,unused-variable
-        LOGGER.info('The request_id %s for %s is invalid, generating a new one',
-                    request_id,
-                    state_key)
-        request_id = get_report_request_id(client, account_id, report_stream,
-                                           report_name, start_date, end_date,
-                                           state_key, force_refresh=True)
+    async with SCHEDULER.slot('report_jobs'):
+        # Get request id to retrieve report stream, the one saved by a previous run is resumed
+        resumed = singer.get_bookmark(STATE, state_key, 'request_id') is not None
+        request_id = await run_blocking(get_report_request_id, client, account_id, report_stream,
+                                        report_name, start_date, end_date,
+                                        state_key)
 
         singer.write_bookmark(STATE, state_key, 'request_id', request_id)
         singer.write_state(STATE)
 
-        success, download_url = await poll_report(client, account_id, report_name,
-                                                  start_date, end_date, request_id)
+        try:
+            # Get success status and download url
+            success, download_url = await poll_report(client, account_id, report_name,
+                                                      start_date, end_date, request_id, resumed=resumed)
+
+        except Exception as some_error: # pylint: disable=broad-except,unused-variable
+            LOGGER.info('The request_id %s for %s is invalid, generating a new one',
+                        request_id,
+                        state_key)
+            request_id = await run_blocking(get_report_request_id, client, account_id, report_stream,
+                                            report_name, start_date, end_date,
+                                            state_key, force_refresh=True)
+
+            singer.write_bookmark(STATE, state_key, 'request_id', request_id)
+            singer.write_state(STATE)
+
+            success, download_url = await poll_report(client, account_id, report_name,
+                                                      start_date, end_date, request_id)
 
     if success and download_url: # pylint: disable=no-else-return
         LOGGER.info('Streaming report: %s for account %s - from %s to %s',
                     report_name, account_id, start_date, end_date)
 
-        stream_report(report_stream.stream,
-                      report_name,
-                      download_url,
-                      report_time)
+        async with SCHEDULER.slot('downloads'):
+            await run_blocking(stream_report,
+                               report_stream.stream,
+                               report_name,
+                               download_url,
+                               report_time)
         singer.write_bookmark(STATE, state_key, 'request_id', None)
         singer.write_bookmark(STATE, state_key, 'date', end_date.isoformat())
         singer.write_state(STATE)
@@ -1002,8 +2590,8 @@ def build_report_request(client, account_id, report_stream, report_name,
 
     excluded_fields = ['_sdc_report_datetime']
 
-    selected_fields = get_selected_fields(report_stream,
-                                          exclude=excluded_fields)
+    selected_fields = get_projection_plan(report_stream,
+                                          exclude=excluded_fields).selected_fields
 
     report_columns = client.factory.create(
         'ArrayOf{}Column'.format(report_name)
@@ -1036,7 +2624,7 @@ def build_report_request(client, account_id, report_stream, report_name,
 
 async def sync_reports(account_id, catalog):
     # Sync report stream
-    client = create_sdk_client('ReportingService', account_id)
+    client = await run_blocking(create_sdk_client, 'ReportingService', account_id)
 
     reports_to_sync = filter(lambda x: x.is_selected() and x.stream[-6:] == 'report',
                              catalog.streams)
@@ -1058,13 +2646,18 @@ async def sync_account_data(account_id, catalog, selected_streams):
     if len(all_core_streams & set(selected_streams)):
         # Sync all core objects streams
         LOGGER.info('Syncing core objects')
-        sync_core_objects(account_id, selected_streams)
+        await CORE_SYNC_EXECUTOR.run(sync_core_objects, account_id, selected_streams)
 
     if len(all_report_streams & set(selected_streams)):
         # Sync all report streams
         LOGGER.info('Syncing reports')
         await sync_reports(account_id, catalog)
 
+async def sync_account_data_with_limit(account_id, catalog, selected_streams):
+    # Wait for an account slot of the scheduler before syncing the account
+    async with SCHEDULER.slot('accounts'):
+        await sync_account_data(account_id, catalog, selected_streams)
+
 # run sync mode
 async def do_sync_all_accounts(account_ids, catalog):
     selected_streams = {}
@@ -1075,24 +2668,128 @@ async def do_sync_all_accounts(account_ids, catalog):
         LOGGER.info('Syncing Accounts')
         sync_accounts_stream(account_ids, selected_streams['accounts'])
 
+    SCHEDULER.configure()
     sync_account_data_tasks = [
-        sync_account_data(account_id, catalog, selected_streams)
+        sync_account_data_with_limit(account_id, catalog, selected_streams)
         for account_id in account_ids
     ]
-    await asyncio.gather(*sync_account_data_tasks)
+    try:
+        await asyncio.gather(*sync_account_data_tasks)
+    finally:
+        EXECUTOR.shutdown()
+        CORE_SYNC_EXECUTOR.shutdown()
+        REPORT_PARSER_POOL.shutdown()
+    CLIENT_REGISTRY.log_stats()
+    SCHEDULER.log_stats()
+    REPORT_POLLER.log_stats()
+    RATE_LIMITER.log_stats()
+    HTTP_POOL.log_stats()
+    SCHEMA_REGISTRY.log_stats()
+
+class MessageWriter: # pylint: disable=too-many-instance-attributes
+    """
+    Write the Singer messages of the sync to stdout from a dedicated thread, so a slow target does not stall the
+    API calls and the report parsing. While in use it replaces sys.stdout: each message written by singer, from any
+    thread, is queued in the order it was written and the writer thread writes and flushes the queued messages in
+    batches. A full queue blocks the threads writing messages, `wait_time` adds up how long they waited.
+    """
+    def __init__(self, stream, queue_size, batch_size=MESSAGE_BATCH_SIZE):
+        self._stream = stream
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._thread = threading.Thread(target=self._run, name='tap-bing-ads-writer', daemon=True)
+        self._redirect = redirect_stdout(self)
+        self._lock = threading.Lock()
+        self._error = None
+        self.messages = 0
+        self.batches = 0
+        self.blocked_writes = 0
+        self.wait_time = 0.0
+
+    def write(self, text):
+        if self._error is not None:
+            raise self._error
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            wait_start = time.monotonic()
+            self._queue.put(text)
+            with self._lock:
+                self.blocked_writes += 1
+                self.wait_time += time.monotonic() - wait_start
+        return len(text)
+
+    def flush(self):
+        # The writer thread flushes stdout after each batch
+        pass
+
+    def _run(self):
+        done = False
+        while not done:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if self._error is not None or not batch:
+                # Keep emptying the queue so the threads writing messages are not blocked
+                continue
+            try:
+                self._stream.write(''.join(batch))
+                self._stream.flush()
+            except Exception as err: # pylint: disable=broad-except
+                self._error = err
+            self.messages += len(batch)
+            self.batches += 1
+
+    def __enter__(self):
+        self._thread.start()
+        self._redirect.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._redirect.__exit__(exc_type, exc_value, traceback)
+        self._queue.put(None)
+        self._thread.join()
+        self.log_stats()
+        if self._error is not None and exc_type is None:
+            raise self._error
+
+    def log_stats(self):
+        LOGGER.info('Message writer: %s messages in %s batches, writes blocked %s times for %.1fs',
+                    self.messages, self.batches, self.blocked_writes, self.wait_time)
+        metrics.log(LOGGER, metrics.Point('timer', 'message_queue_wait', self.wait_time, {'blocked_writes': self.blocked_writes}))
+
+def get_message_queue_size():
+    # Get the number of messages queued for the writer thread from the config
+    return get_positive_int_config('message_queue_size', MESSAGE_QUEUE_SIZE)
+
+def pop_offline_arg():
+    # `--offline` is not a standard singer arg, remove it before the args are parsed
+    if '--offline' in sys.argv:
+        sys.argv.remove('--offline')
+        return True
+    return False
 
 async def main_impl():
+    offline = pop_offline_arg()
     args = utils.parse_args(REQUIRED_CONFIG_KEYS)
 
     CONFIG.update(args.config)
     STATE.update(args.state)
+    HTTP_POOL.configure()
     account_ids = CONFIG['account_ids'].split(",")
 
     if args.discover: # Discover mode
-        do_discover(account_ids)
+        do_discover(account_ids, offline=offline)
         LOGGER.info("Discovery complete")
     elif args.catalog: # Sync mode
-        await do_sync_all_accounts(account_ids, args.catalog)
+        with MessageWriter(sys.stdout, get_message_queue_size()):
+            await do_sync_all_accounts(account_ids, args.catalog)
         LOGGER.info("Sync Completed")
     else:
         LOGGER.info("No catalog was provided")
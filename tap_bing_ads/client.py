@@ -0,0 +1,228 @@
+# Imported lazily by tap_bing_ads, so that the Bing Ads SDK is only loaded once a service client is needed
+# pylint: disable=cyclic-import
+import copy
+import io
+import socket
+from urllib.error import URLError
+
+import requests
+from bingads import ServiceClient
+from bingads.headerplugin import HeaderPlugin
+from suds.bindings.multiref import MultiRef
+from suds.cache import ObjectCache
+from suds.client import Client, ServiceSelector
+from suds.options import Options
+from suds import WebFault
+from suds.sudsobject import Facade
+from suds.transport import Reply, TransportError
+from suds.transport.http import HttpTransport
+
+from tap_bing_ads import (API_VERSION, LOGGER, OAUTH_TOKEN_MANAGER, SESSION, bing_ads_error_handling,
+                          get_request_timeout, get_user_agent, get_wsdl_cache, log_service_call)
+
+
+class SessionTransport(HttpTransport):
+    """
+    Suds transport making the SOAP calls with the HTTP session of the tap, so they reuse the kept alive
+    connections of its pool instead of opening a connection per call. WSDLs from files are read by suds.
+    """
+    def open(self, request):
+        if not request.url.startswith(('https://', 'http://')):
+            return super().open(request)
+        response = self.request('GET', request.url, headers=request.headers, timeout=self.options.timeout)
+        if response.status_code != 200:
+            raise TransportError(response.reason, response.status_code, io.BytesIO(response.content))
+        return io.BytesIO(response.content)
+
+    def send(self, request):
+        response = self.request('POST', request.url, data=request.message, headers=request.headers,
+                                timeout=request.timeout or self.options.timeout)
+        if response.status_code in (202, 204):
+            return None
+        if response.status_code != 200:
+            raise TransportError(response.reason, response.status_code, io.BytesIO(response.content))
+        return Reply(200, response.headers, response.content)
+
+    @staticmethod
+    def request(method, url, **kwargs):
+        # Make the request, raising its timeouts and connection errors as the stock suds transport does.
+        # They must not be transport errors, suds would take those for an empty reply and return None.
+        try:
+            return SESSION.request(method, url, **kwargs)
+        except requests.exceptions.Timeout as ex:
+            raise socket.timeout(str(ex)) from ex
+        except requests.exceptions.RequestException as ex:
+            raise URLError(ex) from ex
+
+
+class WsdlCache(ObjectCache):
+    """
+    Pickled parsed WSDL cache whose entries are keyed by the digest of the raw WSDL they were parsed from,
+    on top of the hash of the WSDL url suds keys them by.
+    """
+    def __init__(self, location, wsdl_digest, **duration):
+        super().__init__(location, **duration)
+        self.wsdl_digest = wsdl_digest
+
+    def _key(self, id): # pylint: disable=redefined-builtin
+        return '{}-{}'.format(id, self.wsdl_digest)
+
+    def _getf(self, id): # pylint: disable=redefined-builtin
+        return super()._getf(self._key(id))
+
+    def put(self, id, object): # pylint: disable=redefined-builtin
+        return super().put(self._key(id), object)
+
+    def purge(self, id): # pylint: disable=redefined-builtin
+        super().purge(self._key(id))
+
+
+class ReplyMultiRef: # pylint: disable=too-few-public-methods
+    """
+    Resolve the multirefs of each SOAP reply with a MultiRef of its own. The MultiRef of a suds binding keeps
+    the nodes of the reply it processes on the binding, which is shared by all the clients of the parsed WSDL,
+    so replies processed at the same time on several threads could swap or merge their bodies.
+    """
+    @staticmethod
+    def process(body):
+        return MultiRef().process(body)
+
+
+def isolate_reply_processing(wsdl):
+    # Give the bindings of every method of the WSDL a multiref resolver without state shared between replies
+    for service in wsdl.services:
+        for port in service.ports:
+            for method in port.methods.values():
+                method.binding.input.multiref = ReplyMultiRef()
+                method.binding.output.multiref = ReplyMultiRef()
+
+
+def get_wsdl_view(wsdl, options):
+    """
+    Return a view of the parsed WSDL whose method bindings read the given suds options. suds builds the SOAP
+    header of a call from the options of the WSDL of its binding, so a client sharing the bindings of another
+    one would send the other client's headers. The view shares everything else, the schema and types included.
+    """
+    view = copy.copy(wsdl)
+    view.options = options
+    view_bindings = {}
+
+    def get_view_binding(binding):
+        if id(binding) not in view_bindings:
+            view_binding = copy.copy(binding)
+            view_binding.wsdl = view
+            view_bindings[id(binding)] = view_binding
+        return view_bindings[id(binding)]
+
+    view.services = []
+    for service in wsdl.services:
+        view_service = copy.copy(service)
+        view_service.ports = []
+        for port in service.ports:
+            view_port = copy.copy(port)
+            view_port.methods = {}
+            for name, method in port.methods.items():
+                # the method facade built like suds does when it reads the WSDL
+                view_method = Facade('Method')
+                view_method.name = method.name
+                view_method.location = method.location
+                view_method.binding = Facade('binding')
+                view_method.soap = method.soap
+                view_method.binding.input = get_view_binding(method.binding.input)
+                view_method.binding.output = get_view_binding(method.binding.output)
+                view_port.methods[name] = view_method
+            view_service.ports.append(view_port)
+        view.services.append(view_service)
+    return view
+
+
+class ExpiredTokenRetry: # pylint: disable=too-few-public-methods
+    """
+    Service call made once more with a refreshed access token when Bing rejects its token as expired,
+    error code 109. It replaces the retry of the SDK, which the clients turn off to let the token manager
+    refresh the tokens, for the tokens expiring earlier than known or without a known expiry.
+    """
+    def __init__(self, service_client, service_call):
+        self.service_client = service_client
+        self.service_call = service_call
+        self.name = service_call.name
+
+    def __call__(self, *args, **kwargs):
+        access_token = self.service_client.authorization_data.authentication.oauth_tokens.access_token
+        try:
+            return self.service_call(*args, **kwargs)
+        except WebFault as ex:
+            if not ServiceClient._is_expired_token_exception(ex): # pylint: disable=protected-access
+                raise
+        LOGGER.info('Access token expired while calling %s', self.name)
+        self.service_client.authorization_data.authentication = \
+            OAUTH_TOKEN_MANAGER.refresh_expired_access_token(access_token)
+        # The SOAP headers carrying the access token are set again from the refreshed authentication
+        self.service_client.set_options(**self.service_client._options) # pylint: disable=protected-access
+        return self.service_call(*args, **kwargs)
+
+
+class CustomServiceClient(ServiceClient):
+    # This class calling the methods of the specified Bing Ads service.
+    @bing_ads_error_handling
+    def __init__(self, name, **kwargs):
+        # Initializes a new instance of this ServiceClient class.
+        # `cachingpolicy` 1 makes suds pickle the parsed WSDL instead of the raw XML documents.
+        kwargs.setdefault('cache', get_wsdl_cache(name))
+        kwargs.setdefault('cachingpolicy', 1)
+        kwargs.setdefault('transport', SessionTransport())
+        super().__init__(name, API_VERSION, **kwargs)
+        # The transport stays set on the suds client, it is not passed again with the options of every call
+        self._options.pop('transport')
+        # The calls of the client and of its retargeted copies run on several threads and process their replies
+        # with the bindings of the WSDL
+        isolate_reply_processing(self._soap_client.wsdl)
+        # The access token is refreshed by the OAuth token manager before each call, with its expiry margin and lock,
+        # and once more by `ExpiredTokenRetry` when Bing rejects it as expired, instead of by the SDK
+        self.refresh_oauth_tokens_automatically = False
+
+    def __getattr__(self, name):
+        # Log and return service call(suds client call) object
+        # The authentication is taken from the token manager before the SDK sets the options carrying its access token
+        if self._authorization_data is not None:
+            self._authorization_data.authentication = OAUTH_TOKEN_MANAGER.get_authentication()
+        service_method = ExpiredTokenRetry(self, super(CustomServiceClient, self).__getattr__(name))
+        return log_service_call(service_method, self._authorization_data.account_id,
+                                self._service, self._authorization_data.customer_id)
+
+    def set_options(self, **kwargs):
+        # Set suds options, these options will be passed to suds.
+        self._options = kwargs # pylint: disable=attribute-defined-outside-init
+
+        kwargs = ServiceClient._ensemble_header(self.authorization_data, **self._options)
+        kwargs['headers']['User-Agent'] = get_user_agent()
+        # setting the timeout parameter using the set_options which sets timeout in the _soap_client
+        kwargs['timeout'] = get_request_timeout()
+        self._soap_client.set_options(**kwargs)
+
+    def retarget(self, authorization_data):
+        """
+        Return a client of the same service calling the API with other authorization data.
+        The new client gets its own suds options, transport, header plugin and last messages, and a view of
+        the parsed WSDL whose bindings send the SOAP headers of its own options. The bindings keep no state per
+        reply since `isolate_reply_processing`, so the clients can make their calls at the same time.
+        """
+        client = CustomServiceClient.__new__(CustomServiceClient)
+        client.__dict__.update(self.__dict__)
+        client._authorization_data = authorization_data # pylint: disable=protected-access
+        client.hp = HeaderPlugin()
+        client._options = {**self._options, 'plugins': [client.hp]} # pylint: disable=protected-access
+
+        soap_client = Client.__new__(Client)
+        soap_client.__dict__.update(self._soap_client.__dict__)
+        soap_client.options = Options()
+        soap_client.set_options(**{
+            **self._soap_client.options.__pts__.defined,
+            'transport': SessionTransport(),
+            'plugins': [client.hp]
+        })
+        soap_client.wsdl = get_wsdl_view(self._soap_client.wsdl, soap_client.options)
+        soap_client.service = ServiceSelector(soap_client, soap_client.wsdl.services)
+        soap_client.messages = {'tx': None, 'rx': None}
+        client._soap_client = soap_client # pylint: disable=protected-access
+        return client
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+import tap_bing_ads
+
+NUM_CAMPAIGNS = 12
+
+
+class MockCampaignClient():
+    '''Mocked campaign management client with two ad groups per campaign and one ad per ad group'''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []
+
+    def GetCampaignsByAccountId(self, AccountId, CampaignType):
+        return {'Campaign': [{'Id': campaign_id} for campaign_id in range(1, NUM_CAMPAIGNS + 1)]}
+
+    def GetAdGroupsByCampaignId(self, CampaignId):
+        # the later campaigns take longer to expand
+        time.sleep(0.005 * CampaignId)
+        with self.lock:
+            self.events.append(('campaign', CampaignId))
+        return {'AdGroup': [{'Id': CampaignId * 100 + i} for i in range(2)]}
+
+    def GetAdsByAdGroupId(self, AdGroupId, AdTypes):
+        with self.lock:
+            self.events.append(('ad_group', AdGroupId))
+        return {'Ad': [{'Id': AdGroupId * 10}]}
+
+
+@mock.patch("tap_bing_ads.get_core_schema", return_value={})
+@mock.patch("tap_bing_ads.write_schema")
+@mock.patch("tap_bing_ads.sobject_to_dict", side_effect=lambda response: response)
+@mock.patch("tap_bing_ads.get_projection_plan")
+@mock.patch("singer.write_records")
+class TestAdGroupsExpansion(unittest.TestCase):
+    """A set of unit tests to ensure that the campaigns are expanded concurrently and their ad groups streamed into the ads"""
+
+    def setUp(self):
+        tap_bing_ads.CONFIG = {'ad_groups_fan_out_width': 2, 'ads_fan_out_width': 2}
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    def get_written_ids(self, mock_write_records, stream_name):
+        return [record['Id'] for call in mock_write_records.mock_calls if call.args[0] == stream_name
+                for record in call.args[1]]
+
+    @mock.patch("tap_bing_ads.create_sdk_client")
+    def test_ads_fetched_while_campaigns_expanded(self, mock_create_sdk_client, mock_write_records,
+                                                  mock_get_projection_plan, mock_sobject_to_dict, *args):
+        """
+        Verify that the ads of the first ad groups are fetched before all the campaigns are expanded,
+        and the ad groups and ads are written in order
+        """
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda records: records
+        client = MockCampaignClient()
+        mock_create_sdk_client.return_value = client
+        tap_bing_ads.sync_core_objects('a1', {'ad_groups': 'ad_groups_catalog_entry', 'ads': 'ads_catalog_entry'})
+
+        first_ad_group_event = client.events.index(('ad_group', 100))
+        last_campaign_event = client.events.index(('campaign', NUM_CAMPAIGNS))
+        self.assertLess(first_ad_group_event, last_campaign_event)
+
+        ad_group_ids = [campaign_id * 100 + i for campaign_id in range(1, NUM_CAMPAIGNS + 1) for i in range(2)]
+        self.assertEqual(self.get_written_ids(mock_write_records, 'ad_groups'), ad_group_ids)
+        self.assertEqual(self.get_written_ids(mock_write_records, 'ads'), [ad_group_id * 10 for ad_group_id in ad_group_ids])
+        # one conversion per response: the campaigns, the ad groups of each campaign and the ads of each ad group
+        self.assertEqual(mock_sobject_to_dict.call_count, 1 + NUM_CAMPAIGNS + len(ad_group_ids))
+
+    def test_sync_ad_groups(self, mock_write_records, mock_get_projection_plan, mock_sobject_to_dict,
+                            mock_write_schema, mock_get_core_schema):
+        """
+        Verify that syncing only the ad groups writes them, with their schema looked up and written once,
+        and returns all their ids
+        """
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda records: records
+        ad_group_ids = tap_bing_ads.sync_ad_groups(MockCampaignClient(), 'a1', map(lambda x: x, [3, 1, 2]),
+                                                   {'ad_groups': 'ad_groups_catalog_entry'})
+
+        self.assertEqual(ad_group_ids, [300, 301, 100, 101, 200, 201])
+        self.assertEqual(self.get_written_ids(mock_write_records, 'ad_groups'), ad_group_ids)
+        self.assertEqual(mock_get_core_schema.call_count, 1)
+        mock_write_schema.assert_called_once_with('ad_groups', {}, ['Id'])
@@ -0,0 +1,102 @@
+import random
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+import tap_bing_ads
+
+
+class MockCampaignClient():
+    '''Mocked campaign management client returning one ad per ad group after a random delay'''
+    def __init__(self, failures=None):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+        self.failures = dict(failures or {})
+
+    def GetAdsByAdGroupId(self, AdGroupId, AdTypes):
+        with self.lock:
+            self.calls.append(AdGroupId)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            error = self.failures.pop(AdGroupId, None)
+        try:
+            time.sleep(random.uniform(0.001, 0.02))
+            if error:
+                raise error
+            if AdGroupId % 3 == 0:
+                return {}
+            return {'Ad': [{'Id': AdGroupId * 10, 'Title': 'ad of {}'.format(AdGroupId)}]}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@mock.patch("tap_bing_ads.get_core_schema", return_value={})
+@mock.patch("tap_bing_ads.write_schema")
+@mock.patch("tap_bing_ads.sobject_to_dict", side_effect=lambda response: response)
+@mock.patch("tap_bing_ads.get_projection_plan")
+@mock.patch("singer.write_records")
+class TestAdsFanOut(unittest.TestCase):
+    """A set of unit tests to ensure that the ads of the ad groups are fetched concurrently and written in order"""
+
+    def setUp(self):
+        tap_bing_ads.CONFIG = {'ads_fan_out_width': 4}
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    def get_written_ads(self, mock_write_records):
+        return [ad for call in mock_write_records.mock_calls for ad in call.args[1]]
+
+    def test_ads_written_in_ad_group_order(self, mock_write_records, mock_get_projection_plan, *args):
+        """
+        Verify that the calls run concurrently up to the width and the ads are written in the order of the ad groups
+        """
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda ads: ads
+        client = MockCampaignClient()
+        ad_group_ids = list(range(1, 101))
+        tap_bing_ads.sync_ads(client, {'ads': 'ads_catalog_entry'}, ad_group_ids)
+
+        self.assertEqual(sorted(client.calls), ad_group_ids)
+        self.assertGreater(client.max_running, 1)
+        self.assertLessEqual(client.max_running, 4)
+        self.assertEqual([ad['Id'] for ad in self.get_written_ads(mock_write_records)],
+                         [ad_group_id * 10 for ad_group_id in ad_group_ids if ad_group_id % 3 != 0])
+
+    def test_schema_written_once(self, mock_write_records, mock_get_projection_plan, mock_sobject_to_dict,
+                                 mock_write_schema, mock_get_core_schema):
+        """
+        Verify that the schema of the ads is looked up and written once per sync, not per ad group
+        """
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda ads: ads
+        tap_bing_ads.sync_ads(MockCampaignClient(), {'ads': 'ads_catalog_entry'}, list(range(1, 21)))
+
+        self.assertEqual(mock_get_core_schema.call_count, 1)
+        mock_write_schema.assert_called_once_with('ads', {}, ['Id'])
+        self.assertEqual(mock_get_projection_plan.call_count, 1)
+
+    @mock.patch("backoff._sync.time.sleep")
+    def test_failed_call_retried(self, mock_sleep, mock_write_records, mock_get_projection_plan, *args):
+        """
+        Verify that a failed call is retried on its own without changing the order of the ads
+        """
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda ads: ads
+        client = MockCampaignClient(failures={5: ConnectionResetError(104, 'Connection reset by peer')})
+        tap_bing_ads.sync_ads(client, {'ads': 'ads_catalog_entry'}, list(range(1, 11)))
+
+        self.assertEqual(client.calls.count(5), 2)
+        self.assertEqual(len(client.calls), 11)
+        self.assertEqual([ad['Id'] for ad in self.get_written_ads(mock_write_records)], [10, 20, 40, 50, 70, 80, 100])
+
+    def test_error_raised(self, mock_write_records, mock_get_projection_plan, *args):
+        """
+        Verify that an error which is not retried is raised and the calls of the remaining ad groups are not made
+        """
+        client = MockCampaignClient(failures={2: ValueError('invalid ad group')})
+        with self.assertRaises(ValueError):
+            tap_bing_ads.sync_ads(client, {'ads': 'ads_catalog_entry'}, list(range(1, 1001)))
+        self.assertLess(len(client.calls), 1000)
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+import arrow
+import singer
+
+import tap_bing_ads
+
+LOGGER = singer.get_logger()
+
+CALL_DURATION = 0.2
+
+
+class MockPollResponse():
+    '''Mocked response of PollGenerateReport of a generated report without data'''
+    Status = 'Success'
+    ReportDownloadUrl = None
+
+
+class MockReportingClient():
+    '''Mocked reporting service client whose calls block like a SOAP round-trip to Bing'''
+    def __init__(self):
+        self.threads = set()
+        self.lock = threading.Lock()
+        self.active_calls = 0
+        self.max_active_calls = 0
+
+    def PollGenerateReport(self, request_id):
+        with self.lock:
+            self.threads.add(threading.current_thread().name)
+            self.active_calls += 1
+            self.max_active_calls = max(self.max_active_calls, self.active_calls)
+        time.sleep(CALL_DURATION)
+        with self.lock:
+            self.active_calls -= 1
+        return MockPollResponse()
+
+
+async def poll_reports(client, num_reports):
+    '''Poll the reports concurrently like the report syncs of the accounts'''
+    return await asyncio.gather(*[
+        tap_bing_ads.poll_report(client, 'a1', 'AdPerformanceReport', arrow.get('2024-01-01'), arrow.get('2024-01-31'),
+                                 'request_{}'.format(i))
+        for i in range(num_reports)
+    ])
+
+
+class TestBlockingCallExecutor(unittest.TestCase):
+    """A set of unit tests to ensure that the blocking report calls run on the thread pool and overlap"""
+
+    def tearDown(self):
+        tap_bing_ads.EXECUTOR.shutdown()
+        tap_bing_ads.CONFIG = {}
+        tap_bing_ads.STATE.clear()
+
+    def get_max_active_polls(self, max_workers, num_reports):
+        '''Return the peak number of concurrent polls of the reports with the given pool size'''
+        tap_bing_ads.EXECUTOR.shutdown()
+        tap_bing_ads.CONFIG = {'max_workers': max_workers}
+        # without completion times, the reports are polled right away
+        tap_bing_ads.STATE.clear()
+        client = MockReportingClient()
+        start = time.monotonic()
+        results = asyncio.run(poll_reports(client, num_reports))
+        duration = time.monotonic() - start
+
+        self.assertEqual(results, [(True, None)] * num_reports)
+        self.assertNotIn(threading.current_thread().name, client.threads)
+        LOGGER.info('Polled %s reports with %s threads in %.2fs', num_reports, max_workers, duration)
+        return client.max_active_calls
+
+    def test_poll_calls_overlap(self):
+        """
+        Verify that the report polls run one at a time on one thread, and overlap up to the pool size
+        """
+        self.assertEqual(self.get_max_active_polls(max_workers=1, num_reports=4), 1)
+        max_active_polls = self.get_max_active_polls(max_workers=4, num_reports=4)
+        self.assertGreater(max_active_polls, 1)
+        self.assertLessEqual(max_active_polls, 4)
+
+    def test_max_workers(self):
+        """
+        Verify that the pool size is read from the config and falls back to the default
+        """
+        for max_workers, expected_max_workers in [(None, 10), ('', 10), (0, 10), ('4', 4), (16, 16)]:
+            with self.subTest(max_workers=max_workers):
+                tap_bing_ads.CONFIG = {'max_workers': max_workers}
+                self.assertEqual(tap_bing_ads.get_max_workers(), expected_max_workers)
+
+    def test_core_sync_on_own_pool(self):
+        """
+        Verify that the core object syncs run on their own pool, so a report call does not wait for them to end
+        """
+        tap_bing_ads.CONFIG = {'max_workers': 1, 'max_concurrent_accounts': 2}
+        report_call_made = threading.Event()
+        core_sync_threads = []
+
+        def sync_core_objects(account_id, selected_streams):
+            core_sync_threads.append(threading.current_thread().name)
+            report_call_made.wait(5)
+
+        async def sync_accounts():
+            core_syncs = asyncio.gather(*[tap_bing_ads.sync_account_data(account_id, None, {'campaigns': None})
+                                          for account_id in ['a1', 'a2']])
+            # the report call is made once a core sync holds a thread
+            while not core_sync_threads:
+                await asyncio.sleep(0.01)
+            await tap_bing_ads.run_blocking(report_call_made.set)
+            await core_syncs
+
+        with mock.patch("tap_bing_ads.sync_core_objects", side_effect=sync_core_objects):
+            start = time.monotonic()
+            asyncio.run(sync_accounts())
+        tap_bing_ads.CORE_SYNC_EXECUTOR.shutdown()
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(len(core_sync_threads), 2)
+        self.assertTrue(all(name.startswith('tap-bing-ads-core') for name in core_sync_threads))
+
+    @mock.patch("tap_bing_ads.ThreadPoolExecutor", side_effect=tap_bing_ads.ThreadPoolExecutor)
+    def test_executor_created_once(self, mock_thread_pool_executor):
+        """
+        Verify that the thread pool is created on first use, reused, and created again after a shutdown
+        """
+        executor = tap_bing_ads.BlockingCallExecutor()
+        for _ in range(3):
+            self.assertEqual(asyncio.run(executor.run(sum, [1, 2], start=3)), 6)
+        self.assertEqual(mock_thread_pool_executor.call_count, 1)
+
+        executor.shutdown()
+        asyncio.run(executor.run(sum, [1]))
+        self.assertEqual(mock_thread_pool_executor.call_count, 2)
+        executor.shutdown()
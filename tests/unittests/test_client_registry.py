@@ -0,0 +1,139 @@
+import io
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+import pkg_resources
+from suds.transport import Reply, TransportError
+
+import tap_bing_ads
+from test_concurrent_replies import CAMPAIGN_MANAGEMENT_WSDL, MockAuthentication
+
+CUSTOMER_MANAGEMENT_WSDL = 'file://' + pkg_resources.resource_filename('bingads', 'v13/proxies/production/customermanagement_service.xml')
+
+EXPIRED_TOKEN_FAULT = b'''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body><s:Fault>
+<faultcode>s:Server</faultcode><faultstring>Invalid client data. Check the SOAP fault details for more information.</faultstring>
+<detail><AdApiFaultDetail xmlns="https://adapi.microsoft.com" xmlns:i="http://www.w3.org/2001/XMLSchema-instance">
+<TrackingId>t1</TrackingId><Errors><AdApiError><Code>109</Code><Detail i:nil="true"/><ErrorCode>AuthenticationTokenExpired</ErrorCode>
+<Message>Authentication token expired. Please renew it or obtain a new authentication token.</Message></AdApiError></Errors>
+</AdApiFaultDetail></detail></s:Fault></s:Body></s:Envelope>'''
+
+GET_CAMPAIGNS_RESPONSE = b'''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<GetCampaignsByAccountIdResponse xmlns="https://bingads.microsoft.com/CampaignManagement/v13"><Campaigns/></GetCampaignsByAccountIdResponse>
+</s:Body></s:Envelope>'''
+
+
+@mock.patch("tap_bing_ads.OAUTH_TOKEN_MANAGER.get_authentication", return_value=MockAuthentication())
+@mock.patch("tap_bing_ads.CustomServiceClient.service_url", new_callable=mock.PropertyMock, return_value=CUSTOMER_MANAGEMENT_WSDL)
+class TestServiceClientRegistry(unittest.TestCase):
+    """A set of unit tests to ensure that the service clients are built once and re-targeted per account"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        tap_bing_ads.CONFIG = {'customer_id': 'c1', 'developer_token': 'token', 'wsdl_cache_dir': self.cache_dir.name}
+        self.registry = tap_bing_ads.ServiceClientRegistry()
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+        self.cache_dir.cleanup()
+
+    def test_service_client_built_once(self, mock_service_url, mock_get_authentication):
+        """
+        Verify that the WSDL is loaded once for a service and reused for every account
+        """
+        schema_client = self.registry.get_client('CustomerManagementService')
+        client_1 = self.registry.get_client('CustomerManagementService', 'a1')
+        client_2 = self.registry.get_client('CustomerManagementService', 'a2')
+
+        self.assertIs(self.registry.get_client('CustomerManagementService', 'a1'), client_1)
+        self.assertEqual((self.registry.misses, self.registry.hits), (1, 3))
+
+        # verify that the re-targeted clients share the parsed WSDL
+        self.assertIs(client_1.soap_client.wsdl.schema, schema_client.soap_client.wsdl.schema)
+        self.assertIs(client_2.soap_client.sd, schema_client.soap_client.sd)
+        self.assertIs(client_2.soap_client.factory, schema_client.soap_client.factory)
+        self.assertIsNone(schema_client.authorization_data)
+        self.assertEqual(client_1.authorization_data.account_id, 'a1')
+        self.assertEqual(client_2.authorization_data.account_id, 'a2')
+
+    @mock.patch("tap_bing_ads.TokenBucket.acquire", return_value=0)
+    @mock.patch("tap_bing_ads.client.SessionTransport.send")
+    def test_retargeted_clients_send_own_headers(self, mock_send, mock_acquire, mock_service_url, mock_get_authentication):
+        """
+        Verify that the SOAP envelope sent by each re-targeted client carries the headers of its own account,
+        also after another client made a call
+        """
+        mock_service_url.return_value = CAMPAIGN_MANAGEMENT_WSDL
+        mock_send.return_value = Reply(200, {}, GET_CAMPAIGNS_RESPONSE)
+        client_1 = self.registry.get_client('CampaignManagementService', '333')
+        client_2 = self.registry.get_client('CampaignManagementService', '444')
+        for client in [client_1, client_2, client_1]:
+            client.GetCampaignsByAccountId(AccountId=client.authorization_data.account_id)
+
+        envelopes = [call.args[0].message.decode() for call in mock_send.mock_calls]
+        self.assertEqual([re.search(r'CustomerAccountId>(\w+)<', envelope).group(1) for envelope in envelopes],
+                         ['333', '444', '333'])
+        for envelope in envelopes:
+            self.assertRegex(envelope, r'DeveloperToken>token<')
+            self.assertRegex(envelope, r'AuthenticationToken>access_token<')
+            self.assertRegex(envelope, r'CustomerId>c1<')
+        self.assertIsNot(client_1.soap_client.options.transport, client_2.soap_client.options.transport)
+        self.assertEqual(client_1.soap_client.options.plugins, [client_1.hp])
+
+    @mock.patch("tap_bing_ads.TokenBucket.acquire", return_value=0)
+    @mock.patch("tap_bing_ads.OAUTH_TOKEN_MANAGER.refresh_expired_access_token", return_value=MockAuthentication('refreshed_token'))
+    @mock.patch("tap_bing_ads.client.SessionTransport.send")
+    def test_expired_token_refreshed_once(self, mock_send, mock_refresh_expired_access_token, mock_acquire,
+                                          mock_service_url, mock_get_authentication):
+        """
+        Verify that a call rejected for its expired access token is made again once with the refreshed token
+        """
+        mock_service_url.return_value = CAMPAIGN_MANAGEMENT_WSDL
+        mock_send.side_effect = [TransportError('Internal Server Error', 500, io.BytesIO(EXPIRED_TOKEN_FAULT)),
+                                 Reply(200, {}, GET_CAMPAIGNS_RESPONSE)]
+        client = self.registry.get_client('CampaignManagementService', '333')
+        client.GetCampaignsByAccountId(AccountId='333')
+
+        mock_refresh_expired_access_token.assert_called_once_with('access_token')
+        envelopes = [call.args[0].message.decode() for call in mock_send.mock_calls]
+        self.assertEqual([re.search(r'AuthenticationToken>(\w+)<', envelope).group(1) for envelope in envelopes],
+                         ['access_token', 'refreshed_token'])
+
+        # a call rejected again is not retried twice
+        mock_send.side_effect = [TransportError('Internal Server Error', 500, io.BytesIO(EXPIRED_TOKEN_FAULT))] * 2
+        with self.assertRaises(Exception):
+            client.GetCampaignsByAccountId(AccountId='333')
+        self.assertEqual(mock_send.call_count, 4)
+
+    def test_bindings_per_client_keep_no_reply_state(self, mock_service_url, mock_get_authentication):
+        """
+        Verify that each re-targeted client calls through bindings reading its own options, which resolve the
+        multirefs of each reply with a MultiRef of its own
+        """
+        client_1 = self.registry.get_client('CustomerManagementService', 'a1')
+        client_2 = self.registry.get_client('CustomerManagementService', 'a2')
+
+        method_1 = client_1.soap_client.service.GetUser.method
+        method_2 = client_2.soap_client.service.GetUser.method
+        self.assertIsNot(method_1.binding.input, method_2.binding.input)
+        self.assertIs(method_1.binding.input.options(), client_1.soap_client.options)
+        self.assertIs(method_2.binding.output.options(), client_2.soap_client.options)
+        self.assertIsInstance(method_1.binding.input.multiref, tap_bing_ads.client.ReplyMultiRef)
+        self.assertIsInstance(method_1.binding.output.multiref, tap_bing_ads.client.ReplyMultiRef)
+
+    def test_authentication_from_token_manager(self, mock_service_url, mock_get_authentication):
+        """
+        Verify that a re-targeted client takes its authentication from the token manager before each call,
+        and does not let the SDK refresh the access token
+        """
+        client = self.registry.get_client('CustomerManagementService', 'a1')
+        self.assertFalse(client.refresh_oauth_tokens_automatically)
+
+        # the token manager replaced the authentication, e.g. its refresh token was exchanged again
+        authentication = MockAuthentication()
+        mock_get_authentication.return_value = authentication
+        self.assertTrue(callable(client.GetUser))
+
+        self.assertIs(client.authorization_data.authentication, authentication)
+        self.assertEqual(mock_get_authentication.call_count, 2)
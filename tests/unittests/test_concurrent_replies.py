@@ -0,0 +1,166 @@
+import asyncio
+import re
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import arrow
+import pkg_resources
+from suds.bindings.multiref import MultiRef
+from suds.transport import Reply
+
+import tap_bing_ads
+
+CAMPAIGN_MANAGEMENT_WSDL = 'file://' + pkg_resources.resource_filename('bingads', 'v13/proxies/production/campaignmanagement_service.xml')
+REPORTING_WSDL = 'file://' + pkg_resources.resource_filename('bingads', 'v13/proxies/production/reporting_service.xml')
+
+GET_ADS_RESPONSE = '''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<GetAdsByAdGroupIdResponse xmlns="https://bingads.microsoft.com/CampaignManagement/v13"><Ads xmlns:i="http://www.w3.org/2001/XMLSchema-instance">
+<Ad i:type="ExpandedTextAd"><Id>{0}</Id><TitlePart1>ad of {0}</TitlePart1></Ad></Ads></GetAdsByAdGroupIdResponse>
+</s:Body></s:Envelope>'''
+
+GET_AD_GROUPS_RESPONSE = '''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<GetAdGroupsByCampaignIdResponse xmlns="https://bingads.microsoft.com/CampaignManagement/v13"><AdGroups>
+<AdGroup><Id>{0}00</Id><Name>ad group of {0}</Name></AdGroup><AdGroup><Id>{0}01</Id><Name>ad group of {0}</Name></AdGroup>
+</AdGroups></GetAdGroupsByCampaignIdResponse>
+</s:Body></s:Envelope>'''
+
+GET_CAMPAIGNS_RESPONSE = '''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<GetCampaignsByAccountIdResponse xmlns="https://bingads.microsoft.com/CampaignManagement/v13"><Campaigns>
+<Campaign><Id>{0}</Id><Name>campaign of {0}</Name></Campaign>
+</Campaigns></GetCampaignsByAccountIdResponse>
+</s:Body></s:Envelope>'''
+
+POLL_GENERATE_REPORT_RESPONSE = '''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<PollGenerateReportResponse xmlns="https://bingads.microsoft.com/Reporting/v13"><ReportRequestStatus>
+<ReportDownloadUrl>https://download/{0}</ReportDownloadUrl><Status>Success</Status>
+</ReportRequestStatus></PollGenerateReportResponse>
+</s:Body></s:Envelope>'''
+
+BUILD_CATALOG = MultiRef.build_catalog
+
+
+class MockAuthentication():
+    '''Mocked OAuth authentication adding the access token to the request headers'''
+    def __init__(self, access_token='access_token'):
+        self.oauth_tokens = SimpleNamespace(access_token=access_token)
+
+    def enrich_headers(self, headers):
+        '''Mocked enrich_headers method of the authentication'''
+        headers['AuthenticationToken'] = self.oauth_tokens.access_token
+
+
+def get_send_reply(response, id_pattern):
+    '''Return a mocked transport send replying with the response formatted with the id the pattern finds in the request'''
+    def send_reply(transport, request):
+        request_id = re.search(id_pattern, request.message).group(1).decode()
+        return Reply(200, {}, response.format(request_id).encode())
+    return send_reply
+
+
+def slow_build_catalog(multiref, body):
+    '''MultiRef.build_catalog taking long enough for the replies processed on other threads to interleave'''
+    BUILD_CATALOG(multiref, body)
+    time.sleep(0.001)
+
+
+@mock.patch("tap_bing_ads.LOGGER")
+@mock.patch("tap_bing_ads.TokenBucket.acquire", return_value=0)
+@mock.patch("tap_bing_ads.OAUTH_TOKEN_MANAGER.get_authentication", return_value=MockAuthentication())
+@mock.patch("suds.bindings.multiref.MultiRef.build_catalog", slow_build_catalog)
+@mock.patch("tap_bing_ads.get_core_schema", return_value={})
+@mock.patch("tap_bing_ads.write_schema")
+@mock.patch("tap_bing_ads.get_projection_plan")
+@mock.patch("singer.write_records")
+class TestConcurrentReplies(unittest.TestCase):
+    """
+    A set of unit tests to ensure that the replies of the calls made at the same time with the shared WSDL
+    are parsed by suds each into the records of their own request
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        tap_bing_ads.CONFIG = {'customer_id': 'c1', 'developer_token': 'token', 'wsdl_cache_dir': self.cache_dir.name,
+                               'ads_fan_out_width': 8, 'ad_groups_fan_out_width': 4, 'max_concurrent_accounts': 10,
+                               'report_poll_batch_size': 20}
+        tap_bing_ads.REPORT_POLLER = tap_bing_ads.ReportPoller()
+        tap_bing_ads.STATE.clear()
+
+    def tearDown(self):
+        tap_bing_ads.REPORT_POLLER = tap_bing_ads.ReportPoller()
+        tap_bing_ads.EXECUTOR.shutdown()
+        tap_bing_ads.CORE_SYNC_EXECUTOR.shutdown()
+        tap_bing_ads.STATE.clear()
+        tap_bing_ads.CONFIG = {}
+        self.cache_dir.cleanup()
+
+    def serve(self, wsdl, response, id_pattern):
+        # Build the clients from the WSDL and reply to each of their calls with the response of its request id
+        for patcher in [mock.patch("tap_bing_ads.CustomServiceClient.service_url", new_callable=mock.PropertyMock, return_value=wsdl),
+                        mock.patch("tap_bing_ads.client.SessionTransport.send", get_send_reply(response, id_pattern))]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ads_fan_out(self, mock_write_records, mock_get_projection_plan, *args):
+        """
+        Verify that the ads fetched at the same time are each parsed into the ad of their own ad group
+        """
+        self.serve(CAMPAIGN_MANAGEMENT_WSDL, GET_ADS_RESPONSE, rb'AdGroupId>(\d+)<')
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda records: records
+        client = tap_bing_ads.ServiceClientRegistry().get_client('CampaignManagementService', 'a1')
+        ad_group_ids = list(range(1, 201))
+        tap_bing_ads.sync_ads(client, {'ads': 'ads_catalog_entry'}, ad_group_ids)
+
+        self.assertEqual([[ad['Id'] for ad in call.args[1]] for call in mock_write_records.mock_calls],
+                         [[ad_group_id] for ad_group_id in ad_group_ids])
+
+    def test_ad_groups_expansion(self, mock_write_records, mock_get_projection_plan, *args):
+        """
+        Verify that the campaigns expanded at the same time are each parsed into the ad groups of their own campaign
+        """
+        self.serve(CAMPAIGN_MANAGEMENT_WSDL, GET_AD_GROUPS_RESPONSE, rb'CampaignId>(\d+)<')
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda records: records
+        client = tap_bing_ads.ServiceClientRegistry().get_client('CampaignManagementService', 'a1')
+        campaign_ids = list(range(1, 101))
+        ad_group_ids = tap_bing_ads.sync_ad_groups(client, 'a1', campaign_ids, {'ad_groups': 'ad_groups_catalog_entry'})
+
+        self.assertEqual(ad_group_ids, [campaign_id * 100 + i for campaign_id in campaign_ids for i in range(2)])
+        self.assertEqual([[ad_group['Name'] for ad_group in call.args[1]] for call in mock_write_records.mock_calls],
+                         [['ad group of {}'.format(campaign_id)] * 2 for campaign_id in campaign_ids])
+
+    @mock.patch("tap_bing_ads.CLIENT_REGISTRY", new_callable=tap_bing_ads.ServiceClientRegistry)
+    def test_core_syncs(self, mock_client_registry, mock_write_records, mock_get_projection_plan, *args):
+        """
+        Verify that the core syncs of the accounts, running at the same time with clients retargeted from one
+        service client, each write the campaigns of their own account
+        """
+        self.serve(CAMPAIGN_MANAGEMENT_WSDL, GET_CAMPAIGNS_RESPONSE, rb'AccountId>(\d+)<')
+        mock_get_projection_plan.return_value.project_many.side_effect = lambda records: records
+        account_ids = [str(account_id) for account_id in range(1, 41)]
+
+        async def sync_accounts():
+            await asyncio.gather(*[tap_bing_ads.sync_account_data(account_id, None, {'campaigns': 'campaigns_catalog_entry'})
+                                   for account_id in account_ids])
+
+        asyncio.run(sync_accounts())
+
+        written_campaigns = sorted(campaign['Name'] for call in mock_write_records.mock_calls for campaign in call.args[1])
+        self.assertEqual(written_campaigns, sorted('campaign of {}'.format(account_id) for account_id in account_ids))
+
+    def test_report_polls(self, *args):
+        """
+        Verify that the polls of a batch, processed at the same time, each get the download url of their own report
+        """
+        self.serve(REPORTING_WSDL, POLL_GENERATE_REPORT_RESPONSE, rb'ReportRequestId>(\w+)<')
+        client = tap_bing_ads.ServiceClientRegistry().get_client('ReportingService', 'a1')
+        request_ids = ['r{}'.format(i) for i in range(60)]
+
+        async def poll_reports():
+            return await asyncio.gather(*[tap_bing_ads.poll_report(client, 'a1', 'AdPerformanceReport', arrow.get('2024-01-01'),
+                                                                   arrow.get('2024-01-31'), request_id)
+                                          for request_id in request_ids])
+
+        self.assertEqual(asyncio.run(poll_reports()),
+                         [(True, 'https://download/{}'.format(request_id)) for request_id in request_ids])
@@ -0,0 +1,182 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pkg_resources
+
+import tap_bing_ads
+
+CATALOG = {'streams': [{'tap_stream_id': 'accounts', 'stream': 'accounts', 'schema': {}, 'metadata': []}]}
+WSDL_FINGERPRINT = {'CustomerManagementService': 'c1', 'CampaignManagementService': 'c2', 'ReportingService': 'r1'}
+
+
+@mock.patch("tap_bing_ads.discover_reports", return_value=[])
+@mock.patch("tap_bing_ads.discover_core_objects", return_value=CATALOG['streams'])
+@mock.patch("tap_bing_ads.test_credentials")
+@mock.patch("tap_bing_ads.get_wsdl_fingerprint", return_value=WSDL_FINGERPRINT)
+class TestDiscoveryCache(unittest.TestCase):
+    """A set of unit tests to ensure that the catalog is served from the cache until the WSDLs, reports or exclusions change"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        tap_bing_ads.CONFIG = {'discovery_cache_dir': self.cache_dir.name}
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+        self.cache_dir.cleanup()
+
+    def discover(self, offline=False):
+        '''Run discovery and return the catalog written to stdout'''
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+            tap_bing_ads.do_discover(['a1'], offline=offline)
+        return json.loads(mock_stdout.getvalue())
+
+    def test_cached_catalog_reused(self, mock_get_wsdl_fingerprint, mock_test_credentials,
+                                   mock_discover_core_objects, mock_discover_reports):
+        """
+        Verify that the second discovery serves the cached catalog without rebuilding it
+        """
+        self.assertEqual(self.discover(), CATALOG)
+        self.assertEqual(self.discover(), CATALOG)
+        self.assertEqual(mock_discover_core_objects.call_count, 1)
+        # the credentials of the cached discovery are tested without loading a WSDL
+        self.assertEqual(mock_test_credentials.mock_calls, [mock.call(['a1']), mock.call(['a1'], load_wsdl=False)])
+
+    def test_cache_invalidated_by_wsdl_change(self, mock_get_wsdl_fingerprint, mock_test_credentials,
+                                              mock_discover_core_objects, mock_discover_reports):
+        """
+        Verify that the catalog is rebuilt when one of the WSDLs changed
+        """
+        self.discover()
+        mock_get_wsdl_fingerprint.return_value = {**WSDL_FINGERPRINT, 'ReportingService': 'r2'}
+        self.discover()
+        self.assertEqual(mock_discover_core_objects.call_count, 2)
+
+    def test_cache_invalidated_by_exclusions_change(self, mock_get_wsdl_fingerprint, mock_test_credentials,
+                                                    mock_discover_core_objects, mock_discover_reports):
+        """
+        Verify that the catalog is rebuilt when the field exclusions changed
+        """
+        self.discover()
+        with mock.patch.dict(tap_bing_ads.EXCLUSIONS, {'AccountPerformanceReport': []}):
+            self.discover()
+        self.assertEqual(mock_discover_core_objects.call_count, 2)
+
+    def test_cache_invalidated_by_report_definitions_change(self, mock_get_wsdl_fingerprint, mock_test_credentials,
+                                                            mock_discover_core_objects, mock_discover_reports):
+        """
+        Verify that the catalog is rebuilt when the report field types changed
+        """
+        self.discover()
+        with mock.patch.dict(tap_bing_ads.reports.REPORTING_FIELD_TYPES, {'Clicks': 'number'}):
+            self.discover()
+        self.assertEqual(mock_discover_core_objects.call_count, 2)
+
+    def test_offline_discovery(self, mock_get_wsdl_fingerprint, mock_test_credentials,
+                               mock_discover_core_objects, mock_discover_reports):
+        """
+        Verify that the offline discovery serves the cached catalog without any credentials check or WSDL load
+        """
+        self.discover()
+        mock_test_credentials.reset_mock()
+        mock_get_wsdl_fingerprint.reset_mock()
+
+        self.assertEqual(self.discover(offline=True), CATALOG)
+        mock_test_credentials.assert_not_called()
+        mock_get_wsdl_fingerprint.assert_not_called()
+
+    def test_offline_discovery_without_cache(self, mock_get_wsdl_fingerprint, mock_test_credentials,
+                                             mock_discover_core_objects, mock_discover_reports):
+        """
+        Verify that the offline discovery fails when there is no up to date cached catalog
+        """
+        with self.assertRaises(Exception) as e:
+            self.discover(offline=True)
+        self.assertIn('No up to date cached catalog found', str(e.exception))
+
+        self.discover()
+        with mock.patch.dict(tap_bing_ads.EXCLUSIONS, {'AccountPerformanceReport': []}):
+            with self.assertRaises(Exception):
+                self.discover(offline=True)
+
+
+@mock.patch("tap_bing_ads.discover_reports", return_value=[])
+@mock.patch("tap_bing_ads.discover_core_objects", return_value=CATALOG['streams'])
+@mock.patch("tap_bing_ads.test_credentials")
+class TestWsdlFingerprint(unittest.TestCase):
+    """A set of unit tests to ensure that the catalog is rebuilt when the contents of a WSDL change under the same url"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        tap_bing_ads.CONFIG = {'discovery_cache_dir': self.cache_dir.name}
+        self.wsdl_path = os.path.join(self.cache_dir.name, 'reporting_service.xml')
+        shutil.copy(pkg_resources.resource_filename('bingads', 'v13/proxies/production/reporting_service.xml'), self.wsdl_path)
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+        self.cache_dir.cleanup()
+
+    def discover(self):
+        '''Run discovery with the WSDL of every service read from the local file, and return the calls for service clients'''
+        with mock.patch("tap_bing_ads.get_service_url", return_value='file://' + self.wsdl_path), \
+             mock.patch("tap_bing_ads.CLIENT_REGISTRY.get_client") as mock_get_client, \
+             mock.patch("sys.stdout", new_callable=io.StringIO):
+            tap_bing_ads.do_discover(['a1'])
+        return mock_get_client.call_count
+
+    def test_cache_invalidated_by_wsdl_contents_change(self, mock_test_credentials,
+                                                       mock_discover_core_objects, mock_discover_reports):
+        """
+        Verify that a new enumeration value of a report column type invalidates the cached catalog
+        """
+        self.discover()
+        # the cached catalog is served without building a service client to parse its WSDL
+        self.assertEqual(self.discover(), 0)
+        self.assertEqual(mock_discover_core_objects.call_count, 1)
+
+        with open(self.wsdl_path, encoding='utf-8') as wsdl_file:
+            wsdl = wsdl_file.read()
+        # the first column of AccountPerformanceReportColumn
+        column = '<xs:enumeration value="AccountName" />'
+        self.assertTrue(column in wsdl)
+        with open(self.wsdl_path, 'w', encoding='utf-8') as wsdl_file:
+            wsdl_file.write(wsdl.replace(column, column + '<xs:enumeration value="NewColumn"/>', 1))
+
+        self.discover()
+        self.assertEqual(mock_discover_core_objects.call_count, 2)
+
+
+class TestServiceUrl(unittest.TestCase):
+    """A set of unit tests to ensure that the WSDL fingerprint reads the WSDLs the service clients load"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        tap_bing_ads.CONFIG = {'wsdl_cache_dir': self.cache_dir.name}
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+        self.cache_dir.cleanup()
+
+    def test_service_url(self):
+        """
+        Verify that the WSDL url of each service is the one its client is built from
+        """
+        for service in tap_bing_ads.DISCOVERY_SERVICES:
+            with self.subTest(service=service):
+                self.assertEqual(tap_bing_ads.get_service_url(service), tap_bing_ads.CustomServiceClient(service).service_url)
+
+
+class TestOfflineArg(unittest.TestCase):
+    """A set of unit tests to ensure that the --offline argument is removed before the standard args are parsed"""
+
+    def test_pop_offline_arg(self):
+        with mock.patch("sys.argv", ['tap-bing-ads', '-c', 'config.json', '--discover', '--offline']):
+            self.assertTrue(tap_bing_ads.pop_offline_arg())
+            self.assertEqual(tap_bing_ads.sys.argv, ['tap-bing-ads', '-c', 'config.json', '--discover'])
+
+        with mock.patch("sys.argv", ['tap-bing-ads', '-c', 'config.json', '--discover']):
+            self.assertFalse(tap_bing_ads.pop_offline_arg())
@@ -0,0 +1,93 @@
+import unittest
+from unittest import mock
+
+from singer.catalog import CatalogEntry
+from singer.schema import Schema
+
+import tap_bing_ads
+from tap_bing_ads.exclusions import EXCLUSIONS
+
+
+class TestExclusionIndex(unittest.TestCase):
+    """A set of unit tests to ensure that the field exclusion groups are compiled into a lookup per report field"""
+
+    def test_exclusion_index(self):
+        """
+        Verify that every field excludes the fields of the other side of all its groups, in the order of the groups
+        """
+        exclusions = {
+            'TestReport': [
+                {'Attributes': ['A1', 'A2'], 'ImpressionSharePerformanceStatistics': ['S1']},
+                {'Attributes': ['A1'], 'ImpressionSharePerformanceStatistics': ['S2', 'S3']}
+            ]
+        }
+        self.assertEqual(tap_bing_ads.build_exclusion_index(exclusions), {
+            'TestReport': {
+                'A1': ['S1', 'S2', 'S3'],
+                'A2': ['S1'],
+                'S1': ['A1', 'A2'],
+                'S2': ['A1'],
+                'S3': ['A1']
+            }
+        })
+
+    def test_exclusion_index_compiled_for_all_reports(self):
+        """
+        Verify that the exclusions of every report are compiled at import and the conflicts are symmetric
+        """
+        self.assertEqual(set(tap_bing_ads.EXCLUSION_INDEX), set(EXCLUSIONS))
+        for report_index in tap_bing_ads.EXCLUSION_INDEX.values():
+            for field, excluded_fields in report_index.items():
+                for excluded_field in excluded_fields:
+                    self.assertIn(field, report_index[excluded_field])
+
+    def test_metadata_field_exclusions(self):
+        """
+        Verify that the report field metadata contains the excluded fields as breadcrumbs
+        """
+        mdata = tap_bing_ads.metadata_fn('TestReport', 'A2', [])
+        self.assertNotIn('fieldExclusions', mdata['metadata'])
+
+        with mock.patch.dict(tap_bing_ads.EXCLUSION_INDEX, {'TestReport': {'A2': ['S1', 'S2']}}):
+            mdata = tap_bing_ads.metadata_fn('TestReport', 'A2', ['A2'])
+        self.assertEqual(mdata, {'metadata': {'inclusion': 'automatic', 'fieldExclusions': [['properties', 'S1'], ['properties', 'S2']]},
+                                 'breadcrumb': ['properties', 'A2']})
+
+    @mock.patch.dict(tap_bing_ads.EXCLUSION_INDEX, {'TestReport': {'A1': ['S1', 'S2'], 'S1': ['A1'], 'S2': ['A1']}})
+    def test_invalid_selections(self):
+        """
+        Verify that only the selected excluded fields are reported as invalid selections
+        """
+        invalid_selections = {}
+        tap_bing_ads.check_for_invalid_selections('TestReport', 'A1', {'A1', 'S2'}, invalid_selections)
+        self.assertEqual(invalid_selections, {'A1': ['S2']})
+
+        invalid_selections = {}
+        tap_bing_ads.check_for_invalid_selections('TestReport', 'S1', {'S1', 'S2'}, invalid_selections)
+        tap_bing_ads.check_for_invalid_selections('OtherReport', 'A1', {'A1', 'S1'}, invalid_selections)
+        self.assertEqual(invalid_selections, {})
+
+    def test_selections_validated_for_all_reports(self):
+        """
+        Verify that the selections of the catalog entry of every report with field exclusions are validated
+        against the exclusion index
+        """
+        for report_name, group_sets in EXCLUSIONS.items():
+            with self.subTest(report_name=report_name):
+                attributes = group_sets[0]['Attributes']
+                statistics = group_sets[0]['ImpressionSharePerformanceStatistics']
+                fields = sorted({field for group_set in group_sets for field_list in group_set.values() for field in field_list})
+                mdata = [{'breadcrumb': (), 'metadata': {'selected': True}}] + \
+                    [tap_bing_ads.metadata_fn(report_name, field, []) for field in fields]
+                catalog_entry = CatalogEntry(tap_stream_id=report_name, stream=tap_bing_ads.snakecase(report_name), metadata=mdata,
+                                             schema=Schema.from_dict({'type': 'object', 'properties': {field: {} for field in fields}}))
+
+                for field_mdata in mdata[1:]:
+                    field_mdata['metadata']['selected'] = field_mdata['breadcrumb'][1] in attributes
+                self.assertEqual(tap_bing_ads.get_selected_fields(catalog_entry), sorted(attributes))
+
+                for field_mdata in mdata[1:]:
+                    field_mdata['metadata']['selected'] = field_mdata['breadcrumb'][1] in (attributes[0], statistics[0])
+                with self.assertRaises(Exception) as e:
+                    tap_bing_ads.get_selected_fields(catalog_entry)
+                self.assertIn('"{}": [\n        "{}"'.format(attributes[0], statistics[0]), str(e.exception))
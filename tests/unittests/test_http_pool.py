@@ -0,0 +1,230 @@
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.error import URLError
+
+import pkg_resources
+import requests
+import suds
+from suds.transport import Request
+
+import tap_bing_ads
+from test_concurrent_replies import MockAuthentication
+
+CUSTOMER_MANAGEMENT_WSDL = 'file://' + pkg_resources.resource_filename('bingads', 'v13/proxies/production/customermanagement_service.xml')
+
+GET_USER_RESPONSE = b'''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<GetUserResponse xmlns="https://bingads.microsoft.com/Customer/v13"><User i:nil="true" xmlns:i="http://www.w3.org/2001/XMLSchema-instance"/></GetUserResponse>
+</s:Body></s:Envelope>'''
+
+FAULT_RESPONSE = b'''<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>
+<s:Fault><faultcode>s:Server</faultcode><faultstring>Invalid client data</faultstring><detail>
+<AdApiFaultDetail xmlns="https://adapi.microsoft.com"><Errors><AdApiError><Code>105</Code><ErrorCode>InvalidCredentials</ErrorCode>
+<Message>Invalid client data</Message></AdApiError></Errors></AdApiFaultDetail></detail></s:Fault>
+</s:Body></s:Envelope>'''
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    '''Answer every request with the response of the server, keeping the connection open unless asked to close it'''
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.respond()
+
+    def respond(self):
+        server = self.server
+        with server.lock:
+            server.connection_headers.append(self.headers.get('Connection'))
+        self.send_response(server.status)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(server.body)))
+        if self.headers.get('Connection') == 'close':
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class KeepAliveServer(ThreadingHTTPServer):
+    '''Local HTTP server keeping its connections alive'''
+    def __init__(self, body=b'report', status=200):
+        super().__init__(('127.0.0.1', 0), KeepAliveHandler)
+        self.body = body
+        self.status = status
+        self.lock = threading.Lock()
+        self.connection_headers = []
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/'.format(self.server_address[1])
+
+
+class TestHttpConnectionPool(unittest.TestCase):
+    """A set of unit tests to ensure that the requests of the tap reuse the kept alive connections of the pool"""
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+        tap_bing_ads.HTTP_POOL.configure()
+
+    def get(self, url, num_requests):
+        for _ in range(num_requests):
+            response = tap_bing_ads.SESSION.get(url, timeout=10)
+            self.assertEqual(response.content, b'report')
+
+    def test_connection_reused(self):
+        """
+        Verify that the sequential requests to a host are made on one kept alive connection of the pool
+        """
+        tap_bing_ads.CONFIG = {'http_pool_size': 4}
+        tap_bing_ads.HTTP_POOL.configure()
+        with KeepAliveServer() as server:
+            self.get(server.url, 5)
+
+        self.assertEqual((tap_bing_ads.HTTP_POOL.requests, tap_bing_ads.HTTP_POOL.connections), (5, 1))
+        self.assertEqual(tap_bing_ads.SESSION.get_adapter(server.url)._pool_maxsize, 4)
+
+    def test_keep_alive_disabled(self):
+        """
+        Verify that every request opens a connection when `http_keep_alive` is false
+        """
+        tap_bing_ads.CONFIG = {'http_keep_alive': 'false'}
+        tap_bing_ads.HTTP_POOL.configure()
+        with KeepAliveServer() as server:
+            self.get(server.url, 3)
+
+        self.assertEqual(server.connection_headers, ['close'] * 3)
+        self.assertEqual((tap_bing_ads.HTTP_POOL.requests, tap_bing_ads.HTTP_POOL.connections), (3, 3))
+
+    def test_pool_size(self):
+        """
+        Verify that the pool size is read from the config and falls back to the default
+        """
+        for pool_size, expected_pool_size in [(None, 20), ('', 20), (0, 20), ('8', 8), (50, 50)]:
+            with self.subTest(pool_size=pool_size):
+                tap_bing_ads.CONFIG = {'http_pool_size': pool_size}
+                tap_bing_ads.HTTP_POOL.configure()
+                self.assertEqual(tap_bing_ads.SESSION.get_adapter('https://bingads.microsoft.com')._pool_maxsize,
+                                 expected_pool_size)
+
+    @mock.patch("tap_bing_ads.metrics.log")
+    def test_reuse_logged(self, mock_log):
+        """
+        Verify that the requests on a reused connection are logged as a metric
+        """
+        tap_bing_ads.HTTP_POOL.configure()
+        with KeepAliveServer() as server:
+            self.get(server.url, 3)
+        tap_bing_ads.HTTP_POOL.log_stats()
+
+        point = mock_log.call_args.args[1]
+        self.assertEqual((point.metric, point.value, point.tags), ('http_connection_reuse', 2, {'requests': 3, 'connections': 1}))
+
+
+@mock.patch("tap_bing_ads.OAUTH_TOKEN_MANAGER.get_authentication", return_value=MockAuthentication())
+@mock.patch("tap_bing_ads.CustomServiceClient.service_url", new_callable=mock.PropertyMock, return_value=CUSTOMER_MANAGEMENT_WSDL)
+class TestSessionTransport(unittest.TestCase):
+    """A set of unit tests to ensure that the SOAP calls are made with the HTTP session of the tap"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        tap_bing_ads.CONFIG = {'customer_id': 'c1', 'developer_token': 'token', 'wsdl_cache_dir': self.cache_dir.name}
+        tap_bing_ads.HTTP_POOL.configure()
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+        tap_bing_ads.HTTP_POOL.configure()
+        self.cache_dir.cleanup()
+
+    def get_client(self, server):
+        client = tap_bing_ads.ServiceClientRegistry().get_client('CustomerManagementService', 'a1')
+        client.soap_client.set_options(location=server.url)
+        return client
+
+    @mock.patch("tap_bing_ads.TokenBucket.acquire", return_value=0)
+    def test_soap_calls_reuse_connection(self, *args):
+        """
+        Verify that the SOAP calls of a client are made on one kept alive connection of the pool
+        """
+        with KeepAliveServer(GET_USER_RESPONSE) as server:
+            client = self.get_client(server)
+            self.assertIsInstance(client.soap_client.options.transport, tap_bing_ads.client.SessionTransport)
+            for _ in range(3):
+                self.assertIsNone(client.GetUser(UserId=None).User)
+
+        self.assertEqual((tap_bing_ads.HTTP_POOL.requests, tap_bing_ads.HTTP_POOL.connections), (3, 1))
+
+    @mock.patch("tap_bing_ads.TokenBucket.acquire", return_value=0)
+    def test_soap_fault(self, *args):
+        """
+        Verify that the SOAP fault of an error response is parsed by suds and raised with its errors
+        """
+        with KeepAliveServer(FAULT_RESPONSE, status=500) as server:
+            client = self.get_client(server)
+            with self.assertRaises(Exception) as e:
+                client.GetUser(UserId=None)
+
+        self.assertIsInstance(e.exception.__cause__, suds.WebFault)
+        self.assertIn('InvalidCredentials', str(e.exception))
+
+    def test_connection_error(self, *args):
+        """
+        Verify that a request that could not be made is raised as a URL error and a timeout as a socket timeout,
+        which are retried
+        """
+        with KeepAliveServer() as server:
+            url = server.url
+        transport = tap_bing_ads.client.SessionTransport()
+
+        with self.assertRaises(URLError) as e:
+            transport.send(Request(url, b'<Envelope/>', timeout=10))
+        self.assertTrue(tap_bing_ads.should_retry_httperror(e.exception))
+
+        with mock.patch("tap_bing_ads.SESSION.request", side_effect=requests.exceptions.ReadTimeout()):
+            with self.assertRaises(socket.timeout) as e:
+                transport.send(Request(url, b'<Envelope/>', timeout=10))
+        self.assertTrue(tap_bing_ads.should_retry_httperror(e.exception))
+
+    @mock.patch("time.sleep")
+    @mock.patch("tap_bing_ads.TokenBucket.acquire", return_value=0)
+    def test_connection_error_retried(self, *args):
+        """
+        Verify that a SOAP call to a host refusing the connection raises its error through suds instead of
+        returning None, so that it is retried
+        """
+        with KeepAliveServer() as dead_server:
+            dead_url = dead_server.url
+        attempts = []
+
+        with KeepAliveServer(GET_USER_RESPONSE) as server:
+            client = self.get_client(server)
+            client.soap_client.set_options(location=dead_url)
+
+            @tap_bing_ads.bing_ads_error_handling
+            def get_user():
+                attempts.append(client.soap_client.options.location)
+                if len(attempts) == 2:
+                    client.soap_client.set_options(location=server.url)
+                return client.GetUser(UserId=None)
+
+            response = get_user()
+
+        self.assertEqual(attempts, [dead_url, dead_url])
+        self.assertIsNotNone(response)
+        self.assertIsNone(response.User)
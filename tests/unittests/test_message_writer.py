@@ -0,0 +1,89 @@
+import io
+import json
+import sys
+import threading
+import time
+import unittest
+
+import singer
+
+import tap_bing_ads
+
+
+class SlowStream(io.StringIO):
+    '''Mocked stdout of a target that is slow to read the messages'''
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        time.sleep(0.01)
+        return super().write(text)
+
+
+class BrokenStream(io.StringIO):
+    '''Mocked stdout of a target that exited'''
+    def write(self, text):
+        raise BrokenPipeError('target exited')
+
+
+def get_messages(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestMessageWriter(unittest.TestCase):
+    """A set of unit tests to ensure that the Singer messages are written in order from the writer thread"""
+
+    def test_messages_written_in_order(self):
+        """
+        Verify that the SCHEMA, RECORD and STATE messages are written in the order they are written by singer
+        """
+        stream = io.StringIO()
+        with tap_bing_ads.MessageWriter(stream, 10) as writer:
+            self.assertIs(sys.stdout, writer)
+            singer.write_schema('ads', {'type': 'object'}, ['Id'])
+            singer.write_records('ads', [{'Id': i} for i in range(100)])
+            singer.write_state({'bookmarks': {'ads': 1}})
+        self.assertIsNot(sys.stdout, writer)
+
+        messages = get_messages(stream)
+        self.assertEqual([message['type'] for message in messages], ['SCHEMA'] + ['RECORD'] * 100 + ['STATE'])
+        self.assertEqual([message['record']['Id'] for message in messages[1:-1]], list(range(100)))
+        self.assertEqual(writer.messages, 102)
+
+    def test_slow_target_blocks_writes(self):
+        """
+        Verify that a slow target fills the queue, the writes wait for it, and the messages are written in batches
+        """
+        stream = SlowStream()
+        with tap_bing_ads.MessageWriter(stream, 5) as writer:
+            threads = [threading.Thread(target=singer.write_records, args=('stream_{}'.format(i), [{'Id': j} for j in range(50)]))
+                       for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        messages = get_messages(stream)
+        self.assertEqual(len(messages), 200)
+        # the records of each thread are written in order
+        for i in range(4):
+            self.assertEqual([message['record']['Id'] for message in messages if message['stream'] == 'stream_{}'.format(i)],
+                             list(range(50)))
+        self.assertGreater(writer.blocked_writes, 0)
+        self.assertGreater(writer.wait_time, 0)
+        self.assertLess(stream.writes, 200)
+        self.assertEqual(writer.batches, stream.writes)
+
+    def test_target_error_raised(self):
+        """
+        Verify that an error writing to stdout is raised to the sync without blocking the threads writing messages
+        """
+        with self.assertRaises(BrokenPipeError):
+            with tap_bing_ads.MessageWriter(BrokenStream(), 2):
+                for i in range(100):
+                    try:
+                        singer.write_record('ads', {'Id': i})
+                    except BrokenPipeError:
+                        pass
@@ -0,0 +1,104 @@
+import threading
+import unittest
+from unittest import mock
+
+from bingads import OAuthTokens
+from bingads.exceptions import OAuthTokenRequestException
+
+import tap_bing_ads
+
+
+class MockOAuthWebAuthCodeGrant():
+    '''Mocked OAuthWebAuthCodeGrant class which records every token request'''
+    token_requests = []
+    expires_in_seconds = 3600
+    failing_scopes = []
+
+    def __init__(self, client_id, client_secret, redirection_uri, oauth_scope=None):
+        self.oauth_scope = oauth_scope
+        self.oauth_tokens = None
+
+    def request_oauth_tokens_by_refresh_token(self, refresh_token):
+        '''Mocked request_oauth_tokens_by_refresh_token method'''
+        self.token_requests.append((self.oauth_scope, refresh_token))
+        if self.oauth_scope in self.failing_scopes:
+            raise OAuthTokenRequestException('invalid_scope', 'The provided scope is invalid')
+        self.oauth_tokens = OAuthTokens('access_token_{}'.format(len(self.token_requests)), self.expires_in_seconds,
+                                        'rotated_refresh_token')
+        return self.oauth_tokens
+
+
+@mock.patch("bingads.OAuthWebAuthCodeGrant", MockOAuthWebAuthCodeGrant)
+class TestOAuthTokenManager(unittest.TestCase):
+    """A set of unit tests to ensure that the OAuth tokens are requested once and shared by all clients"""
+
+    def setUp(self):
+        tap_bing_ads.CONFIG = {'oauth_client_id': 'id', 'oauth_client_secret': 'secret', 'refresh_token': 'refresh_token'}
+        MockOAuthWebAuthCodeGrant.token_requests = []
+        MockOAuthWebAuthCodeGrant.expires_in_seconds = 3600
+        MockOAuthWebAuthCodeGrant.failing_scopes = []
+        self.token_manager = tap_bing_ads.OAuthTokenManager()
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    def test_access_token_reused_until_expiry(self):
+        """
+        Verify that the access token is requested once and reused while it is not about to expire
+        """
+        authentication = self.token_manager.get_authentication()
+        self.assertIs(self.token_manager.get_authentication(), authentication)
+        self.assertEqual(MockOAuthWebAuthCodeGrant.token_requests, [(None, 'refresh_token')])
+
+    def test_expiring_access_token_refreshed_in_place(self):
+        """
+        Verify that an access token expiring within the margin is refreshed on the shared authentication
+        """
+        MockOAuthWebAuthCodeGrant.expires_in_seconds = tap_bing_ads.ACCESS_TOKEN_EXPIRY_MARGIN - 1
+        authentication = self.token_manager.get_authentication()
+        self.assertIs(self.token_manager.get_authentication(), authentication)
+        self.assertEqual(MockOAuthWebAuthCodeGrant.token_requests,
+                         [(None, 'refresh_token'), (None, 'rotated_refresh_token')])
+
+    def test_unknown_expiry_reused_until_rejected(self):
+        """
+        Verify that an access token without a known expiry is reused, and refreshed once when a call is rejected with it
+        """
+        MockOAuthWebAuthCodeGrant.expires_in_seconds = None
+        authentication = self.token_manager.get_authentication()
+        for _ in range(5):
+            self.assertIs(self.token_manager.get_authentication(), authentication)
+        self.assertEqual(len(MockOAuthWebAuthCodeGrant.token_requests), 1)
+
+        # the calls rejected with the same token trigger a single refresh
+        for _ in range(3):
+            self.assertIs(self.token_manager.refresh_expired_access_token('access_token_1'), authentication)
+        self.assertEqual(authentication.oauth_tokens.access_token, 'access_token_2')
+        self.assertEqual(MockOAuthWebAuthCodeGrant.token_requests,
+                         [(None, 'refresh_token'), (None, 'rotated_refresh_token')])
+
+    def test_legacy_scope_remembered(self):
+        """
+        Verify that the tap falls back to the bingads.manage scope once and uses it directly afterwards
+        """
+        MockOAuthWebAuthCodeGrant.failing_scopes = [None]
+        self.assertEqual(self.token_manager.get_authentication().oauth_scope, 'bingads.manage')
+        self.token_manager.reset()
+        self.token_manager.get_authentication()
+        self.assertEqual(MockOAuthWebAuthCodeGrant.token_requests,
+                         [(None, 'refresh_token'), ('bingads.manage', 'refresh_token'), ('bingads.manage', 'refresh_token')])
+
+    def test_concurrent_callers_share_one_token_request(self):
+        """
+        Verify that the threads asking for the authentication at the same time trigger a single token request
+        """
+        authentications = []
+        threads = [threading.Thread(target=lambda: authentications.append(self.token_manager.get_authentication()))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(MockOAuthWebAuthCodeGrant.token_requests), 1)
+        self.assertEqual(len({id(authentication) for authentication in authentications}), 1)
@@ -0,0 +1,71 @@
+import unittest
+from unittest import mock
+
+from singer.catalog import CatalogEntry
+from singer.schema import Schema
+
+import tap_bing_ads
+
+
+def get_catalog_entry(selected):
+    '''Return the catalog entry of the ads stream with the given fields selected'''
+    fields = ['Id', 'Title', 'Status', 'Type', 'FinalUrls']
+    mdata = [{'breadcrumb': (), 'metadata': {'selected': True}}]
+    for field in fields:
+        field_metadata = {'inclusion': 'automatic' if field == 'Id' else 'available', 'selected': field in selected}
+        mdata.append({'breadcrumb': ('properties', field), 'metadata': field_metadata})
+    return CatalogEntry(tap_stream_id='ads', stream='ads', key_properties=['Id'], metadata=mdata,
+                        schema=Schema.from_dict({'type': 'object', 'properties': {field: {'type': ['null', 'string']} for field in fields}}))
+
+
+class TestProjectionPlan(unittest.TestCase):
+    """A set of unit tests to ensure that the selected fields are compiled once per stream and projected on records"""
+
+    def setUp(self):
+        tap_bing_ads.PROJECTION_PLANS.clear()
+
+    @mock.patch("tap_bing_ads.get_selected_fields", side_effect=tap_bing_ads.get_selected_fields)
+    def test_plan_compiled_once(self, mock_get_selected_fields):
+        """
+        Verify that the selections of a catalog stream are validated once and the plan is reused
+        """
+        catalog_entry = get_catalog_entry(['Title'])
+        plan = tap_bing_ads.get_projection_plan(catalog_entry)
+        for _ in range(10):
+            self.assertIs(tap_bing_ads.get_projection_plan(catalog_entry), plan)
+        self.assertEqual(mock_get_selected_fields.call_count, 1)
+
+        # verify that a new catalog entry for the same stream gets its own plan
+        self.assertIsNot(tap_bing_ads.get_projection_plan(get_catalog_entry(['Status'])), plan)
+        # verify that the excluded fields are part of the plan key
+        self.assertEqual(tap_bing_ads.get_projection_plan(catalog_entry, exclude=['Id']).selected_fields, ['Title'])
+
+    def test_project_selected_fields(self):
+        """
+        Verify that the plan keeps the selected and automatic fields of the records like filter_selected_fields_many
+        """
+        ads = [{'Id': i, 'Title': 'title', 'Status': 'Active', 'Type': 'Text', 'FinalUrls': None} for i in range(3)]
+        plan = tap_bing_ads.get_projection_plan(get_catalog_entry(['Title', 'Type']))
+
+        self.assertEqual(plan.selected_fields, ['Id', 'Title', 'Type'])
+        self.assertEqual(plan.project_many(ads), tap_bing_ads.filter_selected_fields_many(plan.selected_fields, ads))
+        self.assertEqual(plan.project(ads[0]), {'Id': 0, 'Title': 'title', 'Type': 'Text'})
+
+    def test_no_selected_fields(self):
+        """
+        Verify that the records are not changed when the stream has no metadata
+        """
+        catalog_entry = get_catalog_entry([])
+        catalog_entry.metadata = []
+        ads = [{'Id': 1, 'Title': 'title'}]
+        self.assertIs(tap_bing_ads.get_projection_plan(catalog_entry).project_many(ads), ads)
+
+    @mock.patch.dict(tap_bing_ads.EXCLUSION_INDEX, {'Ads': {'Title': ['Status'], 'Status': ['Title']}})
+    def test_invalid_selections(self):
+        """
+        Verify that the incompatible selections are raised when the plan is compiled
+        """
+        catalog_entry = get_catalog_entry(['Title', 'Status'])
+        with self.assertRaises(Exception) as e:
+            tap_bing_ads.get_projection_plan(catalog_entry)
+        self.assertIn('Invalid selections for field(s)', str(e.exception))
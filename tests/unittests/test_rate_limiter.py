@@ -0,0 +1,153 @@
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import suds
+
+import tap_bing_ads
+
+
+def get_api_fault(error_code, code):
+    '''Return a SOAP fault of the Bing Ads API with one operation error'''
+    operation_error = SimpleNamespace(ErrorCode=error_code, Code=code, Message='')
+    detail = SimpleNamespace(ApiFaultDetail=SimpleNamespace(OperationErrors=[('OperationError', operation_error)]))
+    return suds.WebFault(SimpleNamespace(detail=detail), None)
+
+
+class MockServiceMethod():
+    '''Mocked service call raising the given errors before returning a response'''
+    name = 'GetCampaignsByAccountId'
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'response'
+
+
+class TestTokenBucket(unittest.TestCase):
+    """A set of unit tests to ensure that the token bucket hands out calls at its rate and adapts it"""
+
+    def test_rate(self):
+        """
+        Verify that the calls beyond the burst capacity wait for the rate
+        """
+        bucket = tap_bing_ads.TokenBucket(rate=100, capacity=5)
+        start = time.monotonic()
+        for _ in range(25):
+            bucket.acquire()
+        # the 20 calls beyond the capacity take 0.2s at 100 calls per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+    def test_slow_down_and_speed_up(self):
+        """
+        Verify that a throttled bucket halves its rate down to the minimum and recovers with successful calls
+        """
+        bucket = tap_bing_ads.TokenBucket(rate=20)
+        bucket.slow_down()
+        self.assertEqual(bucket.rate, 10)
+        self.assertLessEqual(bucket.tokens, 0)
+        for _ in range(10):
+            bucket.slow_down()
+        self.assertEqual(bucket.rate, 1)
+
+        for _ in range(100):
+            bucket.speed_up()
+        self.assertEqual(bucket.rate, 20)
+
+
+@mock.patch("tap_bing_ads.TokenBucket.acquire", return_value=0)
+class TestRateLimiter(unittest.TestCase):
+    """A set of unit tests to ensure that the service calls share rate limits and slow down when throttled"""
+
+    def setUp(self):
+        tap_bing_ads.RATE_LIMITER.clear()
+
+    def tearDown(self):
+        tap_bing_ads.RATE_LIMITER.clear()
+        tap_bing_ads.CONFIG = {}
+
+    def test_buckets_per_service_and_customer(self, mock_acquire):
+        """
+        Verify that the calls of a service share its bucket across customers, and the calls of a customer across services
+        """
+        tap_bing_ads.CONFIG = {'service_calls_per_second': 8, 'customer_calls_per_second': 4}
+        limiter = tap_bing_ads.RATE_LIMITER
+        service_bucket, customer_bucket = limiter.get_buckets('CampaignManagementService', 'c1')
+
+        self.assertIs(limiter.get_buckets('CampaignManagementService', 'c2')[0], service_bucket)
+        self.assertIs(limiter.get_buckets('ReportingService', 'c1')[1], customer_bucket)
+        self.assertEqual((service_bucket.rate, customer_bucket.rate), (8, 4))
+
+    def test_no_static_limit_by_default(self, mock_acquire):
+        """
+        Verify that the calls wait for no bucket until Bing throttles one, which starts the buckets of its service and customer
+        """
+        wrapper = tap_bing_ads.log_service_call(MockServiceMethod([]), 'a1', 'CampaignManagementService', 'c1')
+        for _ in range(50):
+            wrapper(AccountId='a1')
+        self.assertEqual(tap_bing_ads.RATE_LIMITER.get_buckets('CampaignManagementService', 'c1'), [])
+        mock_acquire.assert_not_called()
+
+        tap_bing_ads.RATE_LIMITER.throttle('CampaignManagementService', 'c1')
+        buckets = tap_bing_ads.RATE_LIMITER.get_buckets('CampaignManagementService', 'c1')
+        self.assertEqual([bucket.max_rate for bucket in buckets], [tap_bing_ads.THROTTLED_CALLS_PER_SECOND] * 2)
+        self.assertEqual(tap_bing_ads.RATE_LIMITER.get_buckets('ReportingService', 'c2'), [])
+
+    def test_throttled_call_slows_down_and_is_made_again(self, mock_acquire):
+        """
+        Verify that a call rejected for the call rate slows down the shared buckets and is made again
+        """
+        service_method = MockServiceMethod([get_api_fault('CallRateExceeded', 117)] * 2)
+        wrapper = tap_bing_ads.log_service_call(service_method, 'a1', 'CampaignManagementService', 'c1')
+
+        self.assertEqual(wrapper(AccountId='a1'), 'response')
+        self.assertEqual(service_method.calls, 3)
+        self.assertEqual(tap_bing_ads.RATE_LIMITER.throttled, 2)
+        self.assertEqual(tap_bing_ads.RATE_LIMITER.calls, 3)
+        # the buckets slowed down twice, then recovered once for the successful call
+        for bucket in tap_bing_ads.RATE_LIMITER.get_buckets('CampaignManagementService', 'c1'):
+            self.assertAlmostEqual(bucket.rate, bucket.max_rate * 0.3)
+
+    def test_throttled_call_raised_after_max_attempts(self, mock_acquire):
+        """
+        Verify that the error of a call throttled MAX_THROTTLED_ATTEMPTS times is raised
+        """
+        service_method = MockServiceMethod([get_api_fault('CallRateExceeded', 117)] * tap_bing_ads.MAX_THROTTLED_ATTEMPTS)
+        wrapper = tap_bing_ads.log_service_call(service_method, 'a1', 'CampaignManagementService', 'c1')
+
+        with self.assertRaises(Exception):
+            wrapper(AccountId='a1')
+        self.assertEqual(service_method.calls, tap_bing_ads.MAX_THROTTLED_ATTEMPTS)
+
+    def test_other_fault_not_retried(self, mock_acquire):
+        """
+        Verify that the other API faults are raised right away without slowing down
+        """
+        service_method = MockServiceMethod([get_api_fault('InvalidCustomDateRangeEnd', 2015)])
+        wrapper = tap_bing_ads.log_service_call(service_method, 'a1', 'ReportingService', 'c1')
+
+        with self.assertRaises(tap_bing_ads.InvalidDateRangeEnd):
+            wrapper()
+        self.assertEqual(service_method.calls, 1)
+        self.assertEqual(tap_bing_ads.RATE_LIMITER.throttled, 0)
+
+    @mock.patch("tap_bing_ads.metrics.log")
+    def test_wait_not_timed(self, mock_log, mock_acquire):
+        """
+        Verify that the duration of a call logged by the request timer does not include the wait for the rate limiter
+        """
+        tap_bing_ads.CONFIG = {'service_calls_per_second': 20, 'customer_calls_per_second': 10}
+        mock_acquire.side_effect = lambda: time.sleep(0.1) or 0.1
+        wrapper = tap_bing_ads.log_service_call(MockServiceMethod([]), 'a1', 'CampaignManagementService', 'c1')
+
+        self.assertEqual(wrapper(AccountId='a1'), 'response')
+        point = mock_log.call_args.args[1]
+        self.assertEqual((point.metric, point.tags['endpoint']), ('http_request_duration', 'GetCampaignsByAccountId'))
+        self.assertLess(point.value, 0.1)
+        self.assertGreaterEqual(tap_bing_ads.RATE_LIMITER.wait_time, 0.2)
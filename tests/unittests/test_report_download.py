@@ -0,0 +1,278 @@
+import re
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tempfile import SpooledTemporaryFile
+from unittest import mock
+
+import tap_bing_ads
+from test_report_parser_pool import MockResponse, get_report_zip
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    '''Serve the report of the server, dropping the connection halfway through the body of its first `drops` responses'''
+    def send_report_headers(self, start, end):
+        server = self.server
+        self.send_response(206 if self.headers.get('Range') and server.accept_ranges else 200)
+        self.send_header('Content-Length', str(end - start))
+        if server.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+            if self.headers.get('Range'):
+                self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end - 1, len(server.content)))
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.server.requests.append(('HEAD', None))
+        self.send_report_headers(0, len(self.server.content))
+
+    def do_GET(self):
+        server = self.server
+        range_header = self.headers.get('Range')
+        with server.lock:
+            server.requests.append(('GET', range_header))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            drop = server.drops > 0
+            server.drops -= 1
+
+        start, end = 0, len(server.content)
+        if range_header and server.accept_ranges:
+            first, last = re.match(r'bytes=(\d+)-(\d*)', range_header).groups()
+            start, end = int(first), int(last) + 1 if last else end
+        self.send_report_headers(start, end)
+
+        body = server.content[start:end]
+        if drop:
+            body = body[:len(body) // 2]
+        # let the concurrent requests overlap
+        time.sleep(0.05)
+        self.wfile.write(body)
+        self.close_connection = True
+        with server.lock:
+            server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class ReportServer(ThreadingHTTPServer):
+    '''Local HTTP server of a report download'''
+    def __init__(self, content, accept_ranges, drops):
+        super().__init__(('127.0.0.1', 0), ReportHandler)
+        self.content = content
+        self.accept_ranges = accept_ranges
+        self.drops = drops
+        self.lock = threading.Lock()
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    @property
+    def ranges(self):
+        return [range_header for method, range_header in self.requests if method == 'GET']
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/report.zip'.format(self.server_address[1])
+
+
+class TestReportDownload(unittest.TestCase):
+    """A set of unit tests to ensure that the reports are downloaded in chunks to a spooled temporary file"""
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    def stream_report(self, content):
+        '''Stream the report and return the download call, the spooled files and the written rows'''
+        spooled_files = []
+
+        def spool(*args, **kwargs):
+            spooled_file = SpooledTemporaryFile(*args, **kwargs)
+            spooled_files.append(spooled_file)
+            return spooled_file
+
+        response = MockResponse(content)
+        with mock.patch.object(tap_bing_ads.SESSION, 'get', return_value=response) as mock_get, \
+             mock.patch("tap_bing_ads.SpooledTemporaryFile", side_effect=spool), \
+             mock.patch.object(response, 'iter_content', side_effect=response.iter_content) as mock_iter_content, \
+             mock.patch("singer.write_record") as mock_write_record:
+            tap_bing_ads.stream_report('ad_group_performance_report', 'AdGroupPerformanceReport', 'https://download', '2024-02-01')
+        return mock_get, mock_iter_content, spooled_files, mock_write_record.call_count
+
+    def test_report_streamed_in_chunks(self):
+        """
+        Verify that the report is requested as a stream and read in chunks of DOWNLOAD_CHUNK_SIZE
+        """
+        mock_get, mock_iter_content, spooled_files, num_rows = self.stream_report(get_report_zip(50))
+
+        self.assertTrue(mock_get.call_args.kwargs['stream'])
+        mock_iter_content.assert_called_once_with(chunk_size=tap_bing_ads.DOWNLOAD_CHUNK_SIZE)
+        self.assertEqual(num_rows, 50)
+        self.assertEqual(len(spooled_files), 1)
+        self.assertEqual(spooled_files[0]._max_size, tap_bing_ads.REPORT_SPOOL_MAX_SIZE)
+        self.assertFalse(spooled_files[0]._rolled)
+        self.assertTrue(spooled_files[0].closed)
+
+    @mock.patch("tap_bing_ads.DOWNLOAD_CHUNK_SIZE", 1024)
+    def test_large_report_spooled_to_disk(self):
+        """
+        Verify that a report larger than `report_spool_max_size` is written to disk instead of kept in memory
+        """
+        content = get_report_zip(5000)
+        tap_bing_ads.CONFIG = {'report_spool_max_size': 4096}
+        mock_get, mock_iter_content, spooled_files, num_rows = self.stream_report(content)
+
+        self.assertGreater(len(content), 4096)
+        self.assertEqual(num_rows, 5000)
+        self.assertTrue(spooled_files[0]._rolled)
+
+    def test_non_200_response(self):
+        """
+        Verify that an error response is raised without reading its content
+        """
+        response = MockResponse(b'')
+        response.status_code = 404
+        with mock.patch.object(tap_bing_ads.SESSION, 'get', return_value=response), \
+             mock.patch.object(response, 'close') as mock_close:
+            with self.assertRaises(Exception) as e:
+                tap_bing_ads.stream_report('ad_group_performance_report', 'AdGroupPerformanceReport', 'https://download', '2024-02-01')
+        self.assertIn('Non-200 (404) response downloading report', str(e.exception))
+        mock_close.assert_called_once()
+
+
+@mock.patch("tap_bing_ads.DOWNLOAD_CHUNK_SIZE", 1024)
+class TestResumedReportDownload(unittest.TestCase):
+    """A set of unit tests to ensure that a dropped report download is resumed from the bytes received"""
+
+    def setUp(self):
+        self.content = get_report_zip(5000)
+
+    def download(self, server):
+        '''Download the report of the server and return the download and the downloaded bytes'''
+        with SpooledTemporaryFile(max_size=1024 * 1024) as report_file:
+            download = tap_bing_ads.ReportDownload('AdGroupPerformanceReport', server.url, report_file)
+            download.download()
+            return download, report_file.read()
+
+    def test_download_resumed_with_range(self):
+        """
+        Verify that a download dropped mid-body is resumed with a Range request from the bytes received
+        """
+        with ReportServer(self.content, accept_ranges=True, drops=2) as server:
+            download, content = self.download(server)
+
+        self.assertEqual(content, self.content)
+        self.assertEqual(download.resumes, 2)
+        self.assertEqual(download.size, len(self.content))
+        self.assertIsNone(server.ranges[0])
+        # each request starts from the bytes received before the connection dropped
+        received = [int(re.match(r'bytes=(\d+)-', range_header).group(1)) for range_header in server.ranges[1:]]
+        self.assertEqual(len(received), 2)
+        self.assertGreater(received[0], 0)
+        self.assertGreater(received[1], received[0])
+
+    def test_download_restarted_without_range_support(self):
+        """
+        Verify that a download dropped mid-body is restarted from the start if the server does not accept ranges
+        """
+        with ReportServer(self.content, accept_ranges=False, drops=1) as server:
+            download, content = self.download(server)
+
+        self.assertEqual(content, self.content)
+        self.assertEqual(download.resumes, 0)
+        self.assertEqual(server.ranges, [None, None])
+
+    def test_size_checked(self):
+        """
+        Verify that a download ending before the Content-Length is incomplete
+        """
+        response = MockResponse(self.content[:100])
+        response.headers = {'Content-Length': str(len(self.content))}
+        with SpooledTemporaryFile() as report_file, \
+             mock.patch.object(tap_bing_ads.SESSION, 'get', return_value=response):
+            download = tap_bing_ads.ReportDownload('AdGroupPerformanceReport', 'https://download', report_file)
+            # a single attempt, without the retries
+            with self.assertRaises(tap_bing_ads.IncompleteReportDownload) as e:
+                tap_bing_ads.ReportDownload.download.__wrapped__(download)
+        self.assertEqual(str(e.exception), 'Received 100 of {} bytes downloading report: AdGroupPerformanceReport'.format(
+            len(self.content)))
+
+
+@mock.patch("tap_bing_ads.DOWNLOAD_CHUNK_SIZE", 1024)
+class TestSegmentedReportDownload(unittest.TestCase):
+    """A set of unit tests to ensure that large reports are downloaded as concurrent byte ranges"""
+
+    def setUp(self):
+        self.content = get_report_zip(5000)
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    def download(self, server, segments, segment_min_size):
+        '''Download the report of the server with the given segments config and return the downloaded bytes'''
+        tap_bing_ads.CONFIG = {'report_download_segments': segments, 'report_segment_min_size': segment_min_size}
+        with SpooledTemporaryFile(max_size=1024) as report_file:
+            tap_bing_ads.download_report('AdGroupPerformanceReport', server.url, report_file)
+            return report_file.read()
+
+    def test_report_downloaded_in_segments(self):
+        """
+        Verify that a report of at least `report_segment_min_size` bytes is downloaded as
+        `report_download_segments` byte ranges at once and reassembled in order
+        """
+        size = len(self.content)
+        with ReportServer(self.content, accept_ranges=True, drops=0) as server:
+            content = self.download(server, 4, size)
+
+        self.assertEqual(content, self.content)
+        self.assertEqual(server.requests[0], ('HEAD', None))
+        segment_size = -(-size // 4)
+        self.assertEqual(sorted(server.ranges, key=lambda range_header: int(re.search(r'\d+', range_header).group())),
+                         ['bytes={}-{}'.format(first, min(first + segment_size, size) - 1)
+                          for first in range(0, size, segment_size)])
+        self.assertGreater(server.max_active, 1)
+
+    def test_segment_resumed(self):
+        """
+        Verify that a segment dropped mid-body is resumed from the bytes of the segment received
+        """
+        with ReportServer(self.content, accept_ranges=True, drops=1) as server:
+            content = self.download(server, 2, 1)
+
+        self.assertEqual(content, self.content)
+        self.assertEqual(len(server.ranges), 3)
+
+    def test_report_downloaded_whole(self):
+        """
+        Verify that a report smaller than `report_segment_min_size`, or of a server not accepting ranges,
+        is downloaded with one request
+        """
+        for accept_ranges, segment_min_size in [(True, len(self.content) + 1), (False, 1)]:
+            with self.subTest(accept_ranges=accept_ranges, segment_min_size=segment_min_size):
+                with ReportServer(self.content, accept_ranges=accept_ranges, drops=0) as server:
+                    content = self.download(server, 4, segment_min_size)
+
+                self.assertEqual(content, self.content)
+                self.assertEqual(server.requests, [('HEAD', None), ('GET', None)])
+
+    @mock.patch("tap_bing_ads.get_report_size")
+    def test_segments_disabled_by_default(self, mock_get_report_size):
+        """
+        Verify that the reports are downloaded with one request without `report_download_segments`
+        """
+        with ReportServer(self.content, accept_ranges=True, drops=0) as server:
+            with SpooledTemporaryFile() as report_file:
+                tap_bing_ads.download_report('AdGroupPerformanceReport', server.url, report_file)
+                self.assertEqual(report_file.read(), self.content)
+
+        mock_get_report_size.assert_not_called()
+        self.assertEqual(server.ranges, [None])
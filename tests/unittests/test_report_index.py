@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+import pkg_resources
+from suds.client import Client
+
+import tap_bing_ads
+
+
+class MockServiceClient():
+    '''Mocked ServiceClient class exposing the suds client loaded from the WSDL shipped with the bingads SDK'''
+    def __init__(self):
+        self.soap_client = Client('file://' + pkg_resources.resource_filename('bingads', 'v13/proxies/production/reporting_service.xml'))
+
+
+class TestReportIndex(unittest.TestCase):
+    """A set of unit tests to ensure that the report schemas are looked up from an index built once per WSDL"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = MockServiceClient()
+
+    def setUp(self):
+        tap_bing_ads.REPORT_INDEX_CACHE.clear()
+
+    @mock.patch("tap_bing_ads.build_report_index", side_effect=tap_bing_ads.build_report_index)
+    def test_report_index_built_once(self, mock_build_report_index):
+        """
+        Verify that the report index is built once and used for every report schema lookup
+        """
+        for report_name in tap_bing_ads.reports.REPORT_WHITELIST:
+            tap_bing_ads.get_report_schema(self.client, report_name)
+        self.assertEqual(mock_build_report_index.call_count, 1)
+
+    def test_report_schema(self):
+        """
+        Verify that the report schema contains the report columns with their types and `_sdc_report_datetime`
+        """
+        report_index = tap_bing_ads.get_report_index(self.client)
+        self.assertNotIn('ArrayOfKeywordPerformanceReportColumn', report_index)
+        self.assertEqual(report_index['KeywordPerformanceReport']['column_type'].name, 'KeywordPerformanceReportColumn')
+
+        schema = tap_bing_ads.get_report_schema(self.client, 'KeywordPerformanceReport')
+        self.assertEqual(schema['properties']['Clicks'], {'type': ['null', 'integer']})
+        self.assertEqual(schema['properties']['Keyword'], {'type': ['null', 'string']})
+        self.assertEqual(schema['properties']['_sdc_report_datetime'], {'type': 'string', 'format': 'date-time'})
+
+    def test_report_schema_shared_catalog_copied(self):
+        """
+        Verify that the report schema is the shared schema of the report index, and that modifying the schema of
+        a discovered stream does not change it
+        """
+        index_schema = tap_bing_ads.get_report_index(self.client)['KeywordPerformanceReport']['schema']
+        self.assertIs(tap_bing_ads.get_report_schema(self.client, 'KeywordPerformanceReport'), index_schema)
+
+        with mock.patch("tap_bing_ads.CLIENT_REGISTRY.get_client", return_value=self.client):
+            report_streams = tap_bing_ads.discover_reports()
+        schema = [stream for stream in report_streams if stream['stream'] == 'keyword_performance_report'][0]['schema']
+        schema['properties']['Clicks']['type'].append('string')
+        del schema['properties']['Keyword']
+
+        self.assertEqual(index_schema['properties']['Clicks'], {'type': ['null', 'integer']})
+        self.assertIn('Keyword', index_schema['properties'])
+
+    @mock.patch("tap_bing_ads.get_type_map")
+    def test_discover_reports_uses_report_index(self, mock_get_type_map):
+        """
+        Verify that the report streams are discovered for the whitelisted reports without building the type map
+        """
+        with mock.patch("tap_bing_ads.CLIENT_REGISTRY.get_client", return_value=self.client):
+            report_streams = tap_bing_ads.discover_reports()
+
+        self.assertEqual(sorted(stream['stream'] for stream in report_streams),
+                         sorted(tap_bing_ads.snakecase(report_name) for report_name in tap_bing_ads.reports.REPORT_WHITELIST))
+        mock_get_type_map.assert_not_called()
@@ -0,0 +1,86 @@
+import io
+import unittest
+import zipfile
+from unittest import mock
+
+import tap_bing_ads
+
+HEADER = '\ufeff"TimePeriod","AdGroupName","Clicks","Ctr"\n'
+
+
+def get_report_zip(num_rows, compression=zipfile.ZIP_STORED, zip_file_class=io.BytesIO):
+    '''Return a zipped report CSV, with a quoted line break in every fifth ad group name'''
+    lines = [HEADER]
+    for i in range(num_rows):
+        name = 'ad group\n{}'.format(i) if i % 5 == 0 else 'ad group {}'.format(i)
+        lines.append('"2024-01-{:02d}","{}","{:,}","{}%"\n'.format(i % 28 + 1, name, i * 1000, i / 10))
+    content = zip_file_class()
+    with zipfile.ZipFile(content, 'w', compression) as zip_file:
+        zip_file.writestr('report.csv', ''.join(lines))
+    return content.getvalue()
+
+
+class MockResponse():
+    '''Mocked response of the report download'''
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.content = content
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+@mock.patch("tap_bing_ads.REPORT_PARSE_CHUNK_LINES", 7)
+@mock.patch("singer.write_record")
+class TestReportParserPool(unittest.TestCase):
+    """A set of unit tests to ensure that large reports are typed on a process pool with the rows written in order"""
+
+    def tearDown(self):
+        tap_bing_ads.REPORT_PARSER_POOL.shutdown()
+        tap_bing_ads.CONFIG = {}
+
+    def stream_report(self, mock_write_record, content, processes):
+        '''Stream the report and return the written rows'''
+        mock_write_record.reset_mock()
+        tap_bing_ads.CONFIG = {'report_parse_processes': processes}
+        with mock.patch.object(tap_bing_ads.SESSION, 'get', return_value=MockResponse(content)):
+            tap_bing_ads.stream_report('ad_group_performance_report', 'AdGroupPerformanceReport', 'https://download', '2024-02-01')
+        return [call.args[1] for call in mock_write_record.mock_calls]
+
+    @mock.patch("tap_bing_ads.ReportParserPool.get_executor", side_effect=tap_bing_ads.REPORT_PARSER_POOL.get_executor)
+    def test_rows_typed_in_processes(self, mock_get_executor, mock_write_record):
+        """
+        Verify that the rows typed on the process pool are the rows typed inline, in the same order
+        """
+        content = get_report_zip(100)
+        inline_rows = self.stream_report(mock_write_record, content, 0)
+        mock_get_executor.assert_not_called()
+        pool_rows = self.stream_report(mock_write_record, content, 2)
+        mock_get_executor.assert_called_once()
+
+        self.assertEqual(len(inline_rows), 100)
+        self.assertEqual(pool_rows, inline_rows)
+        self.assertEqual(pool_rows[10], {'TimePeriod': '2024-01-11T00:00:00+00:00', 'AdGroupName': 'ad group\n10',
+                                         'Clicks': 10000, 'Ctr': 1.0, '_sdc_report_datetime': '2024-02-01'})
+
+    @mock.patch("tap_bing_ads.ReportParserPool.get_executor")
+    def test_small_report_typed_inline(self, mock_get_executor, mock_write_record):
+        """
+        Verify that a report of one chunk is typed without the process pool
+        """
+        self.assertEqual(len(self.stream_report(mock_write_record, get_report_zip(4), 2)), 4)
+        mock_get_executor.assert_not_called()
+
+    def test_chunks_end_with_whole_rows(self, mock_write_record):
+        """
+        Verify that a chunk does not end inside a quoted field spanning lines
+        """
+        lines = ['"a","b\n', 'c"\n', '"d","e"\n', '"f","g\n', 'h"\n']
+        self.assertEqual(list(tap_bing_ads.iter_report_chunks(lines, 1)),
+                         [['"a","b\n', 'c"\n'], ['"d","e"\n'], ['"f","g\n', 'h"\n']])
@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import arrow
+from singer.catalog import CatalogEntry
+
+import tap_bing_ads
+
+REPORT_STREAM = CatalogEntry(tap_stream_id='ad_performance_report', stream='ad_performance_report')
+STATE_KEY = 'a1_ad_performance_report'
+
+
+class MockReportJobs():
+    '''Mocked report generation where the report of each window takes the given number of polls to be ready'''
+    def __init__(self, polls_per_window, generated_together=0):
+        self.polls_per_window = polls_per_window
+        # the number of windows generated before the first one is ready, so the test does not depend on
+        # how fast the executor threads submit the report requests
+        self.generated_together = generated_together
+        self.generated = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.downloads = []
+        self.date_bookmarks = []
+        self.resumed = []
+
+    def get_report_request_id(self, client, account_id, report_stream, report_name,
+                              start_date, end_date, state_key, force_refresh=False):
+        self.generated += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return 'request_{}'.format(start_date.date())
+
+    async def poll_report(self, client, account_id, report_name, start_date, end_date, request_id, resumed=False):
+        if resumed:
+            self.resumed.append(request_id)
+        while self.generated < self.generated_together:
+            await asyncio.sleep(0.001)
+        for _ in range(self.polls_per_window[str(start_date.date())]):
+            await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        # the bookmark of the window must not move before the window is downloaded
+        self.date_bookmarks.append(tap_bing_ads.STATE.get('bookmarks', {}).get(STATE_KEY, {}).get('date'))
+        return True, 'https://download/{}'.format(request_id)
+
+    def stream_report(self, stream_name, report_name, url, report_time):
+        self.downloads.append(url.rsplit('_', 1)[1])
+
+
+@mock.patch("tap_bing_ads.get_report_schema", return_value={})
+@mock.patch("tap_bing_ads.write_schema")
+@mock.patch("singer.write_state")
+class TestReportPipeline(unittest.TestCase):
+    """A set of unit tests to ensure that the report windows are generated together and bookmarked in order"""
+
+    def setUp(self):
+        tap_bing_ads.STATE.clear()
+        tap_bing_ads.SCHEDULER.configure()
+        self.windows = tap_bing_ads.get_report_windows(arrow.get('2024-01-01'), arrow.get('2024-01-20'), 4)
+
+    def tearDown(self):
+        tap_bing_ads.STATE.clear()
+        tap_bing_ads.EXECUTOR.shutdown()
+
+    def sync(self, jobs, windows_in_flight):
+        with mock.patch("tap_bing_ads.get_report_request_id", side_effect=jobs.get_report_request_id), \
+             mock.patch("tap_bing_ads.poll_report", side_effect=jobs.poll_report), \
+             mock.patch("tap_bing_ads.stream_report", side_effect=jobs.stream_report):
+            asyncio.run(tap_bing_ads.sync_report_pipelined('client', 'a1', REPORT_STREAM, self.windows, windows_in_flight))
+
+    def test_report_windows(self, *args):
+        """
+        Verify that the interval is split in windows of `report_max_days` + 1 days
+        """
+        self.assertEqual([(str(start.date()), str(end.date())) for start, end in self.windows],
+                         [('2024-01-01', '2024-01-05'), ('2024-01-06', '2024-01-10'), ('2024-01-11', '2024-01-15'),
+                          ('2024-01-16', '2024-01-20')])
+
+    def test_windows_downloaded_in_completion_order(self, *args):
+        """
+        Verify that the windows are generated together, downloaded in the order they are ready,
+        and the date bookmark only moves through the contiguous completed windows
+        """
+        jobs = MockReportJobs({'2024-01-01': 30, '2024-01-06': 1, '2024-01-11': 10, '2024-01-16': 20}, generated_together=4)
+        self.sync(jobs, windows_in_flight=4)
+
+        self.assertEqual(jobs.max_in_flight, 4)
+        self.assertEqual(jobs.downloads, ['2024-01-06', '2024-01-11', '2024-01-16', '2024-01-01'])
+        # the later windows completed before the first one, so the bookmark did not move until it completed
+        self.assertEqual(jobs.date_bookmarks, [None, None, None, None])
+        self.assertEqual(tap_bing_ads.STATE['bookmarks'][STATE_KEY], {'date': '2024-01-20T00:00:00+00:00', 'request_ids': {}})
+
+    def test_windows_in_flight_bounded(self, *args):
+        """
+        Verify that no more windows than `windows_in_flight` are generated at once
+        """
+        jobs = MockReportJobs({'2024-01-01': 1, '2024-01-06': 100, '2024-01-11': 1, '2024-01-16': 1})
+        self.sync(jobs, windows_in_flight=2)
+
+        self.assertEqual(jobs.max_in_flight, 2)
+        self.assertEqual(jobs.downloads, ['2024-01-01', '2024-01-11', '2024-01-16', '2024-01-06'])
+        self.assertEqual(jobs.date_bookmarks, [None] + ['2024-01-05T00:00:00+00:00'] * 3)
+        self.assertEqual(tap_bing_ads.STATE['bookmarks'][STATE_KEY]['date'], '2024-01-20T00:00:00+00:00')
+
+    def test_saved_request_id_resumed(self, *args):
+        """
+        Verify that the saved request id of a window is polled again instead of generating a new report
+        """
+        tap_bing_ads.STATE['bookmarks'] = {STATE_KEY: {'request_ids': {'2024-01-06T00:00:00+00:00': 'request_saved'}}}
+        jobs = MockReportJobs({'2024-01-01': 1, '2024-01-06': 1, '2024-01-11': 1, '2024-01-16': 1})
+        jobs.in_flight = 1
+        self.sync(jobs, windows_in_flight=4)
+
+        self.assertIn('saved', jobs.downloads)
+        self.assertNotIn('2024-01-06', jobs.downloads)
+        self.assertEqual(jobs.resumed, ['request_saved'])
+        self.assertEqual(tap_bing_ads.STATE['bookmarks'][STATE_KEY]['request_ids'], {})
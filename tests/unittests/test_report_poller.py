@@ -0,0 +1,237 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import arrow
+
+import tap_bing_ads
+
+START_DATE = arrow.get('2024-01-01')
+END_DATE = arrow.get('2024-01-31')
+STATS_KEY = 'AdPerformanceReport:32d'
+
+
+class MockPollResponse():
+    '''Mocked response of PollGenerateReport'''
+    def __init__(self, status, download_url=None):
+        self.Status = status
+        self.ReportDownloadUrl = download_url
+
+
+class MockReportingClient():
+    '''Mocked reporting service client whose reports are ready after the given number of polls'''
+    def __init__(self, polls_until_ready):
+        self.polls_until_ready = polls_until_ready
+        self.polls = {request_id: 0 for request_id in polls_until_ready}
+        self.poll_times = []
+
+    def PollGenerateReport(self, request_id):
+        self.polls[request_id] += 1
+        self.poll_times.append(time.monotonic())
+        status = self.polls_until_ready[request_id]
+        if isinstance(status, Exception):
+            raise status
+        if status is None:
+            return None
+        if isinstance(status, str):
+            return MockPollResponse(status)
+        if self.polls[request_id] < status:
+            return MockPollResponse('Pending')
+        return MockPollResponse('Success', 'https://download/{}'.format(request_id))
+
+
+async def poll_reports(client, request_ids):
+    return await asyncio.gather(*[tap_bing_ads.poll_report(client, 'a1', 'AdPerformanceReport', START_DATE, END_DATE, request_id)
+                                  for request_id in request_ids], return_exceptions=True)
+
+
+@mock.patch("tap_bing_ads.REPORT_POLL_SLEEP", 0.001)
+class TestReportPoller(unittest.TestCase):
+    """A set of unit tests to ensure that all the outstanding report jobs are polled from one loop in batches"""
+
+    def setUp(self):
+        tap_bing_ads.REPORT_POLLER = tap_bing_ads.ReportPoller()
+        tap_bing_ads.STATE.clear()
+
+    def tearDown(self):
+        tap_bing_ads.REPORT_POLLER = tap_bing_ads.ReportPoller()
+        tap_bing_ads.EXECUTOR.shutdown()
+        tap_bing_ads.STATE.clear()
+        tap_bing_ads.CONFIG = {}
+
+    def test_jobs_polled_in_batches(self):
+        """
+        Verify that the due jobs are polled in batches of at most `report_poll_batch_size` until their report is ready
+        """
+        tap_bing_ads.CONFIG = {'report_poll_batch_size': 4}
+        polls_until_ready = {'r{}'.format(i): i % 3 + 1 for i in range(10)}
+        client = MockReportingClient(polls_until_ready)
+        results = asyncio.run(poll_reports(client, list(polls_until_ready)))
+
+        self.assertEqual(results, [(True, 'https://download/{}'.format(request_id)) for request_id in polls_until_ready])
+        self.assertEqual(client.polls, polls_until_ready)
+        self.assertEqual(tap_bing_ads.REPORT_POLLER.polls, sum(polls_until_ready.values()))
+        # 20 polls in batches of at most 4
+        self.assertGreaterEqual(tap_bing_ads.REPORT_POLLER.batches, 5)
+
+    def test_batches_spaced(self):
+        """
+        Verify that the batches of more due jobs than one batch are spread over REPORT_POLL_SLEEP instead of polled back to back
+        """
+        tap_bing_ads.CONFIG = {'report_poll_batch_size': 4}
+        polls_until_ready = {'r{}'.format(i): 1 for i in range(10)}
+        client = MockReportingClient(polls_until_ready)
+        with mock.patch("tap_bing_ads.REPORT_POLL_SLEEP", 0.3):
+            asyncio.run(poll_reports(client, list(polls_until_ready)))
+
+        self.assertEqual(tap_bing_ads.REPORT_POLLER.batches, 3)
+        poll_times = sorted(client.poll_times)
+        # 10 due jobs in 3 batches are polled at least 0.1 seconds apart, then 6 in 2 batches 0.15 seconds apart
+        self.assertGreaterEqual(poll_times[4] - poll_times[3], 0.09)
+        self.assertGreaterEqual(poll_times[8] - poll_times[7], 0.14)
+
+    def test_same_request_id_waited_twice(self):
+        """
+        Verify that the jobs waiting on the same request id are each polled and resolved, and not taken for one job
+        """
+        tap_bing_ads.CONFIG = {'report_poll_batch_size': 4}
+        client = MockReportingClient({'r1': 2, 'r2': 1})
+        results = asyncio.run(asyncio.wait_for(poll_reports(client, ['r1', 'r1', 'r2']), 5))
+
+        self.assertEqual(results, [(True, 'https://download/r1')] * 2 + [(True, 'https://download/r2')])
+        # each job polled r1 at least once, the mocked report is ready from its second poll on
+        self.assertEqual(client.polls, {'r1': 3, 'r2': 1})
+
+    def test_error_and_failed_poll(self):
+        """
+        Verify that a report generation error and a failed poll are returned to the job waiting on them only
+        """
+        client = MockReportingClient({'ok': 2, 'error': 'Error', 'failed': ValueError('invalid request id')})
+        results = asyncio.run(poll_reports(client, ['ok', 'error', 'failed']))
+
+        self.assertEqual(results[0], (True, 'https://download/ok'))
+        self.assertEqual(results[1], (False, None))
+        self.assertIsInstance(results[2], ValueError)
+
+    def test_invalid_response(self):
+        """
+        Verify that an error handling the response of a job is raised to that job only, and the other jobs are still polled
+        """
+        client = MockReportingClient({'ok': 3, 'none': None})
+        results = asyncio.run(poll_reports(client, ['ok', 'none']))
+
+        self.assertEqual(results[0], (True, 'https://download/ok'))
+        self.assertIsInstance(results[1], AttributeError)
+
+    def test_polling_task_failed(self):
+        """
+        Verify that the jobs waiting on the polling task get its error if it fails, instead of waiting forever
+        """
+        def log_info(message, *args):
+            if message.startswith('Polled'):
+                raise RuntimeError('polling failed')
+
+        client = MockReportingClient({'r1': 3, 'r2': 5})
+        with mock.patch("tap_bing_ads.LOGGER.info", side_effect=log_info):
+            results = asyncio.run(asyncio.wait_for(poll_reports(client, ['r1', 'r2']), 5))
+
+        self.assertEqual([type(result) for result in results], [RuntimeError, RuntimeError])
+
+    @mock.patch("tap_bing_ads.REPORT_POLL_TIMEOUT", 0.01)
+    def test_job_timed_out(self):
+        """
+        Verify that a job is given up after REPORT_POLL_TIMEOUT like a report without data
+        """
+        client = MockReportingClient({'slow': 1000})
+        self.assertEqual(asyncio.run(poll_reports(client, ['slow'])), [(True, None)])
+        self.assertLess(client.polls['slow'], 1000)
+
+
+class TestAdaptivePolling(unittest.TestCase):
+    """A set of unit tests to ensure that the reports are polled around their expected completion time"""
+
+    def setUp(self):
+        tap_bing_ads.STATE.clear()
+
+    def tearDown(self):
+        tap_bing_ads.STATE.clear()
+
+    def test_stats_key(self):
+        """
+        Verify that the completion times are grouped by report and window size rounded up to a power of two days
+        """
+        for end_date, expected_key in [('2024-01-01', 'Report:1d'), ('2024-01-03', 'Report:4d'),
+                                       ('2024-01-04', 'Report:4d'), ('2024-01-31', 'Report:32d')]:
+            self.assertEqual(tap_bing_ads.get_report_stats_key('Report', START_DATE, arrow.get(end_date)), expected_key)
+
+    def test_completion_times_in_state(self):
+        """
+        Verify that the average completion time is kept in the state
+        """
+        self.assertIsNone(tap_bing_ads.get_expected_completion_time(STATS_KEY))
+        tap_bing_ads.record_completion_time(STATS_KEY, 100)
+        tap_bing_ads.record_completion_time(STATS_KEY, 200)
+
+        self.assertEqual(tap_bing_ads.STATE['report_completion_times'], {STATS_KEY: {'mean': 130, 'count': 2}})
+        self.assertEqual(tap_bing_ads.get_expected_completion_time(STATS_KEY), 130)
+
+    def test_poll_delays(self):
+        """
+        Verify that the first poll is made right away or before the expected completion time,
+        and the next ones back off with jitter up to REPORT_POLL_MAX_SLEEP
+        """
+        self.assertEqual(tap_bing_ads.get_next_poll_delay(None, 0), 0)
+        for _ in range(100):
+            self.assertTrue(80 <= tap_bing_ads.get_next_poll_delay(100, 0) <= 95)
+            self.assertTrue(4 <= tap_bing_ads.get_next_poll_delay(100, 1) <= 6)
+            self.assertTrue(6 <= tap_bing_ads.get_next_poll_delay(None, 2) <= 9)
+            self.assertTrue(48 <= tap_bing_ads.get_next_poll_delay(None, 50) <= 72)
+
+    @mock.patch("tap_bing_ads.REPORT_POLL_SLEEP", 0.001)
+    @mock.patch("tap_bing_ads.metrics.log")
+    def test_first_poll_near_expected_completion(self, mock_log):
+        """
+        Verify that a report with a known completion time is first polled near it, and its polls and
+        the error of the expectation are logged
+        """
+        tap_bing_ads.STATE['report_completion_times'] = {STATS_KEY: {'mean': 0.2, 'count': 5}}
+        client = MockReportingClient({'r1': 1})
+        poller = tap_bing_ads.ReportPoller()
+
+        async def wait():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await poller.wait(client, 'r1', STATS_KEY)
+            return loop.time() - start
+
+        with mock.patch("tap_bing_ads.REPORT_POLLER", poller):
+            elapsed = asyncio.run(wait())
+        tap_bing_ads.EXECUTOR.shutdown()
+
+        self.assertGreaterEqual(elapsed, 0.16)
+        self.assertEqual(client.polls['r1'], 1)
+        self.assertEqual(tap_bing_ads.STATE['report_completion_times'][STATS_KEY]['count'], 6)
+        self.assertEqual([call.args[1].metric for call in mock_log.mock_calls], ['report_polls', 'report_completion_time_error'])
+
+    @mock.patch("tap_bing_ads.REPORT_POLL_SLEEP", 0.001)
+    @mock.patch("tap_bing_ads.metrics.log")
+    def test_resumed_job_polled_right_away(self, mock_log):
+        """
+        Verify that a job resumed from a previous run is polled right away instead of near the expected completion
+        time, and its completion time is not recorded
+        """
+        tap_bing_ads.STATE['report_completion_times'] = {STATS_KEY: {'mean': 10, 'count': 5}}
+        client = MockReportingClient({'r1': 1})
+        poller = tap_bing_ads.ReportPoller()
+
+        async def wait():
+            return await asyncio.wait_for(poller.wait(client, 'r1', STATS_KEY, resumed=True), 5)
+
+        with mock.patch("tap_bing_ads.REPORT_POLLER", poller):
+            response = asyncio.run(wait())
+        tap_bing_ads.EXECUTOR.shutdown()
+
+        self.assertEqual(response.ReportDownloadUrl, 'https://download/r1')
+        self.assertEqual(tap_bing_ads.STATE['report_completion_times'], {STATS_KEY: {'mean': 10, 'count': 5}})
+        self.assertEqual([call.args[1].metric for call in mock_log.mock_calls], ['report_polls'])
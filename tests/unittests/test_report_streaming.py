@@ -0,0 +1,184 @@
+import io
+import queue
+import threading
+import time
+import unittest
+import zipfile
+import zlib
+from unittest import mock
+
+import tap_bing_ads
+from test_report_download import ReportHandler, ReportServer
+from test_report_parser_pool import get_report_zip
+
+
+class UnseekableBytesIO(io.BytesIO):
+    '''Mocked unseekable stream, the zips written to it have a data descriptor after the data'''
+    def seekable(self):
+        return False
+
+    def seek(self, *args):
+        raise OSError('unseekable')
+
+    def tell(self):
+        raise OSError('unseekable')
+
+
+class SlowReportHandler(ReportHandler):
+    '''Serve the whole report in pieces sent one after the other'''
+    def do_GET(self):
+        server = self.server
+        self.send_report_headers(0, len(server.content))
+        piece_size = -(-len(server.content) // 10)
+        for start in range(0, len(server.content), piece_size):
+            self.wfile.write(server.content[start:start + piece_size])
+            self.wfile.flush()
+            time.sleep(0.05)
+        server.finished = time.monotonic()
+
+
+class SlowReportServer(ReportServer):
+    '''Local HTTP server sending the report slowly'''
+    def __init__(self, content):
+        super().__init__(content, accept_ranges=True, drops=0)
+        self.RequestHandlerClass = SlowReportHandler
+        self.finished = None
+
+
+@mock.patch("tap_bing_ads.DOWNLOAD_CHUNK_SIZE", 1024)
+class TestReportStreaming(unittest.TestCase):
+    """A set of unit tests to ensure that the reports are unzipped while they download"""
+
+    def setUp(self):
+        self.content = get_report_zip(5000, zipfile.ZIP_DEFLATED)
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    def stream_report(self, url):
+        '''Stream the report and return the written rows, and whether they were read while downloading'''
+        with mock.patch("singer.write_record") as mock_write_record, \
+             mock.patch("tap_bing_ads.StreamedReportReader", side_effect=tap_bing_ads.StreamedReportReader) as mock_reader:
+            tap_bing_ads.stream_report('ad_group_performance_report', 'AdGroupPerformanceReport', url, '2024-02-01')
+        return [call.args[1] for call in mock_write_record.mock_calls], mock_reader.called
+
+    def get_expected_rows(self, content):
+        '''Return the rows written from the downloaded zip'''
+        tap_bing_ads.CONFIG = {'report_streaming_unzip': False}
+        with ReportServer(content, accept_ranges=True, drops=0) as server:
+            rows, streamed = self.stream_report(server.url)
+        tap_bing_ads.CONFIG = {}
+        self.assertFalse(streamed)
+        return rows
+
+    def test_rows_written_while_downloading(self):
+        """
+        Verify that the first rows are written before the download ends, and the rows are the rows of the downloaded zip
+        """
+        first_record_time = []
+        with SlowReportServer(self.content) as server:
+            with mock.patch("singer.write_record", side_effect=lambda *args: first_record_time.append(time.monotonic())):
+                tap_bing_ads.stream_report('ad_group_performance_report', 'AdGroupPerformanceReport', server.url, '2024-02-01')
+
+        self.assertEqual(len(first_record_time), 5000)
+        self.assertLess(first_record_time[0], server.finished)
+
+        with ReportServer(self.content, accept_ranges=True, drops=0) as server:
+            rows, streamed = self.stream_report(server.url)
+        self.assertTrue(streamed)
+        self.assertEqual(rows, self.get_expected_rows(self.content))
+
+    def test_streamed_download_resumed(self):
+        """
+        Verify that a dropped download resumes the unzipping where it stopped, without writing rows twice
+        """
+        with ReportServer(self.content, accept_ranges=True, drops=2) as server:
+            rows, streamed = self.stream_report(server.url)
+
+        self.assertTrue(streamed)
+        self.assertEqual(len(server.ranges), 3)
+        self.assertEqual(rows, self.get_expected_rows(self.content))
+
+    def test_data_descriptor(self):
+        """
+        Verify that a zip with the CRC-32 in a data descriptor after the data is unzipped while downloading
+        """
+        content = get_report_zip(100, zipfile.ZIP_DEFLATED, UnseekableBytesIO)
+        self.assertTrue(int.from_bytes(content[6:8], 'little') & 0x8)
+        with ReportServer(content, accept_ranges=True, drops=0) as server:
+            rows, streamed = self.stream_report(server.url)
+
+        self.assertTrue(streamed)
+        self.assertEqual(rows, self.get_expected_rows(content))
+
+    def test_downloaded_zip_fallback(self):
+        """
+        Verify that a zip of a stored member, or of a server not accepting ranges, is downloaded before it is read
+        """
+        stored_content = get_report_zip(100)
+        for content, accept_ranges in [(stored_content, True), (self.content, False)]:
+            with self.subTest(accept_ranges=accept_ranges):
+                with ReportServer(content, accept_ranges=accept_ranges, drops=0) as server:
+                    rows, streamed = self.stream_report(server.url)
+
+                self.assertFalse(streamed)
+                self.assertEqual(rows, self.get_expected_rows(content))
+
+    def test_bad_crc(self):
+        """
+        Verify that a CSV not matching the CRC-32 of the zip raises an error
+        """
+        content = bytearray(self.content)
+        content[14] ^= 0xff
+        with ReportServer(bytes(content), accept_ranges=True, drops=0) as server:
+            with self.assertRaises(Exception) as e:
+                self.stream_report(server.url)
+
+        self.assertEqual(str(e.exception), 'Bad CRC-32 of report: AdGroupPerformanceReport')
+
+    def test_truncated_zip_header(self):
+        """
+        Verify that a zip ending before the end of its local file header raises an incomplete download error
+        """
+        header_size = tap_bing_ads.ZIP_LOCAL_FILE_HEADER.size
+        for size in [header_size - 10, header_size + 2]:
+            with self.subTest(size=size):
+                with ReportServer(self.content[:size], accept_ranges=True, drops=0) as server:
+                    with self.assertRaises(tap_bing_ads.IncompleteReportDownload) as e:
+                        self.stream_report(server.url)
+
+                self.assertEqual(str(e.exception), 'Received {} bytes, ending in the zip header, downloading report: '
+                                                   'AdGroupPerformanceReport'.format(size))
+
+    def test_download_stopped_with_reader(self):
+        """
+        Verify that the download stops when the rows are not read to the end
+        """
+        with SlowReportServer(self.content) as server:
+            with mock.patch("singer.write_record", side_effect=ValueError('target failed')):
+                with self.assertRaises(ValueError):
+                    tap_bing_ads.stream_report('ad_group_performance_report', 'AdGroupPerformanceReport', server.url, '2024-02-01')
+
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name == 'tap-bing-ads-report-unzip'])
+
+    @mock.patch("tap_bing_ads.REPORT_STREAM_PART_SIZE", 1024)
+    def test_parts_bounded(self):
+        """
+        Verify that a chunk of the zip inflating to many times its size is queued in parts of at most
+        REPORT_STREAM_PART_SIZE bytes, also when the CSV is a multiple of the part size
+        """
+        for csv_size in [100000, 100 * 1024]:
+            with self.subTest(csv_size=csv_size):
+                csv = (b'AccountId,Clicks\n' + b'1,0\n' * csv_size)[:csv_size]
+                compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+                data = compressor.compress(csv) + compressor.flush()
+                unzipper = tap_bing_ads.ReportUnzipper('AdGroupPerformanceReport', 'http://localhost/report')
+                unzipper.parts = queue.Queue()
+                unzipper.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                unzipper.decompress(data)
+
+                parts = list(unzipper.parts.queue)
+                self.assertTrue(unzipper.decompressor.eof)
+                self.assertLessEqual(max(len(part) for part in parts), 1024)
+                self.assertEqual(b''.join(parts), csv)
+                self.assertEqual(unzipper.crc, zlib.crc32(csv))
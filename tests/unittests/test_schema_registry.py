@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+
+import singer
+
+import tap_bing_ads
+
+SCHEMA = {'type': 'object', 'properties': {'Id': {'type': ['null', 'integer']}, 'Name': {'type': ['null', 'string']}}}
+
+
+class ComparedSchema(dict):
+    '''Schema counting how many times it is compared'''
+    comparisons = 0
+
+    def __eq__(self, other):
+        ComparedSchema.comparisons += 1
+        return super().__eq__(other)
+
+    __hash__ = None
+
+
+@mock.patch("singer.write_schema")
+class TestSchemaRegistry(unittest.TestCase):
+    """A set of unit tests to ensure that a stream's SCHEMA message is written once unless it changes"""
+
+    def setUp(self):
+        self.registry = tap_bing_ads.SchemaRegistry()
+
+    def test_schema_written_once(self, mock_write_schema):
+        """
+        Verify that the same schema is written once per stream and the skipped message bytes are counted
+        """
+        for _ in range(3):
+            self.registry.write_schema('ads', SCHEMA, ['Id'])
+            self.registry.write_schema('ad_groups', {**SCHEMA}, ['Id'])
+
+        self.assertEqual(mock_write_schema.mock_calls, [mock.call('ads', SCHEMA, ['Id']), mock.call('ad_groups', SCHEMA, ['Id'])])
+        self.assertEqual(self.registry.messages_skipped, 4)
+        ads_message_size = len(singer.format_message(singer.SchemaMessage(stream='ads', schema=SCHEMA, key_properties=['Id'])))
+        self.assertEqual(self.registry.bytes_saved, 4 * ads_message_size + 2 * (len('ad_groups') - len('ads')))
+
+    def test_changed_schema_written_again(self, mock_write_schema):
+        """
+        Verify that the schema is written again when the schema or the key properties changed
+        """
+        changed_schema = {'type': 'object', 'properties': {'Id': {'type': ['null', 'integer']}}}
+        self.registry.write_schema('ads', SCHEMA, ['Id'])
+        self.registry.write_schema('ads', changed_schema, ['Id'])
+        self.registry.write_schema('ads', changed_schema, [])
+
+        self.assertEqual(mock_write_schema.mock_calls, [mock.call('ads', SCHEMA, ['Id']),
+                                                        mock.call('ads', changed_schema, ['Id']),
+                                                        mock.call('ads', changed_schema, [])])
+        self.assertEqual(self.registry.bytes_saved, 0)
+
+    def test_shared_schema_not_compared(self, mock_write_schema):
+        """
+        Verify that the shared schema object written again is skipped without comparing it
+        """
+        ComparedSchema.comparisons = 0
+        schema = ComparedSchema(SCHEMA)
+        for _ in range(3):
+            self.registry.write_schema('ads', schema, ['Id'])
+
+        self.assertEqual(mock_write_schema.call_count, 1)
+        self.assertEqual(self.registry.messages_skipped, 2)
+        self.assertEqual(ComparedSchema.comparisons, 0)
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import unittest
+
+import singer
+
+import tap_bing_ads
+
+LOGGER = singer.get_logger()
+
+LAZY_MODULES = ['bingads', 'suds', 'arrow', 'tap_bing_ads.client']
+
+
+def get_import_times():
+    '''Import the tap in a fresh interpreter and return the cumulative import time in microseconds of each module'''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import tap_bing_ads'],
+                            capture_output=True, text=True, check=True)
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+class TestStartupImports(unittest.TestCase):
+    """A set of unit tests to ensure that the tap starts without loading the Bing Ads SDK"""
+
+    def test_sdk_not_imported_at_startup(self):
+        """
+        Verify that importing the tap does not import the Bing Ads SDK, suds and arrow
+        """
+        import_times = get_import_times()
+        LOGGER.info('Imported tap_bing_ads in %.1fms', import_times['tap_bing_ads'] / 1000)
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, import_times)
+
+    def test_service_client_loaded_on_first_use(self):
+        """
+        Verify that the service client class is loaded from `tap_bing_ads.client` when first accessed
+        """
+        from tap_bing_ads.client import CustomServiceClient
+        self.assertIs(tap_bing_ads.CustomServiceClient, CustomServiceClient)
+
+        with self.assertRaises(AttributeError):
+            tap_bing_ads.NotAnAttribute # pylint: disable=pointless-statement
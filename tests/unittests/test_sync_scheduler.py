@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from singer.catalog import Catalog
+
+import tap_bing_ads
+
+
+class ConcurrencyProbe():
+    '''Coroutine factory recording the largest number of coroutines running at once'''
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def run(self, *args, **kwargs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+
+
+class TestSyncScheduler(unittest.TestCase):
+    """A set of unit tests to ensure that the scheduler bounds the accounts, report jobs and downloads in progress"""
+
+    def setUp(self):
+        tap_bing_ads.CONFIG = {'max_concurrent_accounts': 2, 'max_concurrent_report_jobs': '3'}
+        self.scheduler = tap_bing_ads.SyncScheduler()
+        self.scheduler.configure()
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    async def run_in_slots(self, name, probe, num_tasks):
+        async def run_in_slot():
+            async with self.scheduler.slot(name):
+                await probe.run()
+        await asyncio.gather(*[run_in_slot() for _ in range(num_tasks)])
+
+    def test_limits_from_config(self):
+        """
+        Verify that the limits are read from the config and fall back to the defaults
+        """
+        self.assertEqual(self.scheduler.limits, {'accounts': 2, 'report_jobs': 3, 'downloads': 5})
+
+    def test_slots_bound_concurrency(self):
+        """
+        Verify that no more coroutines than the limit hold a slot and the queue depth is recorded
+        """
+        for name, limit in [('accounts', 2), ('report_jobs', 3), ('downloads', 5)]:
+            with self.subTest(name=name):
+                probe = ConcurrencyProbe()
+                asyncio.run(self.run_in_slots(name, probe, 8))
+                self.assertEqual(probe.max_running, limit)
+                self.assertEqual(self.scheduler.max_waiting[name], 8 - limit)
+                self.assertEqual(self.scheduler.queue_depths()[name], 0)
+                self.assertEqual(self.scheduler.active[name], 0)
+
+    def test_slot_released_on_error(self):
+        """
+        Verify that the slot is released when the coroutine holding it raises an error
+        """
+        async def fail_in_slot():
+            async with self.scheduler.slot('accounts'):
+                raise ValueError('failed')
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                asyncio.run(fail_in_slot())
+        self.assertEqual(self.scheduler.active['accounts'], 0)
+        probe = ConcurrencyProbe()
+        asyncio.run(self.run_in_slots('accounts', probe, 2))
+        self.assertEqual(probe.max_running, 2)
+
+    @mock.patch("tap_bing_ads.sync_account_data")
+    def test_accounts_synced_with_limit(self, mock_sync_account_data):
+        """
+        Verify that the accounts are synced at most `max_concurrent_accounts` at once
+        """
+        probe = ConcurrencyProbe()
+        mock_sync_account_data.side_effect = probe.run
+        asyncio.run(tap_bing_ads.do_sync_all_accounts(['a{}'.format(i) for i in range(6)], Catalog([])))
+
+        self.assertEqual(mock_sync_account_data.call_count, 6)
+        self.assertEqual(probe.max_running, 2)
+        self.assertEqual(tap_bing_ads.SCHEDULER.max_waiting['accounts'], 4)
@@ -0,0 +1,88 @@
+import copy
+import unittest
+from unittest import mock
+
+import pkg_resources
+from suds.client import Client
+
+import tap_bing_ads
+
+
+def get_local_soap_client(wsdl_file):
+    '''Return suds client loaded from the WSDL shipped with the bingads SDK'''
+    return Client('file://' + pkg_resources.resource_filename('bingads', 'v13/proxies/production/' + wsdl_file))
+
+
+class MockServiceClient():
+    '''Mocked ServiceClient class exposing the suds client'''
+    def __init__(self, soap_client):
+        self.soap_client = soap_client
+
+
+class TestTypeMapCache(unittest.TestCase):
+    """A set of unit tests to ensure that the type map is built once per service and WSDL"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.customer_soap_client = get_local_soap_client('customermanagement_service.xml')
+        cls.reporting_soap_client = get_local_soap_client('reporting_service.xml')
+
+    def setUp(self):
+        tap_bing_ads.TYPE_MAP_CACHE.clear()
+
+    @mock.patch("tap_bing_ads.build_type_map", side_effect=tap_bing_ads.build_type_map)
+    def test_type_map_built_once_per_service(self, mock_build_type_map):
+        """
+        Verify that clients of the same service share the type map and different services do not
+        """
+        type_map = tap_bing_ads.get_type_map(MockServiceClient(self.customer_soap_client))
+        self.assertIs(tap_bing_ads.get_type_map(MockServiceClient(get_local_soap_client('customermanagement_service.xml'))), type_map)
+        self.assertEqual(mock_build_type_map.call_count, 1)
+
+        reporting_type_map = tap_bing_ads.get_type_map(MockServiceClient(self.reporting_soap_client))
+        self.assertIsNot(reporting_type_map, type_map)
+        self.assertEqual(mock_build_type_map.call_count, 2)
+
+        self.assertIn('AdvertiserAccount', type_map)
+        self.assertIn('AccountPerformanceReportColumn', reporting_type_map)
+
+    def test_type_map_unchanged_by_discovery(self):
+        """
+        Verify that discovering and modifying the core object streams leaves the shared type maps as they were built
+        """
+        clients = {'CustomerManagementService': MockServiceClient(self.customer_soap_client),
+                   'CampaignManagementService': MockServiceClient(get_local_soap_client('campaignmanagement_service.xml'))}
+        type_maps = {service: copy.deepcopy(tap_bing_ads.get_type_map(client)) for service, client in clients.items()}
+
+        with mock.patch("tap_bing_ads.CLIENT_REGISTRY.get_client", side_effect=clients.get):
+            streams = tap_bing_ads.discover_core_objects()
+        for stream in streams:
+            for descriptor in stream['schema']['properties'].values():
+                descriptor['type'] = 'boolean'
+
+        for service, client in clients.items():
+            self.assertEqual(tap_bing_ads.get_type_map(client), type_maps[service])
+
+    def test_core_schema_shared_stream_def_copied(self):
+        """
+        Verify that the core schema is the shared schema of the type map, and that modifying the schema of
+        its stream definition does not change it
+        """
+        client = MockServiceClient(self.customer_soap_client)
+        type_map_schema = tap_bing_ads.get_type_map(client)['AdvertiserAccount']
+        self.assertIs(tap_bing_ads.get_core_schema(client, 'AdvertiserAccount'), type_map_schema)
+
+        schema = tap_bing_ads.get_stream_def('accounts', type_map_schema, pks=['Id'])['schema']
+        schema['properties']['Id']['type'].append('boolean')
+        del schema['properties']['Name']
+
+        self.assertIn('Name', type_map_schema['properties'])
+        self.assertNotIn('boolean', type_map_schema['properties']['Id']['type'])
+
+    def test_wsdl_digest(self):
+        """
+        Verify that the WSDL digest is stable for a WSDL and differs between WSDLs
+        """
+        customer_digest = tap_bing_ads.get_wsdl_digest(self.customer_soap_client.sd[0])
+        self.assertEqual(customer_digest, tap_bing_ads.get_wsdl_digest(get_local_soap_client('customermanagement_service.xml').sd[0]))
+        self.assertNotEqual(customer_digest, tap_bing_ads.get_wsdl_digest(self.reporting_soap_client.sd[0]))
@@ -0,0 +1,95 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from getpass import getuser
+from tempfile import gettempdir
+from unittest import mock
+
+import pkg_resources
+
+import tap_bing_ads
+from tap_bing_ads import CustomServiceClient
+
+
+@mock.patch("bingads.service_client.Client")
+class TestWsdlCache(unittest.TestCase):
+    """A set of unit tests to ensure that the parsed WSDL is cached on disk with the configured location and TTL"""
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+
+    def test_default_wsdl_cache(self, mock_suds_client):
+        """
+        Verify that the parsed WSDL is cached for one day in a per API version directory of the temp folder
+        """
+        tap_bing_ads.CONFIG = {}
+        CustomServiceClient('CustomerManagementService')
+
+        suds_options = mock_suds_client.call_args[1]
+        self.assertEqual(suds_options['cachingpolicy'], 1)
+        self.assertEqual(suds_options['cache'].location, os.path.join(gettempdir(), 'suds', getuser(), 'v13'))
+        self.assertEqual(suds_options['cache'].duration, datetime.timedelta(days=1))
+
+    def test_config_provided_wsdl_cache(self, mock_suds_client):
+        """
+        Verify that the `wsdl_cache_dir` and `wsdl_cache_ttl_days` config params are used for the cache
+        """
+        tap_bing_ads.CONFIG = {'wsdl_cache_dir': '/tmp/tap_bing_ads_wsdl', 'wsdl_cache_ttl_days': '7'}
+        CustomServiceClient('ReportingService')
+
+        suds_options = mock_suds_client.call_args[1]
+        self.assertEqual(suds_options['cache'].location, os.path.join('/tmp/tap_bing_ads_wsdl', 'v13'))
+        self.assertEqual(suds_options['cache'].duration, datetime.timedelta(days=7))
+
+    def test_empty_config_provided_wsdl_cache_ttl(self, mock_suds_client):
+        """
+        Verify that the default TTL is used if 0 or empty value is given in config
+        """
+        for ttl in [0, '0', '']:
+            tap_bing_ads.CONFIG = {'wsdl_cache_ttl_days': ttl}
+            self.assertEqual(tap_bing_ads.get_wsdl_cache_ttl_days(), 1)
+
+
+class TestWsdlCacheContents(unittest.TestCase):
+    """A set of unit tests to ensure that the parsed WSDL is cached by the contents of the WSDL"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        tap_bing_ads.CONFIG = {'wsdl_cache_dir': self.cache_dir.name}
+        self.wsdl_path = os.path.join(self.cache_dir.name, 'reporting_service.xml')
+        shutil.copy(pkg_resources.resource_filename('bingads', 'v13/proxies/production/reporting_service.xml'), self.wsdl_path)
+
+    def tearDown(self):
+        tap_bing_ads.CONFIG = {}
+        self.cache_dir.cleanup()
+
+    def build_client(self):
+        '''Build the reporting service client from the local WSDL, return it with the number of parsed WSDLs cached'''
+        wsdl_url = 'file://' + self.wsdl_path
+        with mock.patch("tap_bing_ads.get_service_url", return_value=wsdl_url), \
+             mock.patch("tap_bing_ads.CustomServiceClient.service_url", new_callable=mock.PropertyMock, return_value=wsdl_url):
+            client = CustomServiceClient('ReportingService')
+        cache_files = [filename for filename in os.listdir(os.path.join(self.cache_dir.name, 'v13')) if filename.endswith('.px')]
+        return client, len(cache_files)
+
+    def test_wsdl_changed_under_same_url(self):
+        """
+        Verify that a warm client is read from the cache, and that a WSDL changed under the same url is parsed again
+        """
+        self.assertEqual(self.build_client()[1], 1)
+        # the parsed WSDL is only put in the cache when it was not found there
+        with mock.patch("tap_bing_ads.client.WsdlCache.put") as mock_put:
+            self.assertEqual(self.build_client()[1], 1)
+        mock_put.assert_not_called()
+
+        with open(self.wsdl_path, encoding='utf-8') as wsdl_file:
+            wsdl = wsdl_file.read()
+        column = '<xs:enumeration value="AccountName" />'
+        with open(self.wsdl_path, 'w', encoding='utf-8') as wsdl_file:
+            wsdl_file.write(wsdl.replace(column, column + '<xs:enumeration value="NewColumn"/>', 1))
+
+        client, cache_files = self.build_client()
+        self.assertEqual(cache_files, 2)
+        self.assertEqual(client.soap_client.factory.create('AccountPerformanceReportColumn').NewColumn, 'NewColumn')